@@ -1,13 +1,63 @@
 import firebase_admin
 from firebase_admin import credentials, auth, firestore
+from google.cloud.firestore import AsyncClient
 import os
 
+try:
+    from google.cloud.firestore_v1.services.firestore import async_client as firestore_gapic
+    from google.cloud.firestore_v1.services.firestore.transports import grpc_asyncio as firestore_grpc
+except ImportError:
+    # Module layout of another google-cloud-firestore release: use the stock channel
+    firestore_gapic = firestore_grpc = None
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# gRPC channel options for the Firestore client. Every concurrent request is
+# multiplexed over one HTTP/2 channel: keep it alive while idle so the next
+# request doesn't pay a reconnect and TLS handshake, and allow large
+# responses (full project documents with their roadmaps).
+FIRESTORE_GRPC_OPTIONS = [
+    ("grpc.keepalive_time_ms", int(os.getenv("FIRESTORE_KEEPALIVE_MS", "30000"))),
+    ("grpc.keepalive_timeout_ms", int(os.getenv("FIRESTORE_KEEPALIVE_TIMEOUT_MS", "10000"))),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_receive_message_length", int(os.getenv("FIRESTORE_MAX_MESSAGE_MB", "32")) * 1024 * 1024),
+]
+
+class TunedAsyncClient(AsyncClient):
+    """
+    Async Firestore client whose gRPC channel uses FIRESTORE_GRPC_OPTIONS.
+
+    Builds the channel in place of AsyncClient's private `_firestore_api`
+    property, written against google-cloud-firestore 2.21 (pinned in
+    requirements.txt; tests/test_firestore_client.py checks the internals it
+    relies on). If those internals are missing it logs a warning and falls
+    back to the stock channel instead of failing every request.
+    """
+
+    @property
+    def _firestore_api(self):
+        try:
+            if firestore_grpc and self._firestore_api_internal is None and self._emulator_host is None:
+                channel = firestore_grpc.FirestoreGrpcAsyncIOTransport.create_channel(
+                    self._target, credentials=self._credentials, options=FIRESTORE_GRPC_OPTIONS,
+                )
+                self._transport = firestore_grpc.FirestoreGrpcAsyncIOTransport(host=self._target, channel=channel)
+                self._firestore_api_internal = firestore_gapic.FirestoreAsyncClient(
+                    transport=self._transport, client_options=self._client_options,
+                )
+                firestore_gapic._client_info = self._client_info
+        except (AttributeError, TypeError) as e:
+            print(f"WARNING: Firestore gRPC tuning unavailable ({e}); using the default channel")
+            self.__dict__.pop("_transport", None)
+            self._firestore_api_internal = None
+        return super()._firestore_api
+
 # Initialize Firebase Admin
 # Load credentials from environment variables
+# db is the async Firestore client; every data access awaits it
 db = None
 
 try:
@@ -49,7 +99,8 @@ try:
             firebase_admin.initialize_app(cred)
             print("Firebase Admin initialized successfully (ADC).")
             
-    db = firestore.client()
+    app = firebase_admin.get_app()
+    db = TunedAsyncClient(credentials=app.credential.get_credential(), project=app.project_id)
 
 except Exception as e:
     print(f"WARNING: Firebase Admin initialization failed: {e}")
@@ -70,7 +121,7 @@ def verify_token(token: str):
         print(f"Error verifying token: {e}")
         return None
 
-def sync_user_to_firestore(user_data: dict):
+async def sync_user_to_firestore(user_data: dict):
     if not db:
         print("WARNING: DB not initialized, skipping Firestore sync.")
         return user_data
@@ -83,7 +134,7 @@ def sync_user_to_firestore(user_data: dict):
     user_ref = db.collection('users').document(uid)
     
     # Merge with existing data to preserve plan info if it exists
-    user_ref.set({
+    await user_ref.set({
         'email': email,
         'display_name': display_name,
         'photo_url': user_data.get('picture'),
@@ -92,27 +143,31 @@ def sync_user_to_firestore(user_data: dict):
     }, merge=True)
     
     # Check if plan exists, if not set default
-    doc = user_ref.get()
+    doc = await user_ref.get()
     user_dict = doc.to_dict() if doc.exists else {}
     
     if not doc.exists or 'plan' not in user_dict:
-        user_ref.set({'plan': 'starter'}, merge=True)
+        await user_ref.set({'plan': 'starter'}, merge=True)
         print(f"New user detected - assigned 'starter' plan to {email}")
     else:
         print(f"Existing user - current plan: {user_dict.get('plan', 'unknown')}")
     
     print("-" * 60)
         
-    return user_ref.get().to_dict()
+    return (await user_ref.get()).to_dict()
 
-def check_ai_limit(uid: str) -> bool:
+async def get_ai_quota(uid: str) -> dict:
+    """
+    The user's plan and AI generation usage.
+    Returns: {plan, current_usage, limit, allowed}
+    """
     if not db:
-        return True # Mock mode allow
+        return {"plan": "starter", "current_usage": 0, "limit": 10, "allowed": True} # Mock mode allow
     
     user_ref = db.collection('users').document(uid)
-    doc = user_ref.get()
+    doc = await user_ref.get()
     if not doc.exists:
-        return False
+        return {"plan": "starter", "current_usage": 0, "limit": 0, "allowed": False}
     
     user_data = doc.to_dict()
     plan = user_data.get('plan', 'starter')
@@ -123,7 +178,7 @@ def check_ai_limit(uid: str) -> bool:
     # The plan says: users/{uid}/usage/ai_generations
     
     usage_ref = user_ref.collection('usage').document('ai_generations')
-    usage_doc = usage_ref.get()
+    usage_doc = await usage_ref.get()
     current_usage = usage_doc.to_dict().get('count', 0) if usage_doc.exists else 0
     
     # Limits
@@ -134,17 +189,27 @@ def check_ai_limit(uid: str) -> bool:
     }
     
     limit = limits.get(plan, 10) # Default to starter limit
-    return current_usage < limit
+    return {"plan": plan, "current_usage": current_usage, "limit": limit, "allowed": current_usage < limit}
+
+async def check_ai_limit(uid: str) -> bool:
+    return (await get_ai_quota(uid))["allowed"]
+
+async def get_user_plan(uid: str) -> str:
+    """The user's plan, for model routing (one read, no usage lookup)"""
+    if not db:
+        return 'starter'
+    doc = await db.collection('users').document(uid).get()
+    return (doc.to_dict() or {}).get('plan', 'starter') if doc.exists else 'starter'
 
-def increment_ai_usage(uid: str):
+async def increment_ai_usage(uid: str):
     if not db:
         return
         
     user_ref = db.collection('users').document(uid)
     usage_ref = user_ref.collection('usage').document('ai_generations')
     
-    if not usage_ref.get().exists:
-        usage_ref.set({'count': 1})
+    if not (await usage_ref.get()).exists:
+        await usage_ref.set({'count': 1})
     else:
         # Atomic increment
-        usage_ref.update({'count': firestore.Increment(1)})
+        await usage_ref.update({'count': firestore.Increment(1)})
@@ -0,0 +1,64 @@
+"""
+Backfill or repair the per-user dashboard stats documents
+(users/{uid}/stats/projects) and daily growth buckets
+(users/{uid}/project_growth/{YYYY-MM}).
+
+Recomputes each user's counters from their projects and reports users whose
+stored document is missing, predates the current layout or has drifted.
+With --check nothing is written.
+
+Usage (from backend/):
+    python backfill_user_stats.py                 # every user
+    python backfill_user_stats.py --uid abc123    # specific users
+    python backfill_user_stats.py --check         # report drift only
+"""
+import argparse
+import asyncio
+
+from firestore_utils import STATS_COUNTERS, STATS_VERSION, compute_user_stats, get_db, get_stored_user_stats, rebuild_user_stats
+
+
+async def _user_ids(db):
+    async for user_ref in db.collection('users').list_documents():
+        yield user_ref.id
+
+
+async def run(uids, check: bool) -> int:
+    db = get_db()
+    if not db:
+        print("[ERROR] Firestore is not configured")
+        return 1
+
+    uid_source = uids or [uid async for uid in _user_ids(db)]
+    checked = missing = outdated = drifted = 0
+    for uid in uid_source:
+        checked += 1
+        stored = await get_stored_user_stats(uid)
+        actual = await compute_user_stats(uid) if check else await rebuild_user_stats(uid)
+        if stored is None:
+            missing += 1
+            print(f"[MISSING] {uid}: {actual}")
+            continue
+        if stored.get('version', 1) < STATS_VERSION:
+            outdated += 1
+            print(f"[OUTDATED] {uid}: version {stored.get('version', 1)}")
+        diff = {key: (stored.get(key, 0), actual[key]) for key in STATS_COUNTERS if stored.get(key, 0) != actual[key]}
+        if diff:
+            drifted += 1
+            print(f"[DRIFT] {uid}: " + ", ".join(f"{key} {old} -> {new}" for key, (old, new) in diff.items()))
+
+    action = "Checked" if check else "Rebuilt"
+    print(f"\n{action} {checked} users: {missing} missing, {outdated} outdated, {drifted} drifted.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uid", action="append", default=[], help="Only this user (repeatable)")
+    parser.add_argument("--check", action="store_true", help="Report missing or drifted documents without writing")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args.uid, args.check)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Concurrent /deconstruct + /dashboard/overview latency benchmark.
+
+Simulates a slow LLM provider and measures how dashboard reads behave while
+deconstructions are in flight. "blocking" reproduces the old synchronous
+OpenAI client (the completion blocks the event loop), "async" uses a
+non-blocking completion like the pooled AsyncOpenAI client.
+
+Usage (from backend/):
+    python -m benchmarks.concurrency --llm-latency 2 --deconstructs 4 --overviews 40
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+
+import httpx
+
+import engine
+from providers import Provider
+from response_cache import ResponseCache
+from similarity_index import SimilarityIndex
+from main import app
+
+
+class FakeCompletions:
+    def __init__(self, latency: float, blocking: bool):
+        self.latency = latency
+        self.blocking = blocking
+        self.payload = engine._get_mock_data("Benchmark idea").model_dump_json()
+
+    async def create(self, **kwargs):
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        message = SimpleNamespace(content=self.payload)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def timed(coro, start=None):
+    # Latency is measured from the intended start time so a stalled event loop
+    # is charged to the request instead of silently delaying when it is sent.
+    start = start if start is not None else time.perf_counter()
+    response = await coro
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def delayed_overview(http, headers, origin, delay):
+    await asyncio.sleep(delay)
+    return await timed(http.get("/dashboard/overview", headers=headers), start=origin + delay)
+
+
+async def run(mode: str, llm_latency: float, deconstructs: int, overviews: int):
+    # Both modes must pay for their completions: start from empty caches
+    engine.deconstruction_cache = ResponseCache()
+    engine.similarity_index = SimilarityIndex()
+    completions = FakeCompletions(llm_latency, blocking=(mode == "blocking"))
+    engine.llm_providers.providers = [Provider("fake", engine.MODEL_NAME, SimpleNamespace(chat=SimpleNamespace(completions=completions)))]
+
+    headers = {"Authorization": "Bearer benchmark"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        deconstruct_tasks = [
+            asyncio.create_task(timed(http.post("/deconstruct", json={"idea": f"{mode} idea {i}", "currency": "USD"}, headers=headers)))
+            for i in range(deconstructs)
+        ]
+
+        # Spread dashboard reads across the window where completions are in flight
+        origin = time.perf_counter()
+        interval = llm_latency * deconstructs / max(overviews, 1)
+        overview_latencies = await asyncio.gather(*[
+            delayed_overview(http, headers, origin, i * interval) for i in range(overviews)
+        ])
+
+        deconstruct_latencies = await asyncio.gather(*deconstruct_tasks)
+
+    return {
+        "mode": mode,
+        "overview_p50_ms": statistics.median(overview_latencies) * 1000,
+        "overview_p95_ms": percentile(overview_latencies, 95) * 1000,
+        "overview_max_ms": max(overview_latencies) * 1000,
+        "deconstruct_max_s": max(deconstruct_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=2.0, help="Simulated completion time in seconds")
+    parser.add_argument("--deconstructs", type=int, default=4)
+    parser.add_argument("--overviews", type=int, default=40)
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(run(mode, args.llm_latency, args.deconstructs, args.overviews))
+        for mode in ("blocking", "async")
+    ]
+
+    print(f"\n{'mode':<10}{'overview p50':>14}{'overview p95':>14}{'overview max':>14}{'deconstruct max':>18}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['overview_p50_ms']:>12.1f}ms{r['overview_p95_ms']:>12.1f}ms"
+              f"{r['overview_max_ms']:>12.1f}ms{r['deconstruct_max_s']:>17.2f}s")
+
+
+if __name__ == "__main__":
+    main()
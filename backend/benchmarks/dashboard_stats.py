@@ -0,0 +1,111 @@
+"""
+Dashboard statistics strategy benchmark.
+
+Seeds one user with 10, 100 and 1,000 full-size projects in the in-memory
+Firestore and compares how get_user_stats and get_project_growth are
+computed: streaming every project document (the original approach), the
+"scan" strategy (field-projected stream), the "aggregate" strategy
+(server-side count/sum queries) and the "materialized" stats and daily
+growth documents.
+Reports latency, billed reads and bytes returned per call.
+
+Usage (from backend/):
+    python -m benchmarks.dashboard_stats --latency 0.005 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import auth
+from benchmarks.fake_firestore import FakeFirestore
+from benchmarks.model_parsing import large_deconstruction
+
+import firestore_utils
+
+UID = "bench-user"
+
+
+async def stream_everything_stats(uid: str):
+    """get_user_stats as it was before the strategies existed"""
+    projects_ref = auth.db.collection('users').document(uid).collection('projects')
+    total_projects = total_streams = total_score = active_count = 0
+    async for project in projects_ref.stream():
+        data = project.to_dict()
+        total_projects += 1
+        total_streams += data.get('revenue_streams_count') or 0
+        total_score += data.get('overall_score') or 0
+        active_count += data.get('status') == 'active'
+    return {
+        "ideas_analyzed": total_projects,
+        "revenue_streams": total_streams,
+        "success_rate": round(total_score / total_projects, 1) if total_projects else 0,
+        "active_projects": active_count,
+    }
+
+
+def seed(db: FakeFirestore, count: int):
+    db._collections.clear()
+    template = json.loads(large_deconstruction(1))
+    now = datetime.now(timezone.utc)
+    rng = random.Random(count)
+    projects_ref = db.collection('users').document(UID).collection('projects')
+    for i in range(count):
+        project = dict(template, name=f"Idea {i}", overall_score=rng.randint(40, 95),
+                       revenue_streams_count=rng.randint(1, 6),
+                       status=rng.choice(['active', 'active', 'archived']),
+                       created_at=now - timedelta(days=rng.randint(0, 365), minutes=i))
+        projects_ref.document(f"p{i}")._apply_set(project)
+
+
+async def measure(db: FakeFirestore, call, repeat: int):
+    result = await call()
+    reads, bytes_read = db.reads, db.bytes_read
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await call()
+    elapsed = (time.perf_counter() - start) / repeat
+    return result, elapsed, (db.reads - reads) / repeat, (db.bytes_read - bytes_read) / repeat
+
+
+async def run(sizes, latency: float, repeat: int):
+    db = FakeFirestore(latency=latency)
+    auth.db = db
+    cases = [
+        ("stats", "stream-everything", lambda: stream_everything_stats(UID)),
+        ("stats", "scan", lambda: firestore_utils.get_user_stats(UID, strategy="scan")),
+        ("stats", "aggregate", lambda: firestore_utils.get_user_stats(UID, strategy="aggregate")),
+        ("stats", "materialized", lambda: firestore_utils.get_user_stats(UID, strategy="materialized")),
+        ("growth", "stream-everything", lambda: firestore_utils.get_project_growth(UID, strategy="scan")),
+        ("growth", "aggregate", lambda: firestore_utils.get_project_growth(UID, strategy="aggregate")),
+        ("growth", "materialized", lambda: firestore_utils.get_project_growth(UID, strategy="materialized")),
+    ]
+    print(f"\n{'projects':>8}  {'call':<7}{'strategy':<19}{'ms':>9}{'reads':>8}{'bytes':>11}")
+    for size in sizes:
+        seed(db, size)
+        results = {}
+        for call_name, strategy, call in cases:
+            if call_name == "stats" and strategy == "aggregate":
+                # Aggregation is the path for users without a stats document
+                await db.document(f"users/{UID}/stats/projects").delete()
+            result, elapsed, reads, bytes_read = await measure(db, call, repeat)
+            results[(call_name, strategy)] = result
+            print(f"{size:>8}  {call_name:<7}{strategy:<19}{elapsed * 1000:>9.1f}{reads:>8.0f}{bytes_read:>11.0f}")
+        for name in ("stats", "growth"):
+            outputs = [r for (call_name, _), r in results.items() if call_name == name]
+            assert all(r == outputs[0] for r in outputs), f"{name} results differ"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000", help="Projects per user, comma separated")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds added to every Firestore round trip")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run([int(s) for s in args.sizes.split(",")], args.latency, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
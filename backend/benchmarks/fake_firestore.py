@@ -0,0 +1,456 @@
+"""
+In-memory stand-in for the subset of the google-cloud-firestore AsyncClient
+API that firestore_utils and auth use, for load tests and benchmarks.
+
+    import auth
+    auth.db = FakeFirestore(latency=0.005)
+
+Documents are deep-copied in and out like real reads and writes.
+SERVER_TIMESTAMP, Increment, ArrayUnion, ArrayRemove and DELETE_FIELD are
+applied on write. `latency` is added to every round trip as an awaited
+delay; with `blocking=True` it blocks the event loop instead, the way the
+synchronous client did, for before/after comparisons.
+
+count()/sum()/avg() aggregation queries are evaluated in memory. Reads are
+tallied the way Firestore bills them (one per document returned, one per
+1,000 index entries an aggregation scans, at least one per query) along
+with the approximate bytes returned, so strategies can be compared.
+
+Transactions work with firestore.async_transactional. A transaction's first
+read locks the top-level document it falls under (e.g. users/{uid}) until
+it commits, so transactions on the same user are serialized and see a
+consistent view, and their writes are applied together on commit.
+"""
+import asyncio
+import copy
+import json
+import math
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.base_aggregation import AggregationResult
+
+_MISSING = object()
+
+
+def _get_field(data: Dict, path: str):
+    value = data
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set_field(data: Dict, path: str, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        data = data.setdefault(part, {})
+    if value is transforms.DELETE_FIELD:
+        data.pop(parts[-1], None)
+    else:
+        data[parts[-1]] = value
+
+
+def _resolve(value, current):
+    """Apply a write transform given the field's current value"""
+    if value is transforms.SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, transforms.Increment):
+        base = current if isinstance(current, (int, float)) else 0
+        return base + value.value
+    if isinstance(value, transforms.ArrayUnion):
+        base = list(current) if isinstance(current, list) else []
+        return base + [v for v in value.values if v not in base]
+    if isinstance(value, transforms.ArrayRemove):
+        base = list(current) if isinstance(current, list) else []
+        return [v for v in base if v not in value.values]
+    if isinstance(value, dict):
+        return {k: _resolve(v, (current or {}).get(k) if isinstance(current, dict) else None) for k, v in value.items()}
+    return copy.deepcopy(value)
+
+
+def _payload_size(data) -> int:
+    return len(json.dumps(data, default=str))
+
+
+def _project(data: Dict, field_paths: List[str]) -> Dict:
+    """Keep only the given fields, like a Firestore field mask"""
+    projected = {}
+    for path in field_paths:
+        value = _get_field(data, path)
+        if value is not _MISSING:
+            _set_field(projected, path, copy.deepcopy(value))
+    return projected
+
+
+class DocumentSnapshot:
+    def __init__(self, reference: "DocumentReference", data: Optional[Dict]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict]:
+        return copy.deepcopy(self._data)
+
+    def get(self, field_path: str):
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class DocumentReference:
+    def __init__(self, db: "FakeFirestore", collection_path: str, doc_id: str):
+        self._db = db
+        self._collection_path = collection_path
+        self.id = doc_id
+        self.path = f"{collection_path}/{doc_id}"
+
+    @property
+    def parent(self) -> "CollectionReference":
+        return CollectionReference(self._db, self._collection_path)
+
+    def collection(self, name: str) -> "CollectionReference":
+        return CollectionReference(self._db, f"{self.path}/{name}")
+
+    def _docs(self) -> Dict[str, Dict]:
+        return self._db._collections.setdefault(self._collection_path, {})
+
+    async def get(self, field_paths: List[str] = None, *args, transaction=None, **kwargs) -> DocumentSnapshot:
+        if transaction is not None:
+            await transaction._lock(self.path)
+        await self._db._round_trip()
+        data = self._docs().get(self.id)
+        if data is not None and field_paths is not None:
+            data = _project(data, field_paths)
+        self._db._record_read(data)
+        return DocumentSnapshot(self, copy.deepcopy(data))
+
+    async def set(self, data: Dict, merge: bool = False):
+        await self._db._round_trip()
+        self._apply_set(data, merge)
+
+    async def update(self, data: Dict):
+        await self._db._round_trip()
+        self._apply_update(data)
+
+    async def delete(self):
+        await self._db._round_trip()
+        self._docs().pop(self.id, None)
+
+    def _apply_set(self, data: Dict, merge: bool = False):
+        docs = self._docs()
+        if merge and self.id in docs:
+            self._write_fields(docs[self.id], data)
+        else:
+            docs[self.id] = {}
+            self._write_fields(docs[self.id], data)
+
+    def _apply_update(self, data: Dict):
+        docs = self._docs()
+        if self.id not in docs:
+            raise KeyError(f"No document to update: {self.path}")
+        for path, value in data.items():
+            current = _get_field(docs[self.id], path)
+            _set_field(docs[self.id], path, _resolve(value, None if current is _MISSING else current))
+
+    @staticmethod
+    def _write_fields(target: Dict, data: Dict):
+        for key, value in data.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                DocumentReference._write_fields(target[key], value)
+            elif value is transforms.DELETE_FIELD:
+                target.pop(key, None)
+            else:
+                target[key] = _resolve(value, target.get(key))
+
+
+class Query:
+    _OPS = {
+        "==": lambda a, b: a == b,
+        "!=": lambda a, b: a != b,
+        "<": lambda a, b: a < b,
+        "<=": lambda a, b: a <= b,
+        ">": lambda a, b: a > b,
+        ">=": lambda a, b: a >= b,
+        "in": lambda a, b: a in b,
+        "not-in": lambda a, b: a not in b,
+        "array_contains": lambda a, b: isinstance(a, list) and b in a,
+        "array_contains_any": lambda a, b: isinstance(a, list) and any(v in a for v in b),
+    }
+
+    def __init__(self, db: "FakeFirestore", collection_path: str, filters=None, orders=None, limit_count=None,
+                 fields=None, offset_count=0):
+        self._db = db
+        self._collection_path = collection_path
+        self._filters = filters or []
+        self._orders = orders or []
+        self._limit = limit_count
+        self._fields = fields
+        self._offset = offset_count
+
+    def _copy(self, **changes) -> "Query":
+        state = {
+            "filters": list(self._filters), "orders": list(self._orders), "limit_count": self._limit,
+            "fields": self._fields, "offset_count": self._offset,
+        }
+        state.update(changes)
+        return Query(self._db, self._collection_path, **state)
+
+    def where(self, field_path: str = None, op_string: str = None, value=None, filter=None) -> "Query":
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + [(field_path, op_string, value)])
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "Query":
+        return self._copy(orders=self._orders + [(field_path, direction)])
+
+    def limit(self, count: int) -> "Query":
+        return self._copy(limit_count=count)
+
+    def offset(self, count: int) -> "Query":
+        return self._copy(offset_count=count)
+
+    def select(self, field_paths: List[str]) -> "Query":
+        return self._copy(fields=list(field_paths))
+
+    def _matches(self) -> List[tuple]:
+        docs = self._db._collections.get(self._collection_path, {})
+        results = []
+        for doc_id, data in docs.items():
+            ok = True
+            for path, op, value in self._filters:
+                current = _get_field(data, path)
+                try:
+                    if current is _MISSING or not self._OPS[op](current, value):
+                        ok = False
+                except TypeError:
+                    ok = False
+                if not ok:
+                    break
+            # Documents without an ordered-by field are left out, as in Firestore
+            if ok and all(_get_field(data, path) is not _MISSING for path, _ in self._orders):
+                results.append((doc_id, data))
+        for path, direction in reversed(self._orders):
+            results.sort(key=lambda item: _get_field(item[1], path), reverse=(direction == "DESCENDING"))
+        results = results[self._offset:]
+        if self._limit is not None:
+            results = results[:self._limit]
+        return results
+
+    def _snapshot(self, doc_id: str, data: Dict) -> DocumentSnapshot:
+        if self._fields is not None:
+            data = _project(data, self._fields)
+        return DocumentSnapshot(DocumentReference(self._db, self._collection_path, doc_id), copy.deepcopy(data))
+
+    async def stream(self, *args, transaction=None, **kwargs):
+        if transaction is not None:
+            await transaction._lock(self._collection_path)
+        await self._db._round_trip()
+        matches = self._matches()
+        if not matches:
+            self._db._record_read(None)
+        for doc_id, data in matches:
+            snapshot = self._snapshot(doc_id, data)
+            self._db._record_read(snapshot._data)
+            yield snapshot
+
+    async def get(self, *args, **kwargs) -> List[DocumentSnapshot]:
+        return [snapshot async for snapshot in self.stream()]
+
+    def count(self, alias: str = None) -> "AggregationQuery":
+        return AggregationQuery(self).count(alias)
+
+    def sum(self, field_ref: str, alias: str = None) -> "AggregationQuery":
+        return AggregationQuery(self).sum(field_ref, alias)
+
+    def avg(self, field_ref: str, alias: str = None) -> "AggregationQuery":
+        return AggregationQuery(self).avg(field_ref, alias)
+
+
+class AggregationQuery:
+    def __init__(self, query: Query):
+        self._query = query
+        self._aggregations = []
+
+    def _add(self, kind: str, field_ref: Optional[str], alias: Optional[str]) -> "AggregationQuery":
+        self._aggregations.append((kind, field_ref, alias or f"field_{len(self._aggregations) + 1}"))
+        return self
+
+    def count(self, alias: str = None) -> "AggregationQuery":
+        return self._add("count", None, alias)
+
+    def sum(self, field_ref: str, alias: str = None) -> "AggregationQuery":
+        return self._add("sum", field_ref, alias)
+
+    def avg(self, field_ref: str, alias: str = None) -> "AggregationQuery":
+        return self._add("avg", field_ref, alias)
+
+    async def get(self, *args, **kwargs) -> List[List[AggregationResult]]:
+        db = self._query._db
+        await db._round_trip()
+        matches = [data for _, data in self._query._matches()]
+        read_time = datetime.now(timezone.utc)
+        results = []
+        for kind, field_ref, alias in self._aggregations:
+            if kind == "count":
+                value = len(matches)
+            else:
+                # Like Firestore, only numeric values take part
+                numbers = [v for v in (_get_field(d, field_ref) for d in matches)
+                           if isinstance(v, (int, float)) and not isinstance(v, bool)]
+                if kind == "sum":
+                    value = sum(numbers)
+                else:
+                    value = sum(numbers) / len(numbers) if numbers else None
+            results.append(AggregationResult(alias=alias, value=value, read_time=read_time))
+        db.reads += max(1, math.ceil(len(matches) / 1000))
+        db.bytes_read += _payload_size({r.alias: r.value for r in results})
+        return [results]
+
+
+class CollectionReference(Query):
+    def __init__(self, db: "FakeFirestore", path: str):
+        super().__init__(db, path)
+        self.id = path.rsplit("/", 1)[-1]
+
+    def document(self, doc_id: str = None) -> DocumentReference:
+        return DocumentReference(self._db, self._collection_path, doc_id or uuid.uuid4().hex[:20])
+
+    async def add(self, data: Dict, document_id: str = None):
+        ref = self.document(document_id)
+        await ref.set(data)
+        return datetime.now(timezone.utc), ref
+
+    async def list_documents(self, *args, **kwargs):
+        await self._db._round_trip()
+        # Parents of subcollections are listed even when they have no data
+        prefix = f"{self._collection_path}/"
+        ids = set(self._db._collections.get(self._collection_path, {}))
+        ids.update(path[len(prefix):].split("/", 1)[0] for path in self._db._collections if path.startswith(prefix))
+        for doc_id in sorted(ids):
+            yield self.document(doc_id)
+
+
+class WriteBatch:
+    def __init__(self, db: "FakeFirestore"):
+        self._db = db
+        self._writes = []
+
+    def set(self, reference: DocumentReference, data: Dict, merge: bool = False):
+        self._writes.append(lambda: reference._apply_set(data, merge))
+
+    def update(self, reference: DocumentReference, data: Dict):
+        self._writes.append(lambda: reference._apply_update(data))
+
+    def delete(self, reference: DocumentReference):
+        self._writes.append(lambda: reference._docs().pop(reference.id, None))
+
+    async def commit(self):
+        await self._db._round_trip()
+        for write in self._writes:
+            write()
+        self._writes = []
+
+
+class Transaction(WriteBatch):
+    """Subset of AsyncTransaction that firestore.async_transactional drives"""
+
+    def __init__(self, db: "FakeFirestore", max_attempts: int = 5, read_only: bool = False):
+        super().__init__(db)
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id = None
+        self._held = []
+
+    def _clean_up(self):
+        self._writes = []
+        self._id = None
+
+    async def _lock(self, path: str):
+        key = "/".join(path.split("/")[:2])
+        if key not in self._held:
+            await self._db._transaction_locks.setdefault(key, asyncio.Lock()).acquire()
+            self._held.append(key)
+
+    async def _begin(self, retry_id: bytes = None):
+        await self._db._round_trip()
+        self._id = uuid.uuid4().bytes
+
+    async def _commit(self) -> list:
+        try:
+            await self.commit()
+        finally:
+            self._release()
+        return []
+
+    async def _rollback(self):
+        self._writes = []
+        self._release()
+
+    def _release(self):
+        self._id = None
+        for key in self._held:
+            self._db._transaction_locks[key].release()
+        self._held = []
+
+    async def get(self, ref_or_query):
+        if isinstance(ref_or_query, DocumentReference):
+            snapshot = await ref_or_query.get(transaction=self)
+
+            async def single():
+                yield snapshot
+            return single()
+        return ref_or_query.stream(transaction=self)
+
+
+class FakeFirestore:
+    def __init__(self, latency: float = 0.0, blocking: bool = False):
+        self.latency = latency
+        self.blocking = blocking
+        self._collections: Dict[str, Dict[str, Dict]] = {}
+        self._transaction_locks: Dict[str, asyncio.Lock] = {}
+        self.round_trips = 0
+        self.reads = 0
+        self.bytes_read = 0
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        if self.latency and self.blocking:
+            time.sleep(self.latency)
+        elif self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _record_read(self, data: Optional[Dict]):
+        self.reads += 1
+        if data is not None:
+            self.bytes_read += _payload_size(data)
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self, name)
+
+    def document(self, path: str) -> DocumentReference:
+        collection_path, _, doc_id = path.rpartition("/")
+        return DocumentReference(self, collection_path, doc_id)
+
+    def batch(self) -> WriteBatch:
+        return WriteBatch(self)
+
+    def transaction(self, **kwargs) -> Transaction:
+        return Transaction(self, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "documents": sum(len(docs) for docs in self._collections.values()),
+            "round_trips": self.round_trips,
+            "reads": self.reads,
+            "bytes_read": self.bytes_read,
+        }
@@ -0,0 +1,228 @@
+"""
+Local OpenRouter stand-in: an OpenAI-compatible chat completions server that
+serves recorded completions, for offline benchmarks and regression runs.
+
+Responses come from a JSONL corpus written by the engine's record mode
+(LLM_RECORD_PATH). A request is answered with the recording of the exact
+same prompt if there is one, otherwise with a random recording of the same
+prompt template (X-Prompt-Template header), otherwise with the engine's
+mock data. Latency, streaming pace and faults (HTTP errors, malformed JSON,
+hangs) are configurable and seeded, so runs are reproducible.
+
+Usage (from backend/):
+    python -m benchmarks.fake_openrouter --corpus recordings.jsonl --latency lognormal --latency-median 2 \\
+        --error-rate 0.02 --malformed-rate 0.1 --port 8765
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/v1 OPENROUTER_API_KEY=fake uvicorn main:app
+
+The settings can also be changed at runtime with POST /_config (JSON body
+with any of the FakeConfig fields); GET /_stats returns request counters.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from prompts import count_tokens
+
+
+@dataclass
+class FakeConfig:
+    latency: str = "fixed"          # fixed, uniform, lognormal or replay (recorded latency)
+    latency_median: float = 0.5     # seconds; the fixed value, or the lognormal median
+    latency_sigma: float = 0.5      # lognormal shape; uniform spans median * (1 +/- sigma)
+    ttft_fraction: float = 0.1      # share of the latency spent before the first streamed chunk
+    chunk_chars: int = 16
+    error_rate: float = 0.0         # HTTP 500/429/503 responses
+    malformed_rate: float = 0.0     # fenced, truncated or otherwise broken JSON
+    hang_rate: float = 0.0          # never answer within hang_seconds (to exercise timeouts)
+    hang_seconds: float = 300.0
+    seed: Optional[int] = None
+
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class Corpus:
+    def __init__(self, entries: List[Dict]):
+        self.by_prompt = {}
+        self.by_template = defaultdict(list)
+        for entry in entries:
+            self.by_prompt[_prompt_hash(entry["prompt"])] = entry
+            if entry.get("template"):
+                self.by_template[entry["template"].split("@")[0]].append(entry)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "Corpus":
+        entries = []
+        if path:
+            with open(path, encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        return cls(entries)
+
+    def __len__(self):
+        return len(self.by_prompt)
+
+    def lookup(self, prompt: str, template: str, rng: random.Random) -> Optional[Dict]:
+        exact = self.by_prompt.get(_prompt_hash(prompt))
+        if exact:
+            return exact
+        candidates = self.by_template.get(template)
+        return rng.choice(candidates) if candidates else None
+
+
+def _malform(text: str, rng: random.Random) -> str:
+    """Apply one of the defects models actually produce"""
+    defect = rng.choice(["fence", "truncate", "trailing_comma", "prose", "empty"])
+    if defect == "fence":
+        return f"Here is the analysis you asked for:\n```json\n{text}\n```"
+    if defect == "truncate":
+        return text[: max(1, int(len(text) * rng.uniform(0.3, 0.9)))]
+    if defect == "trailing_comma":
+        return text.replace("}", ",}", 1).replace("]", ",]", 1)
+    if defect == "prose":
+        return "I'm sorry, I can't help with that request."
+    return ""
+
+
+def create_app(config: FakeConfig = None, corpus: Corpus = None) -> FastAPI:
+    config = config or FakeConfig()
+    corpus = corpus or Corpus([])
+    rng = random.Random(config.seed)
+    stats = defaultdict(int)
+    app = FastAPI(title="Fake OpenRouter")
+    app.state.config = config
+    app.state.stats = stats
+
+    def sample_latency(entry: Optional[Dict]) -> float:
+        if config.latency == "replay" and entry and entry.get("latency_s") is not None:
+            return entry["latency_s"]
+        if config.latency == "uniform":
+            return max(0.0, rng.uniform(config.latency_median * (1 - config.latency_sigma),
+                                        config.latency_median * (1 + config.latency_sigma)))
+        if config.latency == "lognormal":
+            return rng.lognormvariate(0, config.latency_sigma) * config.latency_median
+        return config.latency_median
+
+    def default_response(template: str) -> str:
+        from engine import _stub_response
+        return _stub_response({"extra_headers": {"X-Prompt-Template": template}})
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = "\n".join(m.get("content") or "" for m in body.get("messages", []))
+        template = request.headers.get("X-Prompt-Template", "").split("@")[0]
+        stats["requests"] += 1
+
+        roll = rng.random()
+        if roll < config.error_rate:
+            stats["errors"] += 1
+            status = rng.choice([500, 429, 503])
+            return JSONResponse({"error": {"message": "Injected provider error", "code": status}}, status_code=status)
+        roll -= config.error_rate
+        if roll < config.hang_rate:
+            stats["hangs"] += 1
+            await asyncio.sleep(config.hang_seconds)
+        roll -= config.hang_rate
+
+        entry = corpus.lookup(prompt, template, rng)
+        stats["replayed" if entry else "defaulted"] += 1
+        content = entry["response"] if entry else default_response(template)
+        if roll < config.malformed_rate:
+            stats["malformed"] += 1
+            content = _malform(content, rng)
+
+        latency = sample_latency(entry)
+        model = body.get("model", "fake")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        usage = {
+            "prompt_tokens": count_tokens(prompt),
+            "completion_tokens": count_tokens(content),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+        chunks = [content[i:i + config.chunk_chars] for i in range(0, len(content), config.chunk_chars)] or [""]
+
+        def sse(delta: Dict, finish_reason=None, chunk_usage=None) -> str:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+            }
+            if chunk_usage:
+                chunk["usage"] = chunk_usage
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        async def stream():
+            await asyncio.sleep(latency * config.ttft_fraction)
+            interval = latency * (1 - config.ttft_fraction) / len(chunks)
+            for i, piece in enumerate(chunks):
+                yield sse({"role": "assistant", "content": piece} if i == 0 else {"content": piece})
+                await asyncio.sleep(interval)
+            yield sse({}, finish_reason="stop")
+            if include_usage:
+                yield sse(None, chunk_usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/chat/completions", chat_completions, methods=["POST"])
+
+    @app.post("/_config")
+    async def update_config(values: Dict):
+        for field in fields(FakeConfig):
+            if field.name in values:
+                setattr(config, field.name, values[field.name])
+        if "seed" in values:
+            rng.seed(config.seed)
+        return asdict(config)
+
+    @app.get("/_stats")
+    async def get_stats():
+        return {"corpus_entries": len(corpus), **stats}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSONL file written with LLM_RECORD_PATH")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    for field in fields(FakeConfig):
+        flag = "--" + field.name.replace("_", "-")
+        kind = int if field.name in ("chunk_chars", "seed") else (str if field.name == "latency" else float)
+        parser.add_argument(flag, type=kind, default=field.default)
+    args = parser.parse_args()
+
+    import uvicorn
+    config = FakeConfig(**{f.name: getattr(args, f.name) for f in fields(FakeConfig)})
+    uvicorn.run(create_app(config, Corpus.load(args.corpus)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
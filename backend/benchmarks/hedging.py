@@ -0,0 +1,117 @@
+"""
+Hedged request benchmark.
+
+Runs pivot analyses against two offline stub providers: a primary whose
+latency has a heavy tail (a fraction of requests are much slower) and a
+steady alternate model. Compares end-to-end latency percentiles with
+hedging disabled (single model) and enabled (auto hedge delay from the
+primary's observed latency).
+
+The "repair" case hedges the same way but both models leave a field out of
+every pivot analysis, so each request also makes a field-repair
+completion. Repair time must not feed the providers' latency history: the
+hedge delay and timeout it reports should match the plain hedged case.
+
+Usage (from backend/):
+    python -m benchmarks.hedging --requests 500 --slow-fraction 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import engine
+from providers import ProviderPool, StubProvider
+
+
+REPAIRED_FIELD = "risk_level"
+
+
+class TailLatencyStub(StubProvider):
+    def __init__(self, name, latency, slow_latency, slow_fraction, repair_latency=None):
+        super().__init__(name, responder=engine._stub_response, latency=latency)
+        self.slow_latency = slow_latency
+        self.slow_fraction = slow_fraction
+        # Set to leave REPAIRED_FIELD out and answer repairs after this many seconds
+        self.repair_latency = repair_latency
+
+    async def _respond(self, request):
+        template = request["extra_headers"].get("X-Prompt-Template", "").split("@")[0]
+        pivot = json.loads(engine._get_mock_pivot_data("Stub pivot").model_dump_json())
+        if template == "field_repair":
+            await asyncio.sleep(self.repair_latency)
+            return json.dumps({REPAIRED_FIELD: pivot[REPAIRED_FIELD]})
+        slow = random.random() < self.slow_fraction
+        await asyncio.sleep(self.slow_latency if slow else self.delay * random.uniform(0.8, 1.2))
+        if self.repair_latency is None:
+            return self.responder(request)
+        del pivot[REPAIRED_FIELD]
+        return json.dumps(pivot)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+async def run(mode: str, args):
+    hedged = mode != "single"
+    repair_latency = args.repair_latency if mode == "repair" else None
+    primary = TailLatencyStub("primary", args.latency, args.slow_latency, args.slow_fraction, repair_latency)
+    providers = [primary]
+    if hedged:
+        providers.append(TailLatencyStub("alternate", args.latency * 1.5, args.slow_latency, args.slow_fraction,
+                                         repair_latency))
+    # Until enough samples exist the hedge delay is the max; keep it below the tail
+    engine.llm_providers = ProviderPool(providers, min_hedge_delay=0.01, max_hedge_delay=args.slow_latency / 2)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            # Unique pivot names so single-flight doesn't coalesce requests
+            await engine.generate_pivot_analysis("Benchmark idea", f"Pivot {i}", "USD")
+            return time.perf_counter() - start
+
+    repairs = engine.field_repair_stats["succeeded"]
+    latencies = await asyncio.gather(*[one(i) for i in range(args.requests)])
+    pool = engine.llm_providers
+    return {
+        "mode": mode,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "hedges": pool.hedges,
+        "hedge_wins": pool.hedge_wins,
+        "repairs": engine.field_repair_stats["succeeded"] - repairs,
+        "hedge_delay_ms": pool.hedge_delay(primary) * 1000 if hedged else 0,
+        "timeout_s": pool.timeout(primary),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="Typical completion time in seconds")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="Completion time of slow requests")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--repair-latency", type=float, default=0.05, help="Field-repair completion time in the repair case")
+    args = parser.parse_args()
+
+    # Keep the per-request DEBUG output out of the report
+    engine.print = lambda *a, **k: None
+
+    results = [asyncio.run(run(mode, args)) for mode in ("single", "hedged", "repair")]
+
+    print(f"\n{'mode':<8}{'p50':>10}{'p95':>10}{'p99':>10}{'hedges':>8}{'won':>6}{'repairs':>9}{'delay':>10}{'timeout':>9}")
+    for r in results:
+        print(f"{r['mode']:<8}{r['p50_ms']:>8.1f}ms{r['p95_ms']:>8.1f}ms{r['p99_ms']:>8.1f}ms{r['hedges']:>8}{r['hedge_wins']:>6}"
+              f"{r['repairs']:>9}{r['hedge_delay_ms']:>8.1f}ms{r['timeout_s']:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Corpus benchmark for the tolerant model-output JSON parser.
+
+Builds a corpus of realistic malformed responses from the three engine
+schemas (markdown fences, prose around the JSON, copied // schema comments,
+trailing commas, raw newlines in strings, truncated tails, ...) and compares
+the old strip-fence + json.loads path with json_repair.parse_model_json.
+
+Each case records whether the repaired document is expected to validate
+against its Pydantic model; the script exits non-zero if one of those
+regresses, so it doubles as a corpus check.
+
+Usage (from backend/):
+    python -m benchmarks.json_repair_corpus --repeat 200
+"""
+import argparse
+import json
+import re
+import sys
+import time
+
+import engine
+from json_repair import parse_model_json
+from models import DeconstructionResult, PivotAnalysisResult, DiagnosisResult
+
+
+def legacy_parse(text):
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return json.loads(text)
+
+
+def documents():
+    return [
+        ("deconstruction", DeconstructionResult, engine._get_mock_data("Soap brand", "NGN").model_dump(exclude={"project_id", "name"})),
+        ("pivot", PivotAnalysisResult, engine._get_mock_pivot_data("Soap-making classes").model_dump()),
+        ("diagnosis", DiagnosisResult, engine._get_mock_diagnosis_data().model_dump()),
+    ]
+
+
+def mutations(doc):
+    """(name, text, expect_valid) variants of one document"""
+    pretty = json.dumps(doc, indent=2, ensure_ascii=False)
+    first_list = next((k for k, v in doc.items() if isinstance(v, list)), None)
+    last_key = list(doc)[-1]
+
+    yield "clean", pretty, True
+    yield "json_fence", f"```json\n{pretty}\n```", True
+    yield "bare_fence", f"```\n{pretty}\n```", True
+    yield "fence_with_prose", f"Here is the analysis you asked for:\n\n```json\n{pretty}\n```\n\nLet me know if you need changes!", True
+    yield "trailing_prose", f"{pretty}\n\nI hope this helps your entrepreneurial journey!", True
+    yield "leading_prose", f"Sure! {pretty}", True
+    yield "trailing_commas", re.sub(r'(["\d\]}])(\n\s*[\]}])', r"\1,\2", pretty), True
+    if first_list:
+        yield "schema_comment", pretty.replace(f'"{first_list}": [', f'"{first_list}": [ // exactly 7 objects', 1), True
+    yield "inline_comment", pretty.replace(f'"{last_key}"', f'// {last_key} follows\n  "{last_key}"', 1), True
+    yield "raw_newlines", pretty.replace(". ", ".\n", 3) if ". " in pretty else pretty.replace('": "', '": "\n', 1), True
+    yield "python_literals", pretty.replace("null", "None"), True
+    yield "fence_and_commas", "```json\n" + re.sub(r'(["\d\]}])(\n\s*[\]}])', r"\1,\2", pretty) + "\n```", True
+    # Truncation keeps the prefix; validity then depends on which fields survived
+    for fraction in (0.98, 0.9, 0.6):
+        yield f"truncated_{int(fraction * 100)}", pretty[:int(len(pretty) * fraction)], False
+    # Cut off inside a trailing value: a lone sign or a partial literal is dropped with its key
+    head = pretty.rstrip()[:-1].rstrip()
+    for label, token in (("minus", "-"), ("plus", "+"), ("true", "tru"), ("false", "fals"), ("null", "nul")):
+        yield f"truncated_{label}", f'{head},\n  "verified": {token}', True
+    yield "schema_echo", pretty.replace(f'"{last_key}": ', f'"{last_key}": int, "_": ', 1), False
+
+
+def try_parse(parse, text, model):
+    try:
+        data = parse(text)
+    except ValueError:
+        return False, False
+    try:
+        model(**data)
+        return True, True
+    except Exception:
+        return True, False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Parses per case for timing")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    corpus = [
+        (f"{name}/{mutation}", model, text, expect)
+        for name, model, doc in documents()
+        for mutation, text, expect in mutations(doc)
+    ]
+
+    legacy_valid = repaired_json = repaired_valid = 0
+    regressions = []
+    strict_cost, repair_cost = [], []
+
+    for case, model, text, expect in corpus:
+        _, old_ok = try_parse(legacy_parse, text, model)
+        json_ok, new_ok = try_parse(parse_model_json, text, model)
+        legacy_valid += old_ok
+        repaired_json += json_ok
+        repaired_valid += new_ok
+        if expect and not new_ok:
+            regressions.append(case)
+
+        if json_ok:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                parse_model_json(text)
+            cost = (time.perf_counter() - start) / args.repeat * 1e6
+            (strict_cost if old_ok and case.endswith("/clean") else repair_cost).append(cost)
+
+        if args.verbose:
+            print(f"  {case:<40} legacy={'ok' if old_ok else '--'}  repaired={'ok' if new_ok else ('json' if json_ok else '--')}")
+
+    total = len(corpus)
+    print(f"\ncorpus: {total} responses")
+    print(f"  legacy parser valid:           {legacy_valid:>4} ({legacy_valid / total:.0%})")
+    print(f"  repair parser JSON recovered:  {repaired_json:>4} ({repaired_json / total:.0%})")
+    print(f"  repair parser valid:           {repaired_valid:>4} ({repaired_valid / total:.0%})")
+    print(f"  full retries eliminated:       {repaired_valid - legacy_valid:>4}")
+    if strict_cost:
+        print(f"  parse cost, well-formed:       {sum(strict_cost) / len(strict_cost):>7.1f}us")
+    if repair_cost:
+        print(f"  parse cost, repaired (avg):    {sum(repair_cost) / len(repair_cost):>7.1f}us  (max {max(repair_cost):.1f}us)")
+
+    if regressions:
+        print(f"\nFAILED: expected-valid cases not recovered: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+End-to-end load test for the FastAPI app.
+
+Virtual users run realistic sessions against main.app in-process: sync,
+deconstruct, dashboard overview, project fetch, pivot creation, strategy
+board reads (pivots + strategies) and an action toggle. Firestore is the
+in-memory fake from benchmarks.fake_firestore and the LLM is an offline
+stub provider, both with configurable latency, so the numbers measure the
+app itself (event loop, serialization, data layer round trips).
+--blocking-firestore makes every Firestore round trip block the event loop,
+as the synchronous client did, to compare against the async data layer.
+
+Writes a JSON report with p50/p95/p99 latency, throughput and error rate
+per route. With --baseline, exits 1 if any route's p95 or error rate
+regressed beyond --tolerance compared to an earlier report.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest --users 20 --sessions 200 --output report.json
+    python -m benchmarks.loadtest --users 20 --sessions 200 --baseline report.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Annotated
+
+import httpx
+from fastapi import Header
+
+import auth
+import engine
+import main
+from benchmarks.fake_firestore import FakeFirestore
+from providers import ProviderPool, StubProvider
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+async def fake_token(authorization: Annotated[str, Header()]):
+    # "Bearer <uid>": each virtual user is its own account
+    uid = authorization.split(" ")[-1]
+    return {"uid": uid, "email": f"{uid}@loadtest.local", "name": uid}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, route: str, request):
+        start = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+        self.latencies[route].append(time.perf_counter() - start)
+        if not ok:
+            self.errors[route] += 1
+        return response if ok else None
+
+
+async def session(http: httpx.AsyncClient, recorder: Recorder, uid: str, n: int):
+    headers = {"Authorization": f"Bearer {uid}"}
+    await recorder.call("POST /auth/sync", http.post("/auth/sync", headers=headers))
+
+    response = await recorder.call("POST /deconstruct", http.post(
+        "/deconstruct", json={"idea": f"Load test idea {uid} {n}", "currency": "USD"}, headers=headers,
+    ))
+    await recorder.call("GET /dashboard/overview", http.get("/dashboard/overview", headers=headers))
+    if response is None:
+        return
+    project = response.json()
+    project_id = project["project_id"]
+
+    await recorder.call("GET /dashboard/projects/{id}", http.get(f"/dashboard/projects/{project_id}", headers=headers))
+    await recorder.call("POST /pivots", http.post(
+        "/pivots", json={"project_id": project_id, "pivot_name": project["pivot_options"][0]}, headers=headers,
+    ))
+
+    pivots = await recorder.call("GET /pivots", http.get("/pivots", params={"project_id": project_id}, headers=headers))
+    await recorder.call("GET /strategies", http.get("/strategies", params={"project_id": project_id}, headers=headers))
+    if pivots is not None and pivots.json()["pivots"]:
+        pivot_id = pivots.json()["pivots"][0]["id"]
+        await recorder.call("PATCH /pivots/{id}/actions/{index}", http.patch(
+            f"/pivots/{pivot_id}/actions/0", json={"completed": True}, headers=headers,
+        ))
+    await recorder.call("GET /dashboard/overview", http.get("/dashboard/overview", headers=headers))
+
+
+async def run(args):
+    db = FakeFirestore(latency=args.firestore_latency, blocking=args.blocking_firestore)
+    auth.db = db
+    engine.llm_providers = ProviderPool([
+        StubProvider(responder=engine._stub_response, latency=args.llm_latency, jitter=args.llm_jitter),
+    ])
+    main.app.dependency_overrides[main.get_token] = fake_token
+    main.rate_limiter.requests_per_minute = float("inf")
+
+    recorder = Recorder()
+    remaining = iter(range(args.sessions))
+
+    async def virtual_user(user: int):
+        for n in remaining:
+            await session(http, recorder, f"loadtest-user-{user}", n)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*[virtual_user(u) for u in range(args.users)])
+        elapsed = time.perf_counter() - start
+
+    routes = {}
+    for route, samples in sorted(recorder.latencies.items()):
+        routes[route] = {
+            "requests": len(samples),
+            "errors": recorder.errors[route],
+            "error_rate": round(recorder.errors[route] / len(samples), 4),
+            "p50_ms": round(statistics.median(samples) * 1000, 2),
+            "p95_ms": round(percentile(samples, 95) * 1000, 2),
+            "p99_ms": round(percentile(samples, 99) * 1000, 2),
+            "throughput_rps": round(len(samples) / elapsed, 2),
+        }
+    total = sum(r["requests"] for r in routes.values())
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "elapsed_s": round(elapsed, 2),
+        "sessions_per_s": round(args.sessions / elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "error_rate": round(sum(r["errors"] for r in routes.values()) / max(total, 1), 4),
+        "firestore": db.stats(),
+        "routes": routes,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Routes whose p95 or error rate got worse than the baseline allows"""
+    regressions = []
+    for route, current in report["routes"].items():
+        before = baseline.get("routes", {}).get(route)
+        if not before:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"{route}: error rate {before['error_rate']} -> {current['error_rate']}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--sessions", type=int, default=100, help="Total sessions to run")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stub LLM completion time in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--firestore-latency", type=float, default=0.002, help="Delay per Firestore round trip")
+    parser.add_argument("--blocking-firestore", action="store_true", help="Block the event loop on each round trip")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p95 increase")
+    args = parser.parse_args()
+
+    # The app and engine log every request; keep the report readable
+    engine.print = main.print = lambda *a, **k: None
+    import firestore_utils
+    auth.print = firestore_utils.print = engine.print
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,68 @@
+"""
+Response parsing micro-benchmark.
+
+Compares the old per-response path (json.loads -> Model(**data) -> .dict()
+for the Firestore write) with the current one (model_validate_json straight
+from the response text -> model_dump) on a large deconstruction and a pivot
+analysis. Reports microseconds per response.
+
+Usage (from backend/):
+    python -m benchmarks.model_parsing --iterations 5000 --scale 4
+"""
+import argparse
+import json
+import timeit
+import warnings
+
+import engine
+from models import DeconstructionResult, PivotAnalysisResult
+
+
+def large_deconstruction(scale: int) -> str:
+    data = engine._get_mock_data("Benchmark idea").model_dump()
+    for element in data["elements"]:
+        element["description"] = " ".join([element["description"]] * 8 * scale)
+    data["gradual_funding_strategy"] *= 2 * scale
+    data["sustainability_roadmap"] *= 2 * scale
+    data["brand_and_community_expansion_tips"] *= 3 * scale
+    data["cheapest_entry_point"] = " ".join(["Start with a weekend market stall."] * 10 * scale)
+    return json.dumps(data)
+
+
+def pivot_response(scale: int) -> str:
+    data = engine._get_mock_pivot_data("Benchmark pivot").model_dump()
+    data["recommended_actions"] *= 2 * scale
+    data["milestones"] *= 2 * scale
+    return json.dumps(data)
+
+
+def old_path(model_cls, text: str):
+    return model_cls(**json.loads(text)).dict()
+
+
+def new_path(model_cls, text: str):
+    return model_cls.model_validate_json(text).model_dump()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--scale", type=int, default=4, help="How much to inflate the sample responses")
+    args = parser.parse_args()
+    # .dict() is deprecated in Pydantic v2; that's the point of the comparison
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    cases = [
+        ("deconstruction", DeconstructionResult, large_deconstruction(args.scale)),
+        ("pivot", PivotAnalysisResult, pivot_response(args.scale)),
+    ]
+    print(f"\n{'response':<16}{'bytes':>8}{'old us':>10}{'new us':>10}{'saved':>8}")
+    for name, model_cls, text in cases:
+        assert old_path(model_cls, text) == new_path(model_cls, text)
+        old = min(timeit.repeat(lambda: old_path(model_cls, text), number=args.iterations, repeat=3)) / args.iterations
+        new = min(timeit.repeat(lambda: new_path(model_cls, text), number=args.iterations, repeat=3)) / args.iterations
+        print(f"{name:<16}{len(text):>8}{old * 1e6:>10.1f}{new * 1e6:>10.1f}{(1 - new / old) * 100:>7.0f}%")
+
+
+if __name__ == "__main__":
+    main()
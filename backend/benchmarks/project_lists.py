@@ -0,0 +1,62 @@
+"""
+Project list payload benchmark.
+
+Seeds one user with full-size projects in the in-memory Firestore and
+compares get_user_projects reading complete documents with the summary
+field mask the list endpoints use. Reports latency, bytes read from
+Firestore and the size of the JSON response body.
+
+Usage (from backend/):
+    python -m benchmarks.project_lists --projects 200 --limits 5,10,50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import auth
+from benchmarks.dashboard_stats import UID, seed
+from benchmarks.fake_firestore import FakeFirestore
+
+import firestore_utils
+
+
+async def measure(db: FakeFirestore, limit: int, summary: bool, repeat: int):
+    projects = await firestore_utils.get_user_projects(UID, limit=limit, summary=summary)
+    bytes_read = db.bytes_read
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await firestore_utils.get_user_projects(UID, limit=limit, summary=summary)
+    elapsed = (time.perf_counter() - start) / repeat
+    return projects, elapsed, (db.bytes_read - bytes_read) / repeat
+
+
+async def run(count: int, limits, latency: float, repeat: int):
+    db = FakeFirestore(latency=latency)
+    auth.db = db
+    seed(db, count)
+    projects_ref = db.collection('users').document(UID).collection('projects')
+    for snapshot in await projects_ref.get():
+        snapshot.reference._apply_update({'updated_at': snapshot.get('created_at')})
+
+    print(f"\n{'limit':>6}  {'mode':<9}{'ms':>8}{'read bytes':>12}{'response bytes':>16}")
+    for limit in limits:
+        for summary in (False, True):
+            projects, elapsed, bytes_read = await measure(db, limit, summary, repeat)
+            body = len(json.dumps({"projects": projects}, default=str))
+            mode = "summary" if summary else "full"
+            print(f"{limit:>6}  {mode:<9}{elapsed * 1000:>8.1f}{bytes_read:>12.0f}{body:>16}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--limits", default="5,10,50", help="List sizes, comma separated")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds added to every Firestore round trip")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.projects, [int(l) for l in args.limits.split(",")], args.latency, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Token cost report for the prompt templates.
+
+Renders each template with representative values and prints, per template
+version, the static (cacheable) prefix size, the total input size against
+its budget, and an estimate of the output size from a typical response.
+Run it before and after editing a prompt to measure compaction wins;
+production usage per version is also tracked on /status.
+
+Usage (from backend/):
+    python -m benchmarks.prompt_budget
+"""
+import json
+
+import engine
+from prompts import DECONSTRUCTION, PIVOT, DIAGNOSIS, FIELD_REPAIR, build_context_digest, count_tokens
+
+IDEA = "Handmade organic soap brand selling through Instagram and local markets"
+
+
+def main():
+    deconstruction = engine._get_mock_data(IDEA, "NGN")
+    pivot = engine._get_mock_pivot_data("Soap-making workshops")
+    diagnosis = engine._get_mock_diagnosis_data()
+
+    context = build_context_digest(deconstruction.model_dump())
+
+    cases = [
+        (DECONSTRUCTION, dict(idea=IDEA, currency="NGN", reference=""), deconstruction),
+        (PIVOT, dict(original_idea=IDEA, pivot_name="Soap-making workshops", currency="NGN",
+                     project_context=context), pivot),
+        (DIAGNOSIS, dict(idea=IDEA, challenges="Sales have stalled after the first 3 months",
+                         currency="NGN", project_context=context), diagnosis),
+        (FIELD_REPAIR, None, None),
+    ]
+
+    print(f"\n{'template':<16}{'version':<14}{'prefix':>8}{'input':>8}{'budget':>8}{'output~':>9}{'budget':>8}")
+    for template, values, sample in cases:
+        if template is FIELD_REPAIR:
+            data = deconstruction.model_dump()
+            prompt = engine._build_field_repair_prompt(type(deconstruction), data, ["sustainability_roadmap"], IDEA)
+            report = {**template.report(**{k: "" for k in ("context", "fields", "rules", "valid_part", "schema")}),
+                      "input_tokens": count_tokens(prompt)}
+            output = count_tokens(json.dumps({"sustainability_roadmap": data["sustainability_roadmap"]}))
+        else:
+            report = template.report(**values)
+            output = count_tokens(sample.model_dump_json(indent=2))
+        print(f"{report['template']:<16}{report['version']:<14}{report['prefix_tokens']:>8}{report['input_tokens']:>8}"
+              f"{report['max_input_tokens']:>8}{output:>9}{report['max_output_tokens']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Reproducible engine benchmark against the fake OpenRouter server.
+
+Runs deconstruct_business_idea, generate_pivot_analysis and
+generate_diagnosis through the real OpenAI client and engine code paths
+(provider pool, parsing, repair, retries), with the fake server mounted
+in-process so no network or API key is needed. Reports latency
+percentiles per function plus the parse failures, retries and mock
+fallbacks recorded by the engine's metrics.
+
+Usage (from backend/):
+    python -m benchmarks.replay --corpus recordings.jsonl --requests 50 --malformed-rate 0.1 --seed 1
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from openai import AsyncOpenAI
+
+import engine
+import telemetry
+from benchmarks.fake_openrouter import Corpus, FakeConfig, create_app
+from providers import Provider, ProviderPool
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def counter_totals(counter, label):
+    totals = {}
+    for key, value in counter.values.items():
+        name = key[counter.label_names.index(label)]
+        totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+async def run(args):
+    config = FakeConfig(
+        latency=args.latency, latency_median=args.latency_median, latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate, malformed_rate=args.malformed_rate, seed=args.seed,
+    )
+    fake = create_app(config, Corpus.load(args.corpus))
+    client = AsyncOpenAI(
+        base_url="http://fake-openrouter/v1",
+        api_key="fake",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake)),
+        max_retries=0,
+    )
+    engine.llm_providers = ProviderPool([Provider("fake", engine.MODEL_NAME, client)])
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    calls = {
+        # Unique inputs so the response cache and single-flight don't hide work
+        "deconstruct": lambda i: engine.deconstruct_business_idea(f"Replay idea {i}", "USD"),
+        "pivot": lambda i: engine.generate_pivot_analysis("Replay idea", f"Replay pivot {i}", "USD"),
+        "diagnosis": lambda i: engine.generate_diagnosis("Replay idea", f"Replay challenge {i}", "USD"),
+    }
+
+    async def timed(call, i):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(i)
+            return time.perf_counter() - start
+
+    report = {"config": vars(args), "functions": {}}
+    for name, call in calls.items():
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*[timed(call, i) for i in range(args.requests)])
+        elapsed = time.perf_counter() - start
+        report["functions"][name] = {
+            "requests": args.requests,
+            "p50_ms": round(statistics.median(latencies) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "throughput_rps": round(args.requests / elapsed, 2),
+        }
+    report["parse_failures"] = counter_totals(telemetry.LLM_PARSE_FAILURES, "endpoint")
+    report["retries"] = counter_totals(telemetry.LLM_RETRIES, "endpoint")
+    report["mock_fallbacks"] = counter_totals(telemetry.LLM_MOCK_FALLBACKS, "endpoint")
+    report["fake_server"] = dict(fake.state.stats)
+    await client.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="JSONL recorded with LLM_RECORD_PATH (defaults to mock responses)")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", default="lognormal")
+    parser.add_argument("--latency-median", type=float, default=0.05)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report here as well")
+    args = parser.parse_args()
+
+    # Keep per-request engine logging out of the report
+    engine.print = lambda *a, **k: None
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Lookup latency of the near-duplicate similarity index at scale.
+
+Fills a SimilarityIndex with distinct synthetic business ideas, then
+queries it with near-duplicate paraphrases of stored ideas (a lead-in
+phrase, synonyms for the format and audience, reordered parts, plurals,
+different casing) and with unrelated ideas. A paraphrase only counts as
+recalled if it matches the idea it was written from. Runs fully offline.
+
+Usage (from backend/):
+    python -m benchmarks.similarity_lookup --entries 100000 --queries 2000
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+
+from similarity_index import SimilarityIndex
+
+PRODUCTS = [
+    "soap", "candle", "bakery", "coffee", "tea", "juice", "skincare", "fashion", "shoe", "bag",
+    "furniture", "pottery", "jewelry", "perfume", "honey", "poultry", "fish", "rice", "cassava", "palm oil",
+    "laundry", "cleaning", "printing", "photography", "tailoring", "hair", "barber", "spa", "gym", "yoga",
+    "tutoring", "coding", "music", "dance", "art", "podcast", "video", "app", "website", "drone",
+]
+FORMATS = [
+    "online store", "subscription box", "delivery service", "marketplace", "franchise", "workshop",
+    "mobile app", "pop-up shop", "wholesale", "consulting agency", "training academy", "rental service",
+]
+AUDIENCES = [
+    "for students", "for mothers", "for offices", "for hotels", "for tourists", "for farmers",
+    "for churches", "for schools", "for athletes", "for seniors", "in lagos", "in abuja", "in accra",
+]
+CURRENCIES = ["NGN", "USD", "GHS", "KES"]
+
+LEAD_INS = ["", "", "i want to start a", "launching a", "plan for a", "thinking of opening a"]
+SYNONYMS = {
+    "online store": ["online shop", "e-commerce store"],
+    "subscription box": ["monthly subscription box", "subscription boxes"],
+    "delivery service": ["home delivery service", "delivery"],
+    "marketplace": ["online marketplace", "market place"],
+    "consulting agency": ["consultancy agency", "consulting firm"],
+    "training academy": ["training school", "academy"],
+    "rental service": ["rentals", "hire service"],
+    "for": ["targeting", "serving", "aimed at"],
+    "in": ["based in", "around"],
+}
+
+
+def synthetic_ideas(count, rng):
+    """Distinct ideas: each (products, format, audience) combination is used once"""
+    combinations = list(itertools.product(PRODUCTS, PRODUCTS, FORMATS, AUDIENCES))
+    return [
+        f"{product} and {second} {format_} {audience}"
+        for product, second, format_, audience in rng.sample(combinations, min(count, len(combinations)))
+    ]
+
+
+def _synonym(phrase, rng):
+    return rng.choice([phrase] + SYNONYMS.get(phrase, []))
+
+
+def paraphrase(idea, rng):
+    """The same idea worded the way another user might type it"""
+    first, rest = idea.split(" and ", 1)
+    second = next(p for p in sorted(PRODUCTS, key=len, reverse=True) if rest.startswith(p + " "))
+    rest = rest[len(second) + 1:]
+    format_ = next(f for f in FORMATS if rest.startswith(f + " "))
+    preposition, place = rest[len(format_) + 1:].split(" ", 1)
+
+    pair = [first, second]
+    rng.shuffle(pair)
+    pair = [p + "s" if rng.random() < 0.3 else p for p in pair]
+    audience = f"{_synonym(preposition, rng)} {place}"
+    parts = [f"{pair[0]} and {pair[1]} {_synonym(format_, rng)}", audience]
+    if rng.random() < 0.3:
+        parts.reverse()
+    text = " ".join(p for p in [rng.choice(LEAD_INS)] + parts if p)
+    return text.upper() if rng.random() < 0.5 else text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    index = SimilarityIndex(max_entries=args.entries)
+    ideas = synthetic_ideas(args.entries, rng)
+
+    start = time.perf_counter()
+    for i, idea in enumerate(ideas):
+        index.add(idea, CURRENCIES[i % len(CURRENCIES)], {"original_idea": idea})
+    build_seconds = time.perf_counter() - start
+
+    def timed_queries(queries):
+        latencies, found, correct = [], 0, 0
+        for text, currency, source in queries:
+            t0 = time.perf_counter()
+            match = index.query(text, currency, args.threshold)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            found += match is not None
+            correct += match is not None and match[1]["original_idea"] == source
+        return latencies, found, correct
+
+    samples = rng.sample(range(len(ideas)), args.queries)
+    paraphrased, matched, recalled = timed_queries(
+        [(paraphrase(ideas[i], rng), CURRENCIES[i % len(CURRENCIES)], ideas[i]) for i in samples]
+    )
+    unrelated, false_matches, _ = timed_queries(
+        [(f"{rng.choice(PRODUCTS)} quantum logistics platform", rng.choice(CURRENCIES), None) for _ in range(args.queries)]
+    )
+
+    latencies = sorted(paraphrased + unrelated)
+    print(f"\nentries: {index.size:,}  build: {build_seconds:.1f}s  signatures: {index._signatures.nbytes / 1e6:.1f}MB")
+    print(f"lookup latency  p50 {statistics.median(latencies):.3f}ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.3f}ms  max {latencies[-1]:.3f}ms")
+    print(f"paraphrases matched to their source idea at >= {args.threshold}: {recalled}/{args.queries}"
+          f"  (to another idea: {matched - recalled})")
+    print(f"unrelated ideas matched: {false_matches}/{args.queries}")
+
+
+if __name__ == "__main__":
+    main()
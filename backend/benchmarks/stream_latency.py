@@ -0,0 +1,87 @@
+"""
+Time-to-first-element benchmark for streamed deconstructions.
+
+Replays a deconstruction as a token stream at a fixed rate and compares when
+the first element becomes available to the client in streaming mode against
+the buffered /deconstruct path, which only returns once the whole document
+has been generated.
+
+Usage (from backend/):
+    python -m benchmarks.stream_latency --tokens-per-second 40 --runs 3
+"""
+import argparse
+import asyncio
+import statistics
+from types import SimpleNamespace
+
+import engine
+from providers import Provider
+from response_cache import ResponseCache
+from similarity_index import SimilarityIndex
+
+
+class FakeStream:
+    def __init__(self, text: str, chunk_chars: int, delay: float):
+        self.chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        self.delay = delay
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            delta = SimpleNamespace(content=chunk)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+class FakeCompletions:
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, tokens_per_second: float):
+        self.delay = 1 / tokens_per_second
+        self.payload = engine._get_mock_data("Benchmark idea").model_dump_json(indent=2)
+
+    async def create(self, stream=False, **kwargs):
+        fake = FakeStream(self.payload, self.CHARS_PER_TOKEN, self.delay)
+        if stream:
+            return fake
+        async for _ in fake:
+            pass
+        message = SimpleNamespace(content=self.payload)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+async def run_once(run: int):
+    # Every run must generate: start from empty caches and a fresh idea
+    engine.deconstruction_cache = ResponseCache()
+    engine.similarity_index = SimilarityIndex()
+    timings = None
+    async for event, data in engine.stream_deconstruction(f"Benchmark idea {run}", "USD"):
+        if event == "result":
+            timings = data["timings"]
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(args.tokens_per_second)))
+    engine.llm_providers.providers = [Provider("fake", engine.MODEL_NAME, fake_client)]
+
+    runs = [asyncio.run(run_once(run)) for run in range(args.runs)]
+    first_event = statistics.median(r["time_to_first_event_ms"] for r in runs)
+    first = statistics.median(r["time_to_first_element_ms"] for r in runs)
+    total = statistics.median(r["total_ms"] for r in runs)
+
+    print(f"\nmedian over {args.runs} runs at {args.tokens_per_second:g} tok/s")
+    print(f"  streaming  time to first event:   {first_event:>9.1f}ms")
+    print(f"  streaming  time to first element: {first:>9.1f}ms")
+    print(f"  buffered   time to first element: {total:>9.1f}ms (whole document)")
+
+
+if __name__ == "__main__":
+    main()
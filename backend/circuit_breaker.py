@@ -0,0 +1,80 @@
+import time
+from typing import Dict
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed: calls go through; `failure_threshold` failures in a row open it.
+    open: calls are rejected immediately for `recovery_time` seconds.
+    half-open: up to `half_open_max_calls` probe calls are let through; a
+    success closes the circuit again, a failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_time: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_time:
+            self._state = self.HALF_OPEN
+            self.probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now. Counts as a probe when half-open."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self.probes < self.half_open_max_calls:
+            self.probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        if self._state == self.HALF_OPEN:
+            print(f"Circuit {self.name} closed")
+            self._state = self.CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        """Give back a half-open probe whose call was cancelled"""
+        if self._state == self.HALF_OPEN and self.probes > 0:
+            self.probes -= 1
+
+    def _open(self):
+        if self._state != self.OPEN:
+            print(f"Circuit {self.name} opened after {self.failures} consecutive failures")
+            self.times_opened += 1
+        self._state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
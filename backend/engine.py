@@ -1,10 +1,28 @@
 import os
 import json
 import asyncio
-from openai import OpenAI
+import contextvars
+import httpx
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 from models import DeconstructionResult, BusinessElement, PivotAnalysisResult, DiagnosisResult
+from json_stream import IncrementalJSONParser
+import json_repair
+from json_repair import parse_model_json, JSONRepairError
+from response_cache import ResponseCache, normalize_text, make_key
+from similarity_index import SimilarityIndex
+from singleflight import SingleFlight
+from pydantic import ValidationError
+from prompts import DECONSTRUCTION, PIVOT, DIAGNOSIS, FIELD_REPAIR, count_tokens
+from providers import Provider, StubProvider, ProviderPool
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from routing import ModelRouter
+from telemetry import (
+    LLM_REQUESTS, LLM_LATENCY, LLM_TTFT, LLM_PROMPT_TOKENS, LLM_COMPLETION_TOKENS,
+    LLM_COST, LLM_RETRIES, LLM_PARSE_FAILURES, LLM_MOCK_FALLBACKS, LLM_ROUTE_LATENCY, LLM_ROUTE_COST,
+)
 import traceback
+import time
 
 load_dotenv()
 
@@ -13,128 +31,605 @@ OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 YOUR_SITE_URL = os.getenv("YOUR_SITE_URL", "http://localhost:3000") # Optional
 YOUR_SITE_NAME = os.getenv("YOUR_SITE_NAME", "Elementry") # Optional
 
-if OPENROUTER_API_KEY:
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=OPENROUTER_API_KEY,
+# Connection pool settings for the shared HTTP client. The pool is created once
+# and kept alive for the life of the process so every completion reuses warm
+# keep-alive connections instead of paying a fresh TLS handshake.
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+OPENROUTER_MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "100"))
+OPENROUTER_MAX_KEEPALIVE = int(os.getenv("OPENROUTER_MAX_KEEPALIVE", "20"))
+OPENROUTER_KEEPALIVE_EXPIRY = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "60"))
+OPENROUTER_CONNECT_TIMEOUT = float(os.getenv("OPENROUTER_CONNECT_TIMEOUT", "10"))
+OPENROUTER_READ_TIMEOUT = float(os.getenv("OPENROUTER_READ_TIMEOUT", "120"))
+
+def _build_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=OPENROUTER_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENROUTER_MAX_KEEPALIVE,
+            keepalive_expiry=OPENROUTER_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            OPENROUTER_READ_TIMEOUT,
+            connect=OPENROUTER_CONNECT_TIMEOUT,
+        ),
     )
-else:
-    print("WARNING: OPENROUTER_API_KEY not found in environment variables.")
-    client = None
 
-MODEL_NAME = "google/gemma-3-27b-it"
+# Ordered, comma-separated list of models. The first is the primary; the
+# rest are hedged to when it is slow and failed over to when it errors.
+# Entries are a model served by OpenRouter, `model@base_url` for another
+# OpenAI-compatible endpoint, or `stub` for an offline provider that
+# returns mock data (LLM_STUB_LATENCY / LLM_STUB_JITTER seconds).
+LLM_MODELS = [m.strip() for m in os.getenv("LLM_MODELS", "google/gemma-3-27b-it").split(",") if m.strip()]
+MODEL_NAME = LLM_MODELS[0]
+
+# Hedge delay in seconds, or "auto" to use the primary's observed latency
+# percentile clamped to [LLM_HEDGE_MIN_DELAY, LLM_HEDGE_MAX_DELAY].
+LLM_HEDGE_DELAY = os.getenv("LLM_HEDGE_DELAY", "auto")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "2"))
+LLM_HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", "30"))
+
+# Per-call timeout: LLM_TIMEOUT_MULTIPLIER x the provider's observed p99
+# latency, clamped to [LLM_TIMEOUT_MIN, LLM_TIMEOUT_MAX]. A provider's
+# circuit opens after LLM_CIRCUIT_FAILURES consecutive errors or timeouts
+# and lets a probe through again after LLM_CIRCUIT_RECOVERY_TIME seconds.
+LLM_TIMEOUT_MULTIPLIER = float(os.getenv("LLM_TIMEOUT_MULTIPLIER", "2"))
+LLM_TIMEOUT_MIN = float(os.getenv("LLM_TIMEOUT_MIN", "5"))
+LLM_TIMEOUT_MAX = float(os.getenv("LLM_TIMEOUT_MAX", str(OPENROUTER_READ_TIMEOUT)))
+LLM_CIRCUIT_FAILURES = int(os.getenv("LLM_CIRCUIT_FAILURES", "5"))
+LLM_CIRCUIT_RECOVERY_TIME = float(os.getenv("LLM_CIRCUIT_RECOVERY_TIME", "30"))
+
+def _stub_response(request: dict) -> str:
+    """Mock completion for the prompt template named in the request headers"""
+    template = request["extra_headers"].get("X-Prompt-Template", "").split("@")[0]
+    if template == "deconstruction":
+        return _get_mock_data("Stub idea").model_dump_json()
+    if template == "pivot":
+        return _get_mock_pivot_data("Stub pivot").model_dump_json()
+    if template == "diagnosis":
+        return _get_mock_diagnosis_data().model_dump_json()
+    return "{}"
+
+# One provider (and so one circuit breaker and latency history) per model
+# entry and one client per base URL, shared by every route that uses them
+_clients = {}
+_provider_registry = {}
+
+def _build_providers(entries: list = None) -> list:
+    providers = []
+    for entry in entries or LLM_MODELS:
+        if entry in _provider_registry:
+            providers.append(_provider_registry[entry])
+            continue
+        if entry == "stub":
+            provider = StubProvider(
+                responder=_stub_response,
+                latency=float(os.getenv("LLM_STUB_LATENCY", "0")),
+                jitter=float(os.getenv("LLM_STUB_JITTER", "0")),
+            )
+        elif not OPENROUTER_API_KEY:
+            print(f"WARNING: OPENROUTER_API_KEY not found in environment variables. Skipping model {entry}.")
+            continue
+        else:
+            model, _, base_url = entry.partition("@")
+            base_url = base_url or OPENROUTER_BASE_URL
+            if base_url not in _clients:
+                _clients[base_url] = AsyncOpenAI(
+                    base_url=base_url,
+                    api_key=OPENROUTER_API_KEY,
+                    http_client=_build_http_client(),
+                )
+            provider = Provider(entry, model, _clients[base_url])
+        provider.breaker = CircuitBreaker(
+            provider.name,
+            failure_threshold=LLM_CIRCUIT_FAILURES,
+            recovery_time=LLM_CIRCUIT_RECOVERY_TIME,
+        )
+        _provider_registry[entry] = provider
+        providers.append(provider)
+    return providers
+
+def _build_pool(providers: list) -> ProviderPool:
+    return ProviderPool(
+        providers,
+        hedge_delay=None if LLM_HEDGE_DELAY == "auto" else float(LLM_HEDGE_DELAY),
+        hedge_percentile=LLM_HEDGE_PERCENTILE,
+        min_hedge_delay=LLM_HEDGE_MIN_DELAY,
+        max_hedge_delay=LLM_HEDGE_MAX_DELAY,
+        timeout_multiplier=LLM_TIMEOUT_MULTIPLIER,
+        min_timeout=LLM_TIMEOUT_MIN,
+        max_timeout=LLM_TIMEOUT_MAX,
+    )
 
-async def deconstruct_business_idea(idea: str, currency: str = "USD") -> DeconstructionResult:
+llm_providers = _build_pool(_build_providers())
+
+# Plan- and complexity-aware model routing. LLM_ROUTES is a JSON list of
+# rules (see routing.Route); the first rule matching the user's plan, the
+# endpoint and the size of the user's input picks the models. Requests that
+# match no rule, or whose route has no available provider, use LLM_MODELS.
+llm_router = ModelRouter.from_json(os.getenv("LLM_ROUTES", ""))
+route_pools = {route.name: _build_pool(_build_providers(route.models)) for route in llm_router.routes}
+
+# Route of the generation running in the current task, for cost attribution
+_current_route = contextvars.ContextVar("llm_route", default=ModelRouter.DEFAULT)
+
+def _route(template, plan: str, user_input: str):
+    """Pick (route name, provider pool) for a request"""
+    route = llm_router.select(template.name, plan, count_tokens(user_input))
+    if route is None:
+        return ModelRouter.DEFAULT, llm_providers
+    pool = route_pools[route.name]
+    if not pool.providers or not pool.available():
+        llm_router.record_fallback(route.name)
+        return ModelRouter.DEFAULT, llm_providers
+    return route.name, pool
+
+async def _routed(route_name: str, template, generation):
+    """Run a generation attributed to a route, recording its end-to-end latency"""
+    _current_route.set(route_name)
+    start = time.perf_counter()
+    try:
+        return await generation
+    finally:
+        latency = time.perf_counter() - start
+        llm_router.record(route_name, latency)
+        LLM_ROUTE_LATENCY.observe(latency, route=route_name, endpoint=template.name)
+
+# Concurrent callers with the same request key (double clicks, frontend
+# retries) share one in-flight completion instead of issuing their own.
+inflight_requests = SingleFlight()
+
+async def close_client():
+    """
+    Close the shared connection pools. Called once on application shutdown.
+    """
+    providers = {id(p): p for pool in [llm_providers, *route_pools.values()] for p in pool.providers}
+    for provider in providers.values():
+        await provider.close()
+
+def _completion_request(prompt: str, template=None) -> dict:
+    request = {
+        "extra_headers": {
+            "HTTP-Referer": YOUR_SITE_URL,
+            "X-Title": YOUR_SITE_NAME,
+        },
+        "model": MODEL_NAME,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    }
+    if template:
+        request["max_tokens"] = template.max_output_tokens
+        request["extra_headers"]["X-Prompt-Template"] = f"{template.name}@{template.version}"
+    return request
+
+# Observed token usage per prompt template version, so prompt edits can be
+# compared on real traffic. Key: "<template>@<version>"
+prompt_usage = {}
+
+def _record_usage(template, usage):
+    if not template or not usage:
+        return
+    stats = prompt_usage.setdefault(f"{template.name}@{template.version}", {
+        "calls": 0, "input_tokens": 0, "output_tokens": 0,
+    })
+    stats["calls"] += 1
+    stats["input_tokens"] += usage.prompt_tokens or 0
+    stats["output_tokens"] += usage.completion_tokens or 0
+
+# USD per million prompt/completion tokens, for the cost metric.
+# LLM_PRICES="model=input:output,..." e.g. "google/gemma-3-27b-it=0.09:0.16"
+LLM_PRICES = {
+    model.strip(): tuple(float(p) for p in prices.split(":"))
+    for model, _, prices in (entry.rpartition("=") for entry in os.getenv("LLM_PRICES", "").split(",") if "=" in entry)
+}
+
+# Print every raw model response (verbose; for debugging prompts)
+LLM_LOG_RESPONSES = os.getenv("LLM_LOG_RESPONSES", "false").lower() == "true"
+
+def _record_call(template, provider: Provider, usage, latency: float, status: str = "ok", route: str = None):
+    """Export metrics for one provider call"""
+    labels = {"endpoint": template.name if template else "unknown", "model": provider.model}
+    LLM_REQUESTS.inc(status=status, **labels)
+    if status != "ok":
+        return
+    LLM_LATENCY.observe(latency, **labels)
+    if usage:
+        prompt_tokens, completion_tokens = usage.prompt_tokens or 0, usage.completion_tokens or 0
+        LLM_PROMPT_TOKENS.observe(prompt_tokens, **labels)
+        LLM_COMPLETION_TOKENS.observe(completion_tokens, **labels)
+        input_price, output_price = LLM_PRICES.get(provider.model, (0.0, 0.0))
+        cost = (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+        LLM_COST.inc(cost, **labels)
+        route = route or _current_route.get()
+        LLM_ROUTE_COST.inc(cost, route=route, endpoint=labels["endpoint"])
+        llm_router.record_cost(route, cost)
+
+# Record mode: append every successful exchange to this JSONL file, which
+# benchmarks/fake_openrouter.py can serve back as a replay corpus.
+LLM_RECORD_PATH = os.getenv("LLM_RECORD_PATH")
+
+def _record_exchange(template, provider: Provider, prompt: str, content: str, latency: float, usage, stream: bool,
+                     ttft: float = None):
+    if not LLM_RECORD_PATH:
+        return
+    entry = {
+        "template": f"{template.name}@{template.version}" if template else None,
+        "model": provider.model,
+        "prompt": prompt,
+        "response": content,
+        "latency_s": round(latency, 4),
+        "ttft_s": round(ttft, 4) if ttft is not None else None,
+        "usage": {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+        } if usage else None,
+        "stream": stream,
+        "recorded_at": time.time(),
+    }
+    try:
+        with open(LLM_RECORD_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"Failed to record LLM exchange: {e}")
+
+def _mock_fallback(template, reason: str):
+    LLM_MOCK_FALLBACKS.inc(endpoint=template.name, reason=reason)
+
+async def _create_completion(prompt: str, template=None, provider: Provider = None, route: str = None) -> str:
+    """
+    Send a single-message chat completion and return the raw response text.
+    The template, if given, sets the output token budget and is credited
+    with the token usage. Defaults to the primary provider. Cost goes to
+    `route`, or the route of the current generation.
+    """
+    provider = provider or llm_providers.primary
+    start = time.perf_counter()
+    try:
+        completion = await provider.complete(_completion_request(prompt, template))
+    except asyncio.CancelledError:
+        # e.g. the losing side of a hedged request
+        _record_call(template, provider, None, 0, status="cancelled", route=route)
+        raise
+    except Exception:
+        _record_call(template, provider, None, 0, status="error", route=route)
+        raise
+    latency = time.perf_counter() - start
+    usage = getattr(completion, "usage", None)
+    _record_usage(template, usage)
+    _record_call(template, provider, usage, latency, route=route)
+    content = completion.choices[0].message.content
+    _record_exchange(template, provider, prompt, content, latency, usage, stream=False)
+    if LLM_LOG_RESPONSES:
+        print(f"DEBUG: {provider.name} response for {template.name if template else 'prompt'}:\n{content}")
+    return content
+
+async def _stream_completion(prompt: str, template=None, pool: ProviderPool = None, route: str = None):
+    """
+    Send a streaming chat completion to the pool's primary provider and
+    yield text deltas as they arrive. Goes through the provider's circuit
+    breaker. Opening the stream and receiving its first chunk must both
+    happen within the provider's adaptive timeout; later chunks are not
+    bounded.
+    """
+    pool = pool or llm_providers
+    provider = pool.primary
+    if not provider.breaker.allow():
+        raise CircuitOpenError(f"Circuit for {provider.name} is open")
+    start = time.perf_counter()
+    ttft = None
+    usage = None
+    parts = []
+    try:
+        timeout = pool.timeout(provider)
+        deadline = start + timeout
+        stream = await asyncio.wait_for(
+            provider.stream({**_completion_request(prompt, template), "stream_options": {"include_usage": True}}),
+            timeout,
+        )
+        chunks = stream.__aiter__()
+        while True:
+            try:
+                if deadline is None:
+                    chunk = await chunks.__anext__()
+                else:
+                    # A provider can accept the request and then send nothing
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0, deadline - time.perf_counter()))
+                    deadline = None
+            except StopAsyncIteration:
+                break
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+                _record_usage(template, usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                    LLM_TTFT.observe(ttft, endpoint=template.name if template else "unknown", model=provider.model)
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+    except (asyncio.CancelledError, GeneratorExit):
+        provider.breaker.release()
+        _record_call(template, provider, None, 0, status="cancelled", route=route)
+        raise
+    except Exception:
+        provider.breaker.record_failure()
+        _record_call(template, provider, None, 0, status="error", route=route)
+        raise
+    provider.breaker.record_success()
+    latency = time.perf_counter() - start
+    _record_call(template, provider, usage, latency, route=route)
+    _record_exchange(template, provider, prompt, "".join(parts), latency, usage, stream=True, ttft=ttft)
+
+# Business rules the Pydantic models don't enforce themselves
+FIELD_RULES = {
+    DeconstructionResult: {
+        "elements": (lambda v: isinstance(v, list) and len(v) == 7, "must contain EXACTLY 7 elements"),
+    },
+}
+
+field_repair_stats = {"attempts": 0, "succeeded": 0, "failed": 0}
+
+def _invalid_fields(data: dict, model_cls) -> list:
+    """
+    Top-level fields of a parsed response that are missing or invalid.
+    """
+    invalid = set()
+    try:
+        model_cls.model_validate(data)
+    except ValidationError as e:
+        invalid.update(err['loc'][0] for err in e.errors() if err['loc'])
+    for field, (check, _) in FIELD_RULES.get(model_cls, {}).items():
+        if field in data and not check(data[field]):
+            invalid.add(field)
+    return [f for f in model_cls.model_fields if f in invalid]
+
+def _passes_rules(result, model_cls) -> bool:
+    return all(check(getattr(result, field)) for field, (check, _) in FIELD_RULES.get(model_cls, {}).items())
+
+def _build_field_repair_prompt(model_cls, data: dict, fields: list, context: str) -> str:
+    schema = model_cls.model_json_schema()
+    field_schema = {f: schema['properties'][f] for f in fields}
+    # Only ship the sub-model definitions these fields actually reference
+    refs = json.dumps(field_schema)
+    defs = {k: v for k, v in schema.get('$defs', {}).items() if f'#/$defs/{k}"' in refs}
+    rules = [f"- {f} {FIELD_RULES[model_cls][f][1]}" for f in fields if f in FIELD_RULES.get(model_cls, {})]
+    valid_part = {k: v for k, v in data.items() if k not in fields and k in model_cls.model_fields}
+    return FIELD_REPAIR.render(
+        context=context,
+        fields=", ".join(fields),
+        rules="\n".join(rules),
+        valid_part=json.dumps(valid_part, ensure_ascii=False),
+        schema=json.dumps({"properties": field_schema, "$defs": defs}),
+    )
+
+async def _validate_or_repair(data, model_cls, context: str, pool: ProviderPool = None, route: str = None):
+    """
+    Validate a parsed response. If only some top-level fields are missing or
+    invalid, ask the model for just those fields with a small targeted prompt
+    and merge them in, instead of regenerating the whole document. The
+    repair goes through `pool`, so open circuits are skipped and failures
+    are counted, without training its latency estimates.
+    Raises if the response can't be salvaged so the caller retries in full.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+
+    try:
+        result = model_cls.model_validate(data)
+        if _passes_rules(result, model_cls):
+            return result
+    except ValidationError:
+        pass
+
+    invalid = _invalid_fields(data, model_cls)
+    if not invalid:
+        return model_cls.model_validate(data)
+    if len(invalid) > len(model_cls.model_fields) // 2:
+        raise ValueError(f"Too many invalid fields to repair: {invalid}")
+
+    print(f"Regenerating only invalid fields for {model_cls.__name__}: {invalid}")
+    field_repair_stats["attempts"] += 1
+    try:
+        prompt = _build_field_repair_prompt(model_cls, data, invalid, context)
+        content = await (pool or llm_providers).run(
+            lambda provider: _create_completion(prompt, FIELD_REPAIR, provider, route), record_latency=False,
+        )
+        patch = parse_model_json(content)
+        if not isinstance(patch, dict):
+            raise ValueError("Field repair response is not a JSON object")
+        merged = {**data, **{k: patch[k] for k in invalid if k in patch}}
+        remaining = _invalid_fields(merged, model_cls)
+        if remaining:
+            raise ValueError(f"Fields still invalid after repair: {remaining}")
+        result = model_cls.model_validate(merged)
+    except Exception:
+        field_repair_stats["failed"] += 1
+        raise
+    field_repair_stats["succeeded"] += 1
+    return result
+
+async def _parse_response(content: str, model_cls, context: str, template, provider: Provider,
+                          pool: ProviderPool = None, route: str = None):
+    """
+    Parse and validate a model response from `provider`, counting failures
+    by stage. Field repairs run through `pool`, attributed to `route`.
+    """
+    labels = {"endpoint": template.name, "model": provider.model}
+    # Fast path: well-formed JSON validated straight from the response text,
+    # without building an intermediate dict
+    try:
+        result = model_cls.model_validate_json(content)
+        if _passes_rules(result, model_cls):
+            json_repair.stats["strict"] += 1
+            return result
+    except ValidationError:
+        pass
+    try:
+        # Tolerates fences, prose, comments, trailing commas and truncation
+        data = parse_model_json(content)
+    except JSONRepairError:
+        LLM_PARSE_FAILURES.inc(stage="json", **labels)
+        raise
+    try:
+        return await _validate_or_repair(data, model_cls, context, pool, route)
+    except ValueError:
+        LLM_PARSE_FAILURES.inc(stage="validation", **labels)
+        raise
+
+def _build_reference_section(reference: dict) -> str:
+    """
+    Summarize a prior deconstruction of a similar idea to seed the prompt.
+    """
+    if not reference:
+        return ""
+    elements = ", ".join(f"{e['name']} ({e['type']})" for e in reference.get('elements', []))
+    return (
+        f"Reference: a similar idea (\"{reference.get('original_idea')}\") was previously deconstructed with these elements: {elements}. "
+        f"Its cheapest entry point was: \"{reference.get('cheapest_entry_point')}\". "
+        "Use this only as a starting point - tailor every element to the idea above."
+    )
+
+def _build_deconstruction_prompt(idea: str, currency: str, reference: dict = None) -> str:
+    return DECONSTRUCTION.render(idea=idea, currency=currency, reference=_build_reference_section(reference))
+
+# Version of the deconstruction prompt template. Any edit to the template
+# changes this hash and so invalidates previously cached responses.
+DECONSTRUCTION_PROMPT_VERSION = DECONSTRUCTION.version
+
+# Content-addressed cache of deconstructions. Set DECONSTRUCT_CACHE_PATH to
+# also keep entries in a SQLite file that survives restarts.
+deconstruction_cache = ResponseCache(
+    max_entries=int(os.getenv("DECONSTRUCT_CACHE_SIZE", "1000")),
+    ttl_seconds=float(os.getenv("DECONSTRUCT_CACHE_TTL", str(60 * 60 * 24))),
+    path=os.getenv("DECONSTRUCT_CACHE_PATH") or None,
+)
+
+def _deconstruction_cache_key(idea: str, currency: str, model: str = MODEL_NAME) -> str:
+    return make_key(normalize_text(idea), (currency or "").upper(), model, DECONSTRUCTION_PROMPT_VERSION)
+
+def _get_cached_deconstruction(idea: str, currency: str, model: str = MODEL_NAME):
+    cached = deconstruction_cache.get(_deconstruction_cache_key(idea, currency, model))
+    if cached is None:
+        return None
+    result = DeconstructionResult.model_validate(cached)
+    # Keep the user's own wording of the idea
+    result.original_idea = idea
+    return result
+
+def _cache_deconstruction(idea: str, currency: str, result: DeconstructionResult, model: str = MODEL_NAME,
+                          route: str = None):
+    data = result.model_dump()
+    data['project_id'] = None
+    data['original_idea'] = idea
+    # Where the result came from, so the similarity index can be rebuilt
+    # from the cache's disk tier after a restart
+    data['cache_meta'] = {"currency": (currency or "").upper(), "model": model, "route": route or _current_route.get()}
+    deconstruction_cache.set(_deconstruction_cache_key(idea, currency, model), data)
+    similarity_index.add(idea, _similarity_partition(**data['cache_meta']), data)
+
+# Near-duplicate reuse. SIMILARITY_MODE is "off", "return" (serve the nearest
+# prior result directly) or "seed" (include it in the prompt as a reference).
+SIMILARITY_MODE = os.getenv("SIMILARITY_MODE", "off")
+SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.8"))
+similarity_index = SimilarityIndex(max_entries=int(os.getenv("SIMILARITY_INDEX_SIZE", "20000")))
+
+def _similarity_partition(currency: str, model: str, route: str) -> str:
+    """Only results of the same currency, route and model are reused for each other"""
+    return f"{(currency or '').upper()}|{route}|{model}"
+
+def _rebuild_similarity_index():
+    """Index the deconstructions that survived a restart in the cache's disk tier"""
+    added = 0
+    for data in deconstruction_cache.values():
+        if data.get('cache_meta') and data.get('original_idea'):
+            similarity_index.add(data['original_idea'], _similarity_partition(**data['cache_meta']), data)
+            added += 1
+    if added:
+        print(f"Similarity index rebuilt from {added} cached deconstructions")
+
+if SIMILARITY_MODE in ("return", "seed"):
+    _rebuild_similarity_index()
+
+def _find_similar_deconstruction(idea: str, currency: str, model: str, route: str = None):
+    if SIMILARITY_MODE not in ("return", "seed"):
+        return None
+    partition = _similarity_partition(currency, model, route or _current_route.get())
+    match = similarity_index.query(idea, partition, SIMILARITY_THRESHOLD)
+    if not match:
+        return None
+    score, data = match
+    print(f"Found similar deconstruction ({score:.2f}) for '{idea}': '{data.get('original_idea')}'")
+    return data
+
+async def deconstruct_business_idea(idea: str, currency: str = "USD", plan: str = None) -> DeconstructionResult:
+    """
+    Deconstructs a business idea using OpenRouter (Gemma 3).
+    `plan` is the user's plan, used for model routing.
+    Concurrent identical requests share a single completion.
+    """
+    route, pool = _route(DECONSTRUCTION, plan, idea)
+    key = ("deconstruct", normalize_text(idea), (currency or "").upper(), route)
+    result = await inflight_requests.do(key, lambda: _routed(route, DECONSTRUCTION, _deconstruct_business_idea(idea, currency, pool)))
+    # Each caller gets its own copy since handlers mutate the result
+    return result.model_copy(deep=True)
+
+async def _deconstruct_business_idea(idea: str, currency: str = "USD", pool: ProviderPool = None) -> DeconstructionResult:
     """
     Deconstructs a business idea using OpenRouter (Gemma 3).
     """
-    if not client:
-        print("WARNING: No OPENROUTER_API_KEY found. Using mock data.")
+    pool = pool or llm_providers
+    if not pool.providers:
+        print("WARNING: No LLM providers configured. Using mock data.")
+        _mock_fallback(DECONSTRUCTION, "no_provider")
         return _get_mock_data(idea, currency)
 
-    prompt = f"""
-        You are the Elemental Coach, a master business strategist embodying the calm, visionary, practical, and purpose-driven essence of Utibe Okuk. Your voice inspires confidence and discipline through subtle storytelling, light humor, and rock-solid business logic. Imagine guiding an entrepreneur like a wise mentor sharing tales from the trenches—keeping it real, forward-thinking, and actionable, while sprinkling in a dash of wit to lighten the path ahead.
-
-        Your core expertise is the "Elemental Business Model Deconstruction": breaking down ideas into modular elements that reveal hidden opportunities, much like dissecting a complex machine to see how each gear turns independently yet powers the whole.
-
-        Business Idea: "{idea}"
-        Target Currency: "{currency}"
-
-        Guidelines:
-It is very important that you generate ideas strictly based on the local context of the selected currency’s country
-     - Deconstruct into EXACTLY 7 distinct business elements (sub-businesses). Each is a standalone module that could spin off, like chapters in a grand entrepreneurial story.
-        - Adapt these suggested element types to fit the idea, ensuring diversity: 
-          1. Production/Manufacturing (crafting products, physical or digital—like forging the hero's sword),
-          2. Content Creation (storytelling through media, blogs, videos—spinning yarns that captivate audiences),
-          3. Training/Education (building skills via courses or workshops—turning novices into masters with a wink of encouragement),
-          4. Service Delivery (hands-on consulting or support—being the reliable sidekick in the business adventure),
-          5. Marketing/Distribution (channels and ads that spread the word—like a clever merchant hawking wares with charm),
-          6. Community Building (fostering networks and forums—creating tribes where ideas thrive and laughs are shared),
-          7. Technology/Innovation (tools, apps, R&D—innovating like a mad scientist with practical genius).
-        - For each element: Give a concise, evocative name; type (from above or similar); description (2-3 sentences weaving in storytelling, humor, and business logic on how it fits the idea, inspiring the user to see its potential); and monetization potential (High: scalable like a viral hit; Medium: steady as a loyal customer base; Low: supportive, like the unsung hero behind the scenes).
-        - Cheapest Entry Point: Describe the simplest, lowest-cost validation/start method in an encouraging, practical narrative (e.g., "Kick off with a free blog, testing waters like a cautious explorer dipping a toe in the ocean—minimal risk, maximum insight").
-        - Estimated Cost: The estimated financial cost to start the cheapest entry point (e.g. "$0 - $500"). Mention costs in {currency}.
-        - Time to Validate: The estimated time to validate the cheapest entry point (e.g. "1-2 Weeks").
-        - Pivot Options: 3-5 adjacent industries or variations, phrased as visionary opportunities with a touch of humor (e.g., "Pivot to wellness coaching: because who wouldn't want to turn sweat into serenity?").
-        - Sustainability Tip: One key piece of advice for long-term success, delivered with purpose-driven wisdom and a hint of storytelling (e.g., "Build recurring revenue streams, like planting seeds that grow into a forest of financial stability—patience pays dividends").
-
-        Examples:
-        - For "Online Fitness Coaching Platform": Elements could include Content (workout videos that make sweating fun), Training (plans that transform couch potatoes into athletes with disciplined humor), etc.
-
-        - Gradual Funding Strategy: A step-by-step guide to funding the business starting from $0.
-        - Brand & Community Expansion Tips: Actionable tips for growing the brand and community.
-        - Sustainability Roadmap: A list of 3-5 key sustainability milestones.
-
-        Output STRICTLY in raw JSON format matching this exact schema. No additional text, no markdown, no explanations outside JSON—keep it clean and disciplined.
-        {{
-            "original_idea": "{idea}",
-            "cheapest_entry_point": "string description",
-            "estimated_cost": "string",
-            "time_to_validate": "string",
-            "elements": [
-                {{
-                    "name": "string",
-                    "type": "string",
-                    "description": "string",
-                    "monetization_potential": "High|Medium|Low"
-                }}
-                // exactly 7 objects
-            ],
-            "pivot_options": ["string1", "string2", "string3"],  // 3-5 strings
-            "sustainability_tip": "string",
-            "gradual_funding_strategy": [
-                {{"step": "string", "amount": "string", "description": "string"}}
-            ],
-            "brand_and_community_expansion_tips": ["string1", "string2"],
-            "sustainability_roadmap": [
-                {{"milestone": "string", "timeline": "string", "description": "string"}}
-            ],
-            "sustainability_roadmap": [
-                {{"milestone": "string", "timeline": "string", "description": "string"}}
-            ],
-            "currency": "{currency}",
-            "overall_score": int // 0-100 score of potential success
-        }}
-        """
+    cached = _get_cached_deconstruction(idea, currency, pool.primary.name)
+    if cached:
+        return cached
+
+    similar = _find_similar_deconstruction(idea, currency, pool.primary.name)
+    if similar and SIMILARITY_MODE == "return":
+        result = DeconstructionResult.model_validate(similar)
+        result.original_idea = idea
+        return result
+
+    prompt = _build_deconstruction_prompt(idea, currency, reference=similar)
 
     max_retries = 3
     base_delay = 2
 
+    async def complete_with(provider):
+        return await _create_completion(prompt, DECONSTRUCTION, provider)
+
+    async def parse_from(provider, response_content):
+        result = await _parse_response(response_content, DeconstructionResult, f'business idea "{idea}" (currency {currency})', DECONSTRUCTION, provider, pool)
+        return provider, result
+
     for attempt in range(max_retries):
         try:
-            completion = client.chat.completions.create(
-                extra_headers={
-                    "HTTP-Referer": YOUR_SITE_URL,
-                    "X-Title": YOUR_SITE_NAME,
-                },
-                model=MODEL_NAME,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
-            
-            response_content = completion.choices[0].message.content
-            print(f"DEBUG: OpenRouter Response for Deconstruction:\n{response_content}")
-            text = response_content.strip()
-            
-            # Clean up markdown if present
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.endswith("```"):
-                text = text[:-3]
-            
-            data = json.loads(text)
-            return DeconstructionResult(**data)
+            # Hedged across the configured models; the first valid result wins
+            provider, result = await pool.run(complete_with, parse_from)
+            # Cached as the answer of the model that produced it, which a
+            # hedge or failover makes different from the primary
+            _cache_deconstruction(idea, currency, result, provider.name)
+            return result
             
         except Exception as e:
             print(f"Error calling OpenRouter (Attempt {attempt + 1}/{max_retries}): {e}")
+            if not pool.available():
+                # Every circuit is open: fail fast instead of sleeping
+                print("ERROR: All LLM provider circuits are open. Using mock data.")
+                _mock_fallback(DECONSTRUCTION, "circuit_open")
+                return _get_mock_data(idea, currency)
             if attempt < max_retries - 1:
+                LLM_RETRIES.inc(endpoint=DECONSTRUCTION.name)
                 await asyncio.sleep(base_delay * (2 ** attempt))
             else:
                 print("ERROR: Max retries reached for OpenRouter.")
+                _mock_fallback(DECONSTRUCTION, "retries_exhausted")
                 traceback.print_exc()
                 return _get_mock_data(idea, currency)
                 
@@ -179,91 +674,143 @@ def _get_mock_data(idea: str, currency: str = "USD") -> DeconstructionResult:
     )
 
 
-async def generate_pivot_analysis(original_idea: str, pivot_name: str, currency: str = "USD") -> PivotAnalysisResult:
+# SSE event names for items of the top-level arrays in a deconstruction
+STREAM_ITEM_EVENTS = {
+    "elements": "element",
+    "pivot_options": "pivot_option",
+    "gradual_funding_strategy": "funding_step",
+    "brand_and_community_expansion_tips": "expansion_tip",
+    "sustainability_roadmap": "milestone",
+}
+
+def _stream_event(kind: str, key: str, index, value):
+    if kind == "item":
+        return STREAM_ITEM_EVENTS.get(key, "item"), {"key": key, "index": index, "value": value}
+    return "field", {"key": key, "value": value}
+
+async def stream_deconstruction(idea: str, currency: str = "USD", plan: str = None):
+    """
+    Streams a deconstruction while the model is still generating it.
+    Yields (event, data) tuples: one per completed field or array item
+    (element, funding_step, milestone, ...) and finally ("result", {...})
+    holding the validated DeconstructionResult and timings in ms.
+    """
+    start = time.perf_counter()
+    first_event_at = None
+    first_element_at = None
+    parser = IncrementalJSONParser()
+
+    def mark(key):
+        nonlocal first_event_at, first_element_at
+        now = time.perf_counter()
+        first_event_at = first_event_at or now
+        if key == "elements" and first_element_at is None:
+            first_element_at = now
+
+    route, pool = _route(DECONSTRUCTION, plan, idea)
+    result = None
+    if not pool.providers:
+        print("WARNING: No LLM providers configured. Using mock data.")
+        _mock_fallback(DECONSTRUCTION, "no_provider")
+        result = _get_mock_data(idea, currency)
+    else:
+        result = _get_cached_deconstruction(idea, currency, pool.primary.name)
+        similar = None if result else _find_similar_deconstruction(idea, currency, pool.primary.name, route)
+        if similar and SIMILARITY_MODE == "return":
+            result = DeconstructionResult.model_validate(similar)
+            result.original_idea = idea
+
+    if result:
+        # Replay mock or cached documents through the same event sequence
+        for kind, key, index, value in parser.feed(result.model_dump_json()):
+            mark(key)
+            yield _stream_event(kind, key, index, value)
+    else:
+        try:
+            prompt = _build_deconstruction_prompt(idea, currency, reference=similar)
+            async for delta in _stream_completion(prompt, DECONSTRUCTION, pool, route):
+                for kind, key, index, value in parser.feed(delta):
+                    mark(key)
+                    yield _stream_event(kind, key, index, value)
+
+            result = await _parse_response(
+                parser.document(), DeconstructionResult, f'business idea "{idea}" (currency {currency})',
+                DECONSTRUCTION, pool.primary, pool, route,
+            )
+            _cache_deconstruction(idea, currency, result, pool.primary.name, route)
+            llm_router.record(route, time.perf_counter() - start)
+            LLM_ROUTE_LATENCY.observe(time.perf_counter() - start, route=route, endpoint=DECONSTRUCTION.name)
+        except Exception as e:
+            # The final result event is authoritative, so falling back to the
+            # buffered path (retries + mock data) is safe even mid-stream.
+            print(f"Error streaming from OpenRouter, falling back to buffered request: {e}")
+            result = await deconstruct_business_idea(idea, currency, plan)
+
+    end = time.perf_counter()
+    timings = {
+        "time_to_first_event_ms": round(((first_event_at or end) - start) * 1000, 1),
+        "time_to_first_element_ms": round(((first_element_at or end) - start) * 1000, 1),
+        "total_ms": round((end - start) * 1000, 1),
+    }
+    print(f"Deconstruction stream: first element after {timings['time_to_first_element_ms']}ms, complete after {timings['total_ms']}ms")
+
+    yield "result", {"result": result, "timings": timings}
+
+
+async def generate_pivot_analysis(original_idea: str, pivot_name: str, currency: str = "USD", context: str = None,
+                                  plan: str = None) -> PivotAnalysisResult:
+    """
+    Generates a detailed analysis for a pivot opportunity using OpenRouter.
+    `context` is the project's context digest (see prompts.build_context_digest),
+    `plan` the user's plan for model routing.
+    Concurrent identical requests share a single completion.
+    """
+    route, pool = _route(PIVOT, plan, f"{original_idea} {pivot_name}")
+    key = ("pivot", normalize_text(original_idea), normalize_text(pivot_name), (currency or "").upper(), context or "", route)
+    result = await inflight_requests.do(key, lambda: _routed(
+        route, PIVOT, _generate_pivot_analysis(original_idea, pivot_name, currency, context, pool)
+    ))
+    return result.model_copy(deep=True)
+
+async def _generate_pivot_analysis(original_idea: str, pivot_name: str, currency: str = "USD", context: str = None,
+                                   pool: ProviderPool = None) -> PivotAnalysisResult:
     """
     Generates a detailed analysis for a pivot opportunity using OpenRouter.
     """
-    if not client:
-        print("WARNING: No OPENROUTER_API_KEY found. Using mock data for pivot.")
+    pool = pool or llm_providers
+    if not pool.providers:
+        print("WARNING: No LLM providers configured. Using mock data for pivot.")
+        _mock_fallback(PIVOT, "no_provider")
         return _get_mock_pivot_data(pivot_name)
 
-    prompt = f"""
-        You are the Elemental Coach, channeling the calm, visionary, practical, and purpose-driven spirit of Utibe Okuk. Speak as a mentor who's walked the entrepreneurial path, using storytelling to paint possibilities, humor to ease tensions, and business logic to ground ambitions—inspiring confidence and instilling discipline in every insight.
-
-        Original Business Idea: "{original_idea}"
-        Proposed Pivot: "{pivot_name}"
-
-        Now, analyze this pivot as if guiding a fellow visionary through a crossroads: Provide a detailed execution plan that's realistic yet bold, like mapping a treasure hunt with practical steps and witty warnings.
-
-        Guidelines:
-It is very important that you analyze  ideas based on the local context of the selected currency’s country
-        - Viability Score: 0-100, based on logical assessment—think of it as your confidence meter in this adventure's success.
-        - Market Fit: "High", "Medium-High", "Medium", "Growing", or "Low"—framed with a quick story snippet (but keep it in the string).
-        - Market Fit Score: 0-100, tied to data-driven intuition.
-        - Recommended Actions: 5-7 specific, actionable steps, each with priority (High/Medium/Low). Phrase them engagingly, like "First, scout the terrain (High priority: Validate demand with quick surveys—don't charge blind!").
-        - Required Resources: 3-5 key items, listed practically with a touch of humor (e.g., "A full-stack developer—your tech wizard; 10,000 {currency} marketing budget—fuel for the launch rocket").
-        - Estimated Timeline: e.g., "12 weeks" or "6 months"—realistic, like setting waypoints on a journey.
-        - Estimated Investment: e.g., "5,000 {currency} - 10,000 {currency}"—honest about the treasure needed upfront.
-        - Risk Level: "Low", "Medium", "High"—with a humorous nod to the dragons ahead.
-        - Risk Factors: 3-5 potential pitfalls, described vividly yet actionably (e.g., "Competitor ambushes: Stay vigilant, or they'll steal your thunder").
-        - Milestones: 4 key achievements, each with name, due_weeks (from start), and description—story-like markers of progress (e.g., "Summit the First Hill (Week 4): MVP built, ready for early testers").
-
-        Output STRICTLY in raw JSON format matching this schema. No additional text, no markdown—pure, disciplined structure:
-        {{
-            "viability_score": int,
-            "market_fit": "string",
-            "market_fit_score": int,
-            "recommended_actions": [
-                {{"action": "string", "priority": "High|Medium|Low"}}
-            ],
-            "required_resources": ["string", "string"],
-            "estimated_timeline": "string",
-            "estimated_investment": "string",
-            "risk_level": "string",
-            "risk_factors": ["string", "string"],
-            "milestones": [
-                {{"name": "string", "due_weeks": int, "description": "string"}}
-            ]
-        }}
-        """
+    prompt = PIVOT.render(original_idea=original_idea, pivot_name=pivot_name, currency=currency, project_context=context or "None")
 
     max_retries = 3
     base_delay = 2
 
+    async def complete_with(provider):
+        return await _create_completion(prompt, PIVOT, provider)
+
+    async def parse_from(provider, response_content):
+        return await _parse_response(response_content, PivotAnalysisResult, f'pivot "{pivot_name}" of business idea "{original_idea}" (currency {currency})', PIVOT, provider, pool)
+
     for attempt in range(max_retries):
         try:
-            completion = client.chat.completions.create(
-                extra_headers={
-                    "HTTP-Referer": YOUR_SITE_URL,
-                    "X-Title": YOUR_SITE_NAME,
-                },
-                model=MODEL_NAME,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
-            
-            response_content = completion.choices[0].message.content
-            print(f"DEBUG: OpenRouter Response for Pivot:\n{response_content}")
-            text = response_content.strip()
-            
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.endswith("```"):
-                text = text[:-3]
-            
-            data = json.loads(text)
-            return PivotAnalysisResult(**data)
+            return await pool.run(complete_with, parse_from)
             
         except Exception as e:
             print(f"Error calling OpenRouter for pivot (Attempt {attempt + 1}/{max_retries}): {e}")
+            if not pool.available():
+                # Every circuit is open: fail fast instead of sleeping
+                print("ERROR: All LLM provider circuits are open. Using mock data.")
+                _mock_fallback(PIVOT, "circuit_open")
+                return _get_mock_pivot_data(pivot_name)
             if attempt < max_retries - 1:
+                LLM_RETRIES.inc(endpoint=PIVOT.name)
                 await asyncio.sleep(base_delay * (2 ** attempt))
             else:
                 print("ERROR: Max retries reached for OpenRouter pivot.")
+                _mock_fallback(PIVOT, "retries_exhausted")
                 traceback.print_exc()
                 return _get_mock_pivot_data(pivot_name)
 
@@ -290,79 +837,60 @@ def _get_mock_pivot_data(pivot_name: str) -> PivotAnalysisResult:
         ]
     )
 
-async def generate_diagnosis(idea: str, challenges: str, currency: str = "USD") -> DiagnosisResult:
+async def generate_diagnosis(idea: str, challenges: str, currency: str = "USD", context: str = None,
+                             plan: str = None) -> DiagnosisResult:
+    """
+    Diagnose business challenges using OpenRouter.
+    `context` is the project's context digest (see prompts.build_context_digest),
+    `plan` the user's plan for model routing.
+    Concurrent identical requests share a single completion.
+    """
+    route, pool = _route(DIAGNOSIS, plan, challenges)
+    key = ("diagnosis", normalize_text(idea), normalize_text(challenges), (currency or "").upper(), context or "", route)
+    result = await inflight_requests.do(key, lambda: _routed(
+        route, DIAGNOSIS, _generate_diagnosis(idea, challenges, currency, context, pool)
+    ))
+    return result.model_copy(deep=True)
+
+async def _generate_diagnosis(idea: str, challenges: str, currency: str = "USD", context: str = None,
+                              pool: ProviderPool = None) -> DiagnosisResult:
     """
     Diagnose business challenges using OpenRouter.
     """
-    if not client:
-        print("WARNING: No OPENROUTER_API_KEY found. Using mock diagnosis.")
+    pool = pool or llm_providers
+    if not pool.providers:
+        print("WARNING: No LLM providers configured. Using mock diagnosis.")
+        _mock_fallback(DIAGNOSIS, "no_provider")
         return _get_mock_diagnosis_data()
 
-    prompt = f"""
-        You are the Elemental Coach, channeling the calm, visionary, practical, and purpose-driven spirit of Utibe Okuk.
-        
-        Business Idea: "{idea}"
-        Current Challenges: "{challenges}"
-        
-        Task: Diagnose the weak link in the business structure (e.g., Supply, Sales, Strategy, Operations, etc.).
-        
-        Guidelines:
-        - Weak Link: Identify the single most critical bottleneck.
-        - Weak Link Detail: Explain WHY this is the weak link in 2-3 sentences, using the Utibe Okuk persona (calm, wise, slightly humorous).
-        - Root Cause: What is the underlying issue? (e.g., "Lack of market validation", "Inefficient supply chain").
-	- Also Diagnose ideas based on the local context of the selected currency’s country ({currency}).
-        - Immediate Fix: A concrete, actionable step to resolve this NOW. Mention costs in {currency} if applicable.
-        - Strategic Adjustment: A long-term pivot or change to prevent recurrence.
-        - Viability Score: 0-100 score of the business's current health.
-        
-        Output STRICTLY in raw JSON format matching this schema:
-        {{
-            "weak_link": "string",
-            "weak_link_detail": "string",
-            "root_cause": "string",
-            "immediate_fix": "string",
-            "strategic_adjustment": "string",
-            "viability_score": int
-        }}
-    """
+    prompt = DIAGNOSIS.render(idea=idea, challenges=challenges, currency=currency, project_context=context or "None")
 
     max_retries = 3
     base_delay = 2
 
+    async def complete_with(provider):
+        return await _create_completion(prompt, DIAGNOSIS, provider)
+
+    async def parse_from(provider, response_content):
+        return await _parse_response(response_content, DiagnosisResult, f'diagnosis of business idea "{idea}" (currency {currency})', DIAGNOSIS, provider, pool)
+
     for attempt in range(max_retries):
         try:
-            completion = client.chat.completions.create(
-                extra_headers={
-                    "HTTP-Referer": YOUR_SITE_URL,
-                    "X-Title": YOUR_SITE_NAME,
-                },
-                model=MODEL_NAME,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
-            
-            response_content = completion.choices[0].message.content
-            print(f"DEBUG: OpenRouter Response for Diagnosis:\n{response_content}")
-            text = response_content.strip()
-            
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.endswith("```"):
-                text = text[:-3]
-            
-            data = json.loads(text)
-            return DiagnosisResult(**data)
+            return await pool.run(complete_with, parse_from)
             
         except Exception as e:
             print(f"Error calling OpenRouter for diagnosis (Attempt {attempt + 1}/{max_retries}): {e}")
+            if not pool.available():
+                # Every circuit is open: fail fast instead of sleeping
+                print("ERROR: All LLM provider circuits are open. Using mock data.")
+                _mock_fallback(DIAGNOSIS, "circuit_open")
+                return _get_mock_diagnosis_data()
             if attempt < max_retries - 1:
+                LLM_RETRIES.inc(endpoint=DIAGNOSIS.name)
                 await asyncio.sleep(base_delay * (2 ** attempt))
             else:
                 print("ERROR: Max retries reached for OpenRouter diagnosis.")
+                _mock_fallback(DIAGNOSIS, "retries_exhausted")
                 traceback.print_exc()
                 return _get_mock_diagnosis_data()
 
@@ -1,15 +1,157 @@
 from firebase_admin import firestore
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
+import asyncio
+import os
+from prompts import build_context_digest
+from singleflight import SingleFlight
 import auth
 
+# How dashboard statistics are computed:
+#   materialized - read the per-user stats document, building it on first use
+#   aggregate    - read the stats document if the user has one, otherwise run
+#                  server-side count/sum queries without downloading projects
+#   scan         - stream the user's projects
+STATS_STRATEGIES = ('materialized', 'aggregate', 'scan')
+DASHBOARD_STATS_STRATEGY = os.getenv("DASHBOARD_STATS_STRATEGY", "materialized")
+if DASHBOARD_STATS_STRATEGY not in STATS_STRATEGIES:
+    raise ValueError(f"DASHBOARD_STATS_STRATEGY must be one of {', '.join(STATS_STRATEGIES)}")
+# Days covered by the dashboard growth chart (0 = all history; the aggregate
+# strategy needs a window and reads every project instead)
+GROWTH_CHART_DAYS = int(os.getenv("GROWTH_CHART_DAYS", "90"))
+
 def get_db():
-    """Get Firestore client"""
+    """Get the async Firestore client"""
     return auth.db
 
-def get_user_stats(uid: str) -> Dict:
+# Per-user dashboard counters, materialized in users/{uid}/stats/projects, and
+# daily project creation counts, one users/{uid}/project_growth/{YYYY-MM}
+# document per month holding {"days": {"DD": count}}. Both are kept in step
+# with the projects collection by the transactions below. Documents older
+# than STATS_VERSION are rebuilt on first read (version 2 added growth).
+STATS_VERSION = 2
+STATS_COUNTERS = ['project_count', 'score_sum', 'active_count', 'stream_count']
+STATS_SOURCE_FIELDS = ['overall_score', 'revenue_streams_count', 'status']
+# One rebuild per user at a time: a first dashboard load asks for it from
+# several overview sections at once, and concurrent rebuild transactions
+# over the same documents only contend and retry. A rebuild outlives a
+# timed-out section so the next load finds the documents.
+stats_rebuilds = SingleFlight(cancel_abandoned=False)
+
+def _stats_ref(db, uid: str):
+    return db.collection('users').document(uid).collection('stats').document('projects')
+
+def _growth_ref(db, uid: str, month: str):
+    return db.collection('users').document(uid).collection('project_growth').document(month)
+
+def _date_key(ts) -> Optional[str]:
+    """YYYY-MM-DD for a Firestore timestamp, datetime or ISO string"""
+    if not ts:
+        return None
+    if hasattr(ts, 'date'):
+        return ts.date().isoformat()
+    if hasattr(ts, 'isoformat'):
+        return ts.isoformat().split('T')[0]
+    if isinstance(ts, str):
+        return ts.split('T')[0]
+    return None
+
+def _growth_increment(day: str, sign: int = 1) -> Dict:
+    """set(merge=True) payload adjusting one day's counter in its month document"""
+    return {'days': {day[8:10]: firestore.Increment(sign)}, 'updated_at': firestore.SERVER_TIMESTAMP}
+
+def _is_current(stats_doc) -> bool:
+    return stats_doc.exists and stats_doc.to_dict().get('version', 1) >= STATS_VERSION
+
+def _project_stats(project_data: Dict) -> Dict:
+    """A single project's contribution to the user's stats counters"""
+    return {
+        'project_count': 1,
+        'score_sum': project_data.get('overall_score') or 0,
+        'active_count': 1 if project_data.get('status') == 'active' else 0,
+        'stream_count': project_data.get('revenue_streams_count') or 0,
+    }
+
+def _stats_increments(delta: Dict, sign: int = 1) -> Dict:
+    update = {key: firestore.Increment(sign * value) for key, value in delta.items() if value}
+    update['updated_at'] = firestore.SERVER_TIMESTAMP
+    return update
+
+async def _scan_project_stats(db, uid: str, transaction=None, daily_counts: Optional[Dict] = None) -> Dict:
+    """Stats counters from a projected scan; also tallies creation days into `daily_counts` if given"""
+    totals = dict.fromkeys(STATS_COUNTERS, 0)
+    fields = STATS_SOURCE_FIELDS + (['created_at'] if daily_counts is not None else [])
+    projects_query = db.collection('users').document(uid).collection('projects').select(fields)
+    async for project in projects_query.stream(transaction=transaction):
+        project_data = project.to_dict()
+        for key, value in _project_stats(project_data).items():
+            totals[key] += value
+        day = _date_key(project_data.get('created_at')) if daily_counts is not None else None
+        if day:
+            daily_counts[day] = daily_counts.get(day, 0) + 1
+    return totals
+
+async def _aggregate_project_stats(db, uid: str) -> Dict:
+    """Stats counters from server-side aggregation queries; no project is downloaded"""
+    projects_ref = db.collection('users').document(uid).collection('projects')
+    totals_query = (projects_ref.count(alias='project_count')
+                    .sum('overall_score', alias='score_sum')
+                    .sum('revenue_streams_count', alias='stream_count'))
+    active_query = projects_ref.where('status', '==', 'active').count(alias='active_count')
+    results = await asyncio.gather(totals_query.get(), active_query.get())
+    return {result.alias: result.value for rows in results for result in rows[0]}
+
+@firestore.async_transactional
+async def _rebuild_stats_in_transaction(transaction, db, uid: str) -> Dict:
+    # Read the stats document first so a concurrent increment forces a retry
+    # instead of being overwritten
+    await _stats_ref(db, uid).get(transaction=transaction)
+    daily_counts = {}
+    totals = await _scan_project_stats(db, uid, transaction, daily_counts)
+    growth_query = db.collection('users').document(uid).collection('project_growth')
+    stale_months = {doc.id async for doc in growth_query.select([]).stream(transaction=transaction)}
+    
+    months = {}
+    for day, count in daily_counts.items():
+        months.setdefault(day[:7], {})[day[8:10]] = count
+    for month, days in months.items():
+        transaction.set(_growth_ref(db, uid, month), {'days': days, 'updated_at': firestore.SERVER_TIMESTAMP})
+    for month in stale_months - set(months):
+        transaction.delete(_growth_ref(db, uid, month))
+    transaction.set(_stats_ref(db, uid), {**totals, 'version': STATS_VERSION, 'updated_at': firestore.SERVER_TIMESTAMP})
+    return totals
+
+async def rebuild_user_stats(uid: str) -> Dict:
+    """
+    Recompute a user's stats and growth documents from their projects and
+    store them. Used to backfill users created before the documents existed
+    and to repair drift (see backfill_user_stats.py).
+    """
+    db = get_db()
+    if not db:
+        return dict.fromkeys(STATS_COUNTERS, 0)
+    totals = await stats_rebuilds.do(uid, lambda: _rebuild_stats_in_transaction(db.transaction(), db, uid))
+    return dict(totals)
+
+async def get_stored_user_stats(uid: str) -> Optional[Dict]:
+    """Read a user's stats document, or None if it hasn't been built yet"""
+    db = get_db()
+    if not db:
+        return None
+    stats_doc = await _stats_ref(db, uid).get()
+    return stats_doc.to_dict() if stats_doc.exists else None
+
+async def compute_user_stats(uid: str) -> Dict:
+    """Recompute a user's stats counters from their projects without storing them"""
+    db = get_db()
+    if not db:
+        return dict.fromkeys(STATS_COUNTERS, 0)
+    return await _scan_project_stats(db, uid)
+
+async def get_user_stats(uid: str, strategy: Optional[str] = None) -> Dict:
     """
-    Calculate user statistics for dashboard
+    Calculate user statistics for dashboard, using `strategy` (one of
+    STATS_STRATEGIES, default DASHBOARD_STATS_STRATEGY)
     Returns: {
         ideas_analyzed: int,
         revenue_streams: int,
@@ -26,33 +168,28 @@ def get_user_stats(uid: str) -> Dict:
             "active_projects": 0
         }
     
-    # Get all projects for user
-    projects_ref = db.collection('users').document(uid).collection('projects')
-    projects = projects_ref.stream()
-    
-    total_projects = 0
-    total_streams = 0
-    total_score = 0
-    active_count = 0
-    
-    for project in projects:
-        project_data = project.to_dict()
-        total_projects += 1
-        total_streams += project_data.get('revenue_streams_count', 0)
-        total_score += project_data.get('overall_score', 0)
-        if project_data.get('status') == 'active':
-            active_count += 1
+    strategy = strategy or DASHBOARD_STATS_STRATEGY
+    if strategy == 'scan':
+        totals = await _scan_project_stats(db, uid)
+    else:
+        # One small document instead of every project
+        totals = await get_stored_user_stats(uid)
+        if totals is None and strategy == 'aggregate':
+            totals = await _aggregate_project_stats(db, uid)
+        elif totals is None or (strategy == 'materialized' and totals.get('version', 1) < STATS_VERSION):
+            totals = await rebuild_user_stats(uid)
     
-    success_rate = (total_score / total_projects) if total_projects > 0 else 0
+    total_projects = totals.get('project_count', 0)
+    success_rate = (totals.get('score_sum', 0) / total_projects) if total_projects > 0 else 0
     
     return {
         "ideas_analyzed": total_projects,
-        "revenue_streams": total_streams,
+        "revenue_streams": totals.get('stream_count', 0),
         "success_rate": round(success_rate, 1),
-        "active_projects": active_count
+        "active_projects": totals.get('active_count', 0)
     }
 
-def get_user_alerts(uid: str, limit: int = 5) -> List[Dict]:
+async def get_user_alerts(uid: str, limit: int = 5) -> List[Dict]:
     """
     Fetch recent non-dismissed alerts for user
     """
@@ -64,7 +201,7 @@ def get_user_alerts(uid: str, limit: int = 5) -> List[Dict]:
     alerts_query = alerts_ref.where('dismissed', '==', False).order_by('created_at', direction=firestore.Query.DESCENDING).limit(limit)
     
     alerts = []
-    for alert_doc in alerts_query.stream():
+    async for alert_doc in alerts_query.stream():
         alert_data = alert_doc.to_dict()
         alert_data['id'] = alert_doc.id
         # Convert timestamp to ISO string for JSON serialization
@@ -79,9 +216,13 @@ def get_user_alerts(uid: str, limit: int = 5) -> List[Dict]:
     
     return alerts
 
-def get_user_projects(uid: str, limit: int = 5) -> List[Dict]:
+# Fields list views (dashboard, saved projects, project switchers) display
+PROJECT_SUMMARY_FIELDS = ['name', 'overall_score', 'status', 'revenue_streams_count', 'currency', 'created_at', 'updated_at']
+
+async def get_user_projects(uid: str, limit: int = 5, summary: bool = True) -> List[Dict]:
     """
-    Fetch recent projects for user
+    Fetch recent projects for user. With `summary` only PROJECT_SUMMARY_FIELDS
+    are read (a Firestore field mask) instead of the full analysis.
     """
     db = get_db()
     if not db:
@@ -89,9 +230,11 @@ def get_user_projects(uid: str, limit: int = 5) -> List[Dict]:
     
     projects_ref = db.collection('users').document(uid).collection('projects')
     projects_query = projects_ref.order_by('updated_at', direction=firestore.Query.DESCENDING).limit(limit)
+    if summary:
+        projects_query = projects_query.select(PROJECT_SUMMARY_FIELDS)
     
     projects = []
-    for project_doc in projects_query.stream():
+    async for project_doc in projects_query.stream():
         project_data = project_doc.to_dict()
         project_data['id'] = project_doc.id
         # Convert timestamps
@@ -107,7 +250,7 @@ def get_user_projects(uid: str, limit: int = 5) -> List[Dict]:
     
     return projects
 
-def create_project(uid: str, project_data: Dict) -> str:
+async def create_project(uid: str, project_data: Dict) -> str:
     """
     Create a new project for user
     Returns: project_id
@@ -122,14 +265,30 @@ def create_project(uid: str, project_data: Dict) -> str:
     project_data['created_at'] = firestore.SERVER_TIMESTAMP
     project_data['updated_at'] = firestore.SERVER_TIMESTAMP
     project_data['status'] = 'active'
+    # Compact summary reused by pivot/strategy/diagnosis prompts
+    project_data['context_digest'] = build_context_digest(project_data)
     
     # Create project
     project_ref = projects_ref.document()
-    project_ref.set(project_data)
+    await _create_project_in_transaction(db.transaction(), db, uid, project_ref, project_data)
     
     return project_ref.id
 
-def create_alert(uid: str, alert_data: Dict) -> str:
+@firestore.async_transactional
+async def _create_project_in_transaction(transaction, db, uid: str, project_ref, project_data: Dict):
+    stats_ref = _stats_ref(db, uid)
+    stats_doc = await stats_ref.get(transaction=transaction)
+    transaction.set(project_ref, project_data)
+    # A missing stats document is built from scratch on first read
+    if stats_doc.exists:
+        transaction.update(stats_ref, _stats_increments(_project_stats(project_data)))
+    if _is_current(stats_doc):
+        # created_at is a server timestamp; the commit lands within the same day
+        # except across midnight UTC, which rebuild_user_stats would correct
+        day = datetime.now(timezone.utc).date().isoformat()
+        transaction.set(_growth_ref(db, uid, day[:7]), _growth_increment(day), merge=True)
+
+async def create_alert(uid: str, alert_data: Dict) -> str:
     """
     Create a new alert for user
     Returns: alert_id
@@ -146,11 +305,11 @@ def create_alert(uid: str, alert_data: Dict) -> str:
     
     # Create alert
     alert_ref = alerts_ref.document()
-    alert_ref.set(alert_data)
+    await alert_ref.set(alert_data)
     
     return alert_ref.id
 
-def dismiss_alert(uid: str, alert_id: str) -> bool:
+async def dismiss_alert(uid: str, alert_id: str) -> bool:
     """
     Mark an alert as dismissed
     """
@@ -159,11 +318,11 @@ def dismiss_alert(uid: str, alert_id: str) -> bool:
         return True
     
     alert_ref = db.collection('users').document(uid).collection('alerts').document(alert_id)
-    alert_ref.update({'dismissed': True})
+    await alert_ref.update({'dismissed': True})
     
     return True
 
-def generate_ai_alerts(uid: str, project_data: Dict) -> List[str]:
+async def generate_ai_alerts(uid: str, project_data: Dict) -> List[str]:
     """
     Generate AI alerts based on project analysis
     Returns: list of alert_ids
@@ -176,7 +335,7 @@ def generate_ai_alerts(uid: str, project_data: Dict) -> List[str]:
     distribution_streams = [s for s in revenue_streams if 'marketplace' in s.get('name', '').lower() or 'platform' in s.get('name', '').lower()]
     
     if len(distribution_streams) == 0:
-        alert_id = create_alert(uid, {
+        alert_id = await create_alert(uid, {
             'type': 'warning',
             'title': 'Distribution Strategy Needed',
             'message': f'Your idea "{project_name}" may be weak on distribution channels. Consider adding marketplace or platform strategies.',
@@ -187,7 +346,7 @@ def generate_ai_alerts(uid: str, project_data: Dict) -> List[str]:
     # Check for low scoring streams
     low_score_streams = [s for s in revenue_streams if s.get('strength_score', 100) < 50]
     if len(low_score_streams) > 3:
-        alert_id = create_alert(uid, {
+        alert_id = await create_alert(uid, {
             'type': 'info',
             'title': 'Revenue Model Optimization',
             'message': f'Several revenue streams in "{project_name}" scored below 50. Focus on your strongest 2-3 streams for better results.',
@@ -197,7 +356,7 @@ def generate_ai_alerts(uid: str, project_data: Dict) -> List[str]:
     
     # Check for high overall score
     if project_data.get('overall_score', 0) >= 85:
-        alert_id = create_alert(uid, {
+        alert_id = await create_alert(uid, {
             'type': 'success',
             'title': 'Strong Business Model Detected',
             'message': f'Excellent! "{project_name}" has a robust revenue model with {project_data.get("overall_score")}% viability score.',
@@ -207,7 +366,7 @@ def generate_ai_alerts(uid: str, project_data: Dict) -> List[str]:
     
     return alerts
 
-def get_user_usage_stats(uid: str) -> Dict:
+async def get_user_usage_stats(uid: str) -> Dict:
     """
     Get user's current usage and plan limits
     Returns: {
@@ -228,12 +387,12 @@ def get_user_usage_stats(uid: str) -> Dict:
     
     # Get user plan
     user_ref = db.collection('users').document(uid)
-    user_doc = user_ref.get()
+    user_doc = await user_ref.get()
     plan = user_doc.to_dict().get('plan', 'starter') if user_doc.exists else 'starter'
     
     # Get usage
     usage_ref = user_ref.collection('usage').document('ai_generations')
-    usage_doc = usage_ref.get()
+    usage_doc = await usage_ref.get()
     current_usage = usage_doc.to_dict().get('count', 0) if usage_doc.exists else 0
     
     # Plan limits
@@ -253,55 +412,120 @@ def get_user_usage_stats(uid: str) -> Dict:
         "percentage": round(percentage, 1)
     }
 
-def get_project_growth(uid: str) -> List[Dict]:
+def _growth_series(daily_counts: Dict[str, int], baseline: int = 0, start: Optional[str] = None) -> List[Dict]:
     """
-    Get project growth data for chart
-    Returns: List of {date: str, count: int}
+    Cumulative {date, count} chart points from per-day creation counts on or
+    after `start`. `baseline` projects were created before `start` and are
+    carried by a point on `start` itself.
+    """
+    growth_data = []
+    cumulative = baseline
+    if start and baseline and not daily_counts.get(start):
+        growth_data.append({"date": start, "count": baseline})
+    for date in sorted(daily_counts):
+        if not daily_counts[date] or (start and date < start):
+            continue
+        cumulative += daily_counts[date]
+        growth_data.append({
+            "date": date,
+            "count": cumulative
+        })
+    return growth_data
+
+def _growth_start(days: int) -> Optional[str]:
+    if not days:
+        return None
+    return (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+
+async def _count(query) -> int:
+    result = await query.count(alias='count').get()
+    return result[0][0].value
+
+async def _aggregate_project_growth(db, uid: str, days: int) -> List[Dict]:
+    """
+    Growth over the last `days` days: a count query for the projects created
+    before the window and one `created_at`-only query for those inside it,
+    bucketed by day here. Two RPCs; billed one read per 1,000 counted
+    projects plus one per project in the window.
     """
-    db = get_db()
-    if not db:
-        return []
-    
+    projects_ref = db.collection('users').document(uid).collection('projects')
+    start_date = _growth_start(days)
+    start = datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc)
+    window_query = projects_ref.where('created_at', '>=', start).select(['created_at'])
+    baseline, window = await asyncio.gather(
+        _count(projects_ref.where('created_at', '<', start)),
+        window_query.get(),
+    )
+    daily_counts = {}
+    for project in window:
+        date_str = _date_key(project.to_dict().get('created_at'))
+        if date_str:
+            daily_counts[date_str] = daily_counts.get(date_str, 0) + 1
+    return _growth_series(daily_counts, baseline, start_date)
+
+async def _materialized_project_growth(db, uid: str, days: int) -> List[Dict]:
+    """Growth from the monthly bucket documents: O(months shown) reads"""
+    stats = await get_stored_user_stats(uid)
+    if stats is None or stats.get('version', 1) < STATS_VERSION:
+        await rebuild_user_stats(uid)
+        stats = await get_stored_user_stats(uid)
+    
+    start = _growth_start(days)
+    if start:
+        first_month, last_month = start[:7], datetime.now(timezone.utc).date().isoformat()[:7]
+        months = []
+        year, month = int(first_month[:4]), int(first_month[5:])
+        while f"{year:04d}-{month:02d}" <= last_month:
+            months.append(f"{year:04d}-{month:02d}")
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        month_docs = await asyncio.gather(*[_growth_ref(db, uid, m).get() for m in months])
+    else:
+        month_docs = [doc async for doc in db.collection('users').document(uid).collection('project_growth').stream()]
+    
+    daily_counts = {}
+    for doc in month_docs:
+        if doc.exists:
+            for day, count in (doc.to_dict().get('days') or {}).items():
+                daily_counts[f"{doc.id}-{day}"] = count
+    in_window = sum(count for day, count in daily_counts.items() if not start or day >= start)
+    baseline = stats.get('project_count', 0) - in_window if start else 0
+    return _growth_series(daily_counts, baseline, start)
+
+async def _scan_project_growth(db, uid: str, days: int) -> List[Dict]:
     projects_ref = db.collection('users').document(uid).collection('projects')
     projects = projects_ref.order_by('created_at').stream()
     
-    # Process projects into cumulative count by date
-    growth_data = []
-    cumulative_count = 0
-    
     # Group by date (YYYY-MM-DD)
     date_counts = {}
+    async for project in projects:
+        date_str = _date_key(project.to_dict().get('created_at'))
+        if date_str:
+            date_counts[date_str] = date_counts.get(date_str, 0) + 1
+    
+    start = _growth_start(days)
+    baseline = sum(count for date, count in date_counts.items() if start and date < start)
+    return _growth_series(date_counts, baseline, start)
+
+async def get_project_growth(uid: str, days: Optional[int] = None, strategy: Optional[str] = None) -> List[Dict]:
+    """
+    Get project growth data for chart, covering the last `days` days
+    (default GROWTH_CHART_DAYS, 0 = all history). Projects created before
+    the window are counted in the first point.
+    Returns: List of {date: str, count: int}
+    """
+    db = get_db()
+    if not db:
+        return []
     
-    for project in projects:
-        data = project.to_dict()
-        if 'created_at' in data and data['created_at']:
-            ts = data['created_at']
-            date_str = None
-            
-            if hasattr(ts, 'date'):
-                date_str = ts.date().isoformat()
-            elif hasattr(ts, 'isoformat'):
-                # Handle case where it might be a datetime but not have .date() (unlikely for datetime, but possible for some types)
-                date_str = ts.isoformat().split('T')[0]
-            elif isinstance(ts, str):
-                date_str = ts.split('T')[0]
-                
-            if date_str:
-                date_counts[date_str] = date_counts.get(date_str, 0) + 1
-            
-    # Sort dates
-    sorted_dates = sorted(date_counts.keys())
-    
-    for date in sorted_dates:
-        cumulative_count += date_counts[date]
-        growth_data.append({
-            "date": date,
-            "count": cumulative_count
-        })
-        
-    return growth_data
+    days = GROWTH_CHART_DAYS if days is None else days
+    strategy = strategy or DASHBOARD_STATS_STRATEGY
+    if strategy == 'materialized':
+        return await _materialized_project_growth(db, uid, days)
+    if strategy == 'aggregate' and days:
+        return await _aggregate_project_growth(db, uid, days)
+    return await _scan_project_growth(db, uid, days)
 
-def delete_project(uid: str, project_id: str) -> bool:
+async def delete_project(uid: str, project_id: str) -> bool:
     """
     Delete a project for user
     """
@@ -310,11 +534,26 @@ def delete_project(uid: str, project_id: str) -> bool:
         return True
     
     project_ref = db.collection('users').document(uid).collection('projects').document(project_id)
-    project_ref.delete()
+    await _delete_project_in_transaction(db.transaction(), db, uid, project_ref)
     
     return True
 
-def update_project_status(uid: str, project_id: str, status: str) -> bool:
+@firestore.async_transactional
+async def _delete_project_in_transaction(transaction, db, uid: str, project_ref):
+    stats_ref = _stats_ref(db, uid)
+    project_doc = await project_ref.get(field_paths=STATS_SOURCE_FIELDS + ['created_at'], transaction=transaction)
+    stats_doc = await stats_ref.get(transaction=transaction)
+    if not project_doc.exists:
+        return
+    transaction.delete(project_ref)
+    project_data = project_doc.to_dict()
+    if stats_doc.exists:
+        transaction.update(stats_ref, _stats_increments(_project_stats(project_data), sign=-1))
+    day = _date_key(project_data.get('created_at'))
+    if _is_current(stats_doc) and day:
+        transaction.set(_growth_ref(db, uid, day[:7]), _growth_increment(day, sign=-1), merge=True)
+
+async def update_project_status(uid: str, project_id: str, status: str) -> bool:
     """
     Update project status
     """
@@ -323,14 +562,27 @@ def update_project_status(uid: str, project_id: str, status: str) -> bool:
         return True
     
     project_ref = db.collection('users').document(uid).collection('projects').document(project_id)
-    project_ref.update({
+    await _update_project_status_in_transaction(db.transaction(), db, uid, project_ref, status)
+    
+    return True
+
+@firestore.async_transactional
+async def _update_project_status_in_transaction(transaction, db, uid: str, project_ref, status: str):
+    stats_ref = _stats_ref(db, uid)
+    project_doc = await project_ref.get(field_paths=['status'], transaction=transaction)
+    stats_doc = await stats_ref.get(transaction=transaction)
+    # Fails on commit if the project doesn't exist, like a plain update
+    transaction.update(project_ref, {
         'status': status,
         'updated_at': firestore.SERVER_TIMESTAMP
     })
-    
-    return True
+    if stats_doc.exists and project_doc.exists:
+        was_active = project_doc.to_dict().get('status') == 'active'
+        delta = int(status == 'active') - int(was_active)
+        if delta:
+            transaction.update(stats_ref, _stats_increments({'active_count': delta}))
 
-def get_project(uid: str, project_id: str) -> Optional[Dict]:
+async def get_project(uid: str, project_id: str) -> Optional[Dict]:
     """
     Get a single project details
     """
@@ -339,7 +591,7 @@ def get_project(uid: str, project_id: str) -> Optional[Dict]:
         return None
     
     project_ref = db.collection('users').document(uid).collection('projects').document(project_id)
-    doc = project_ref.get()
+    doc = await project_ref.get()
     
     if not doc.exists:
         return None
@@ -359,18 +611,10 @@ def get_project(uid: str, project_id: str) -> Optional[Dict]:
             
     return data
 
-def create_pivot(uid: str, pivot_data: Dict) -> str:
+def _prepare_pivot_data(pivot_data: Dict) -> Dict:
     """
-    Create a new pivot for user.
-    Expects pivot_data to contain 'analysis' field.
-    Returns: pivot_id
+    Fill in metadata and Strategy Board defaults on a new pivot document
     """
-    db = get_db()
-    if not db:
-        return "mock-pivot-id"
-    
-    pivots_ref = db.collection('users').document(uid).collection('pivots')
-    
     # Add metadata
     pivot_data['created_at'] = firestore.SERVER_TIMESTAMP
     pivot_data['updated_at'] = firestore.SERVER_TIMESTAMP
@@ -393,14 +637,53 @@ def create_pivot(uid: str, pivot_data: Dict) -> str:
             pivot_data['analysis']['status'] = pivot_data['status']
         if 'progress_percentage' not in pivot_data['analysis']:
             pivot_data['analysis']['progress_percentage'] = 0
-            
+    
+    return pivot_data
+
+async def create_pivot(uid: str, pivot_data: Dict) -> str:
+    """
+    Create a new pivot for user.
+    Expects pivot_data to contain 'analysis' field.
+    Returns: pivot_id
+    """
+    db = get_db()
+    if not db:
+        return "mock-pivot-id"
+    
+    pivots_ref = db.collection('users').document(uid).collection('pivots')
+    
     # Create pivot
     pivot_ref = pivots_ref.document()
-    pivot_ref.set(pivot_data)
+    await pivot_ref.set(_prepare_pivot_data(pivot_data))
     
     return pivot_ref.id
 
-def get_pivots(uid: str, project_id: Optional[str] = None) -> List[Dict]:
+# Firestore allows at most 500 writes per batch
+BATCH_WRITE_LIMIT = 500
+
+async def create_pivots(uid: str, pivots_data: List[Dict]) -> List[str]:
+    """
+    Create several pivots for user using batched writes.
+    Returns: pivot_ids in the same order as pivots_data
+    """
+    db = get_db()
+    if not db:
+        return [f"mock-pivot-id-{i}" for i in range(len(pivots_data))]
+    
+    pivots_ref = db.collection('users').document(uid).collection('pivots')
+    
+    pivot_ids = []
+    for start in range(0, len(pivots_data), BATCH_WRITE_LIMIT):
+        batch = db.batch()
+        for pivot_data in pivots_data[start:start + BATCH_WRITE_LIMIT]:
+            pivot_ref = pivots_ref.document()
+            batch.set(pivot_ref, _prepare_pivot_data(pivot_data))
+            pivot_ids.append(pivot_ref.id)
+        await batch.commit()
+    
+    return pivot_ids
+
+async def get_pivots(uid: str, project_id: Optional[str] = None) -> List[Dict]:
     """
     Fetch pivots for user, optionally filtered by project_id
     """
@@ -417,7 +700,7 @@ def get_pivots(uid: str, project_id: Optional[str] = None) -> List[Dict]:
         query = pivots_ref
     
     pivots = []
-    for doc in query.stream():
+    async for doc in query.stream():
         data = doc.to_dict()
         data['id'] = doc.id
         
@@ -463,7 +746,7 @@ def get_pivots(uid: str, project_id: Optional[str] = None) -> List[Dict]:
     
     return pivots
 
-def update_pivot_action(uid: str, pivot_id: str, action_index: int, completed: bool) -> Optional[Dict]:
+async def update_pivot_action(uid: str, pivot_id: str, action_index: int, completed: bool) -> Optional[Dict]:
     """
     Mark a specific action as complete/incomplete in a pivot
     Returns updated pivot data
@@ -474,7 +757,7 @@ def update_pivot_action(uid: str, pivot_id: str, action_index: int, completed: b
         return None
     
     pivot_ref = db.collection('users').document(uid).collection('pivots').document(pivot_id)
-    pivot_doc = pivot_ref.get()
+    pivot_doc = await pivot_ref.get()
     
     if not pivot_doc.exists:
         return None
@@ -509,7 +792,7 @@ def update_pivot_action(uid: str, pivot_id: str, action_index: int, completed: b
                     data['analysis']['started_at'] = datetime.now().isoformat()
             
             # Save updates
-            pivot_ref.update({
+            await pivot_ref.update({
                 'analysis': data['analysis'],
                 'updated_at': firestore.SERVER_TIMESTAMP
             })
@@ -520,7 +803,7 @@ def update_pivot_action(uid: str, pivot_id: str, action_index: int, completed: b
     
     return None
 
-def update_pivot_status(uid: str, pivot_id: str, new_status: str) -> bool:
+async def update_pivot_status(uid: str, pivot_id: str, new_status: str) -> bool:
     """
     Update the status of a pivot/strategy.
     Valid statuses: potential, discovery, validation, growth, success
@@ -561,10 +844,10 @@ def update_pivot_status(uid: str, pivot_id: str, new_status: str) -> bool:
         update_data['analysis.status'] = mapped_status
         update_data['analysis.completed_at'] = datetime.now().isoformat()
     
-    pivot_ref.update(update_data)
+    await pivot_ref.update(update_data)
     return True
 
-def get_pivot_by_id(uid: str, pivot_id: str) -> Optional[Dict]:
+async def get_pivot_by_id(uid: str, pivot_id: str) -> Optional[Dict]:
     """
     Get a single pivot by ID
     """
@@ -573,7 +856,7 @@ def get_pivot_by_id(uid: str, pivot_id: str) -> Optional[Dict]:
         return None
     
     pivot_ref = db.collection('users').document(uid).collection('pivots').document(pivot_id)
-    doc = pivot_ref.get()
+    doc = await pivot_ref.get()
     
     if not doc.exists:
         return None
@@ -589,7 +872,7 @@ def get_pivot_by_id(uid: str, pivot_id: str) -> Optional[Dict]:
     
     return data
 
-def update_project_diagnosis(uid: str, project_id: str, diagnosis_data: Dict) -> bool:
+async def update_project_diagnosis(uid: str, project_id: str, diagnosis_data: Dict) -> bool:
     """
     Update project with diagnosis results
     """
@@ -598,14 +881,14 @@ def update_project_diagnosis(uid: str, project_id: str, diagnosis_data: Dict) ->
         return True
     
     project_ref = db.collection('users').document(uid).collection('projects').document(project_id)
-    project_ref.update({
+    await project_ref.update({
         'diagnosis': diagnosis_data,
         'updated_at': firestore.SERVER_TIMESTAMP
     })
     
     return True
 
-def update_project_currency(uid: str, project_id: str, currency: str) -> bool:
+async def update_project_currency(uid: str, project_id: str, currency: str) -> bool:
     """
     Update project currency
     """
@@ -614,7 +897,7 @@ def update_project_currency(uid: str, project_id: str, currency: str) -> bool:
         return True
     
     project_ref = db.collection('users').document(uid).collection('projects').document(project_id)
-    project_ref.update({
+    await project_ref.update({
         'currency': currency,
         'updated_at': firestore.SERVER_TIMESTAMP
     })
@@ -626,7 +909,7 @@ def update_project_currency(uid: str, project_id: str, currency: str) -> bool:
 # NEW STRATEGY FUNCTIONS
 # ============================================================================
 
-def create_strategy(uid: str, strategy_data: Dict) -> str:
+async def create_strategy(uid: str, strategy_data: Dict) -> str:
     """
     Create a new strategy (pivot or fix) for user.
     Returns: strategy_id
@@ -659,12 +942,12 @@ def create_strategy(uid: str, strategy_data: Dict) -> str:
     
     # Create strategy
     strategy_ref = strategies_ref.document()
-    strategy_ref.set(strategy_data)
+    await strategy_ref.set(strategy_data)
     
     return strategy_ref.id
 
 
-def get_strategies(uid: str, project_id: Optional[str] = None, 
+async def get_strategies(uid: str, project_id: Optional[str] = None, 
                    strategy_type: Optional[str] = None,
                    status: Optional[str] = None) -> List[Dict]:
     """
@@ -678,7 +961,7 @@ def get_strategies(uid: str, project_id: Optional[str] = None,
     all_strategies = []
     
     # Get from pivots collection (legacy)
-    pivots = get_pivots(uid, project_id)
+    pivots = await get_pivots(uid, project_id)
     all_strategies.extend(pivots)
     
     # Get from strategies collection (new)
@@ -688,7 +971,7 @@ def get_strategies(uid: str, project_id: Optional[str] = None,
     if project_id:
         query = query.where('project_id', '==', project_id)
     
-    for doc in query.stream():
+    async for doc in query.stream():
         data = doc.to_dict()
         data['id'] = doc.id
         
@@ -727,7 +1010,7 @@ def get_strategies(uid: str, project_id: Optional[str] = None,
     return all_strategies
 
 
-def get_user_settings(uid: str) -> Dict:
+async def get_user_settings(uid: str) -> Dict:
     """
     Get user settings preferences
     """
@@ -736,14 +1019,14 @@ def get_user_settings(uid: str) -> Dict:
         return {"currency": "NGN", "theme": "dark"}
     
     settings_ref = db.collection('users').document(uid).collection('settings').document('preferences')
-    doc = settings_ref.get()
+    doc = await settings_ref.get()
     
     if not doc.exists:
         return {"currency": "NGN", "theme": "dark"}
         
     return doc.to_dict()
 
-def update_user_settings(uid: str, settings_data: Dict) -> bool:
+async def update_user_settings(uid: str, settings_data: Dict) -> bool:
     """
     Update user settings preferences
     """
@@ -752,11 +1035,11 @@ def update_user_settings(uid: str, settings_data: Dict) -> bool:
         return True
     
     settings_ref = db.collection('users').document(uid).collection('settings').document('preferences')
-    settings_ref.set(settings_data, merge=True)
+    await settings_ref.set(settings_data, merge=True)
     
     return True
 
-def get_strategy_details(uid: str, strategy_id: str) -> Optional[Dict]:
+async def get_strategy_details(uid: str, strategy_id: str) -> Optional[Dict]:
     """
     Get detailed strategy data (market, risks, timeline)
     """
@@ -766,12 +1049,12 @@ def get_strategy_details(uid: str, strategy_id: str) -> Optional[Dict]:
     
     # Try strategies collection first
     doc_ref = db.collection('users').document(uid).collection('strategies').document(strategy_id)
-    doc = doc_ref.get()
+    doc = await doc_ref.get()
     
     if not doc.exists:
         # Try pivots collection
         doc_ref = db.collection('users').document(uid).collection('pivots').document(strategy_id)
-        doc = doc_ref.get()
+        doc = await doc_ref.get()
         
     if not doc.exists:
         return None
@@ -796,7 +1079,7 @@ def get_strategy_details(uid: str, strategy_id: str) -> Optional[Dict]:
         "timeline": data.get("timeline", [])
     }
 
-def update_strategy_details(uid: str, strategy_id: str, details: Dict) -> bool:
+async def update_strategy_details(uid: str, strategy_id: str, details: Dict) -> bool:
     """
     Update detailed strategy data
     """
@@ -806,12 +1089,12 @@ def update_strategy_details(uid: str, strategy_id: str, details: Dict) -> bool:
     
     # Try strategies collection first
     doc_ref = db.collection('users').document(uid).collection('strategies').document(strategy_id)
-    doc = doc_ref.get()
+    doc = await doc_ref.get()
     
     if not doc.exists:
         # Try pivots collection
         doc_ref = db.collection('users').document(uid).collection('pivots').document(strategy_id)
-        doc = doc_ref.get()
+        doc = await doc_ref.get()
         
     if not doc.exists:
         return False
@@ -834,6 +1117,6 @@ def update_strategy_details(uid: str, strategy_id: str, details: Dict) -> bool:
         # Note: We avoid updating analysis.market_fit directly here to prevent overwriting if analysis structure is complex
         # But we ensure description is set at top level
 
-    doc_ref.update(update_data)
+    await doc_ref.update(update_data)
     
     return True
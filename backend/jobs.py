@@ -0,0 +1,278 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+class MemoryJobStore:
+    """In-process job store. Jobs are lost on restart."""
+
+    def __init__(self, ttl_seconds: float = 86400):
+        self.ttl_seconds = ttl_seconds
+        self.jobs = OrderedDict()
+        self.queue = asyncio.Queue()
+        self.leases = {}  # running job id -> lease expiry
+
+    async def save(self, job: Dict):
+        self.jobs[job["id"]] = json.dumps(job)
+        self.jobs.move_to_end(job["id"])
+        self._prune()
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        raw = self.jobs.get(job_id)
+        return json.loads(raw) if raw else None
+
+    async def push(self, job_id: str):
+        self.queue.put_nowait(job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def queued(self) -> int:
+        return self.queue.qsize()
+
+    async def lease(self, job_id: str, expires_at: float):
+        self.leases[job_id] = expires_at
+
+    async def release(self, job_id: str):
+        self.leases.pop(job_id, None)
+
+    async def claim_expired(self, now: float) -> List[str]:
+        expired = [job_id for job_id, expires_at in self.leases.items() if expires_at <= now]
+        for job_id in expired:
+            del self.leases[job_id]
+        return expired
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl_seconds
+        while self.jobs:
+            oldest = json.loads(next(iter(self.jobs.values())))
+            if oldest["updated_at"] >= cutoff:
+                break
+            self.jobs.popitem(last=False)
+
+    async def close(self):
+        pass
+
+class RedisJobStore:
+    """
+    Redis-backed job store, so jobs survive restarts and can be shared by
+    several API processes. Each job is a JSON string with a TTL; pending job
+    ids are kept in a list and running ones in a sorted set scored by lease
+    expiry.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float = 86400, prefix: str = "elementry:jobs"):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url, decode_responses=True)
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+        self.queue_key = f"{prefix}:queue"
+        self.leases_key = f"{prefix}:leases"
+        self._queued = 0
+
+    async def save(self, job: Dict):
+        await self.redis.set(f"{self.prefix}:{job['id']}", json.dumps(job), ex=self.ttl_seconds)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        raw = await self.redis.get(f"{self.prefix}:{job_id}")
+        return json.loads(raw) if raw else None
+
+    async def push(self, job_id: str):
+        self._queued = await self.redis.rpush(self.queue_key, job_id)
+
+    async def pop(self, timeout: float) -> Optional[str]:
+        item = await self.redis.blpop(self.queue_key, timeout=max(1, int(timeout)))
+        return item[1] if item else None
+
+    def queued(self) -> int:
+        # Last length seen on push; exact length needs a round trip
+        return self._queued
+
+    async def lease(self, job_id: str, expires_at: float):
+        await self.redis.zadd(self.leases_key, {job_id: expires_at})
+
+    async def release(self, job_id: str):
+        await self.redis.zrem(self.leases_key, job_id)
+
+    async def claim_expired(self, now: float) -> List[str]:
+        expired = await self.redis.zrangebyscore(self.leases_key, "-inf", now)
+        # Only the process whose ZREM removes the lease re-queues the job
+        return [job_id for job_id in expired if await self.redis.zrem(self.leases_key, job_id)]
+
+    async def close(self):
+        await self.redis.close()
+
+def build_job_store(url: Optional[str], ttl_seconds: float):
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisJobStore(url, ttl_seconds)
+    return MemoryJobStore(ttl_seconds)
+
+class JobQueue:
+    """
+    Background execution of long AI requests.
+
+    `submit` stores a queued job and returns it immediately; a pool of
+    `concurrency` workers runs the handler registered for the job type and
+    stores the result (or error). Clients poll `get` or iterate `watch`.
+    Handlers are `async def handler(uid, payload) -> result` and the result
+    must be JSON serializable (Pydantic models are dumped).
+
+    A running job holds a lease of `lease_seconds` that its worker renews
+    while the handler runs. If the process dies, the lease expires and the
+    job is queued again by the next worker to poll (in any process sharing
+    the store).
+    """
+
+    def __init__(self, store, concurrency: int = 4, poll_interval: float = 1.0, lease_seconds: float = 60):
+        self.store = store
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._next_lease_check = 0.0
+        self.handlers: Dict[str, Callable[[str, Dict], Awaitable[Any]]] = {}
+        self.workers = []
+        self.running = 0
+        self.counts = {SUCCEEDED: 0, FAILED: 0, "requeued": 0}
+        self._changed = asyncio.Condition()
+
+    def register(self, job_type: str, handler: Callable[[str, Dict], Awaitable[Any]]):
+        self.handlers[job_type] = handler
+
+    async def submit(self, job_type: str, uid: str, payload: Dict) -> Dict:
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "type": job_type,
+            "uid": uid,
+            "status": QUEUED,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        await self.store.save(job)
+        await self.store.push(job["id"])
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return await self.store.get(job_id)
+
+    async def watch(self, job_id: str):
+        """Yield the job every time its status changes, until it finishes"""
+        last_status = None
+        while True:
+            job = await self.store.get(job_id)
+            if job is None:
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield job
+            if job["status"] in FINISHED:
+                return
+            # Woken early by local workers; polling covers other processes
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _update(self, job: Dict, **fields):
+        job.update(fields, updated_at=time.time())
+        await self.store.save(job)
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _run(self, job_id: str):
+        job = await self.store.get(job_id)
+        if job is None or job["status"] != QUEUED:
+            return
+        await self.store.lease(job_id, time.time() + self.lease_seconds)
+        await self._update(job, status=RUNNING, started_at=time.time())
+        self.running += 1
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await self.handlers[job["type"]](job["uid"], job["payload"])
+            if hasattr(result, "model_dump"):
+                result = result.model_dump(mode="json")
+            await self._update(job, status=SUCCEEDED, result=result, finished_at=time.time())
+            self.counts[SUCCEEDED] += 1
+        except asyncio.CancelledError:
+            # Shutting down: put the job back so it runs after a restart
+            await self._update(job, status=QUEUED, started_at=None)
+            await self.store.push(job_id)
+            raise
+        except Exception as e:
+            print(f"Job {job_id} ({job['type']}) failed: {e}")
+            await self._update(job, status=FAILED, error=str(getattr(e, "detail", e)), finished_at=time.time())
+            self.counts[FAILED] += 1
+        finally:
+            heartbeat.cancel()
+            self.running -= 1
+            await self.store.release(job_id)
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self.store.lease(job_id, time.time() + self.lease_seconds)
+
+    async def _requeue_expired(self):
+        """Queue again the running jobs whose worker stopped renewing their lease"""
+        now = time.time()
+        if now < self._next_lease_check:
+            return
+        self._next_lease_check = now + self.poll_interval
+        for job_id in await self.store.claim_expired(now):
+            job = await self.store.get(job_id)
+            if job is None or job["status"] != RUNNING:
+                continue
+            print(f"Job {job_id} ({job['type']}) lost its worker; queueing it again")
+            await self._update(job, status=QUEUED, started_at=None)
+            await self.store.push(job_id)
+            self.counts["requeued"] += 1
+
+    async def _worker(self):
+        while True:
+            try:
+                await self._requeue_expired()
+                job_id = await self.store.pop(self.poll_interval)
+                if job_id:
+                    await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job worker error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def start(self):
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        await self.store.close()
+
+    def stats(self) -> Dict:
+        return {
+            "workers": len(self.workers),
+            "running": self.running,
+            "queued": self.store.queued(),
+            **self.counts,
+        }
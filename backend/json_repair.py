@@ -0,0 +1,206 @@
+import json
+import re
+from typing import Any
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+class JSONRepairError(ValueError):
+    pass
+
+# How responses were parsed since startup
+stats = {"strict": 0, "repaired": 0, "failed": 0}
+
+def parse_model_json(text: str) -> Any:
+    """
+    Parse JSON out of a model response, repairing common defects.
+
+    Strict json.loads is tried first, so well-formed responses pay nothing
+    extra. Otherwise the first JSON object/array is extracted (ignoring
+    markdown fences and surrounding prose) and repaired: // and /* */
+    comments, trailing commas, Python literals and a truncated tail
+    (unterminated strings and unclosed brackets) are fixed up.
+    Raises JSONRepairError if nothing usable can be recovered.
+    """
+    if text is None:
+        stats["failed"] += 1
+        raise JSONRepairError("Empty response")
+    try:
+        data = json.loads(text)
+        stats["strict"] += 1
+        return data
+    except ValueError:
+        pass
+
+    candidate = _extract(text)
+    if candidate is None:
+        stats["failed"] += 1
+        raise JSONRepairError("No JSON object found in response")
+
+    repaired = repair_json(candidate)
+    try:
+        data = json.loads(repaired)
+    except ValueError as e:
+        stats["failed"] += 1
+        raise JSONRepairError(f"Could not repair JSON: {e}") from e
+    stats["repaired"] += 1
+    return data
+
+def _extract(text: str):
+    """Return the text from the first '{' or '[', preferring fenced blocks"""
+    fenced = _FENCE.search(text)
+    if fenced and re.search(r"[\[{]", fenced.group(1)):
+        text = fenced.group(1)
+    match = re.search(r"[\[{]", text)
+    if not match:
+        return None
+    return text[match.start():]
+
+def repair_json(text: str) -> str:
+    """
+    Single-pass repair of a JSON document that starts at text[0].
+    Stops at the point where the top-level value closes, which drops any
+    trailing prose.
+    """
+    out = []
+    stack = []
+    in_string = False
+    escape = False
+    i = 0
+    n = len(text)
+
+    while i < n:
+        c = text[i]
+
+        if in_string:
+            if escape:
+                escape = False
+                out.append(c)
+            elif c == "\\":
+                escape = True
+                out.append(c)
+            elif c == '"':
+                in_string = False
+                out.append(c)
+            elif c == "\n":
+                # Raw newlines are invalid inside JSON strings
+                out.append("\\n")
+            elif c in "\r\t":
+                out.append("\\r" if c == "\r" else "\\t")
+            else:
+                out.append(c)
+            i += 1
+            continue
+
+        if c == "/" and i + 1 < n and text[i + 1] == "/":
+            newline = text.find("\n", i)
+            i = n if newline == -1 else newline
+            continue
+        if c == "/" and i + 1 < n and text[i + 1] == "*":
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+
+        if c == '"':
+            _insert_missing_comma(out)
+            in_string = True
+            out.append(c)
+        elif c in "{[":
+            _insert_missing_comma(out)
+            stack.append("}" if c == "{" else "]")
+            out.append(c)
+        elif c in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                out.append(stack.pop())
+            if not stack:
+                break
+        elif c == "'" and _is_value_position(out):
+            # Single-quoted string: re-quote it
+            end = i + 1
+            value = []
+            while end < n and text[end] != "'":
+                value.append(text[end])
+                end += 1
+            out.append(json.dumps("".join(value)))
+            i = end + 1
+            continue
+        elif c.isalpha():
+            end = i
+            while end < n and (text[end].isalnum() or text[end] == "_"):
+                end += 1
+            word = text[i:end]
+            rest = text[end:].lstrip()
+            if rest.startswith(":"):
+                # Unquoted object key
+                out.append(json.dumps(word))
+            else:
+                out.append({"True": "true", "False": "false", "None": "null"}.get(word, word))
+            i = end
+            continue
+        else:
+            out.append(c)
+        i += 1
+
+    # Close a truncated tail
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    _trim_incomplete_tail(out, in_object=bool(stack) and stack[-1] == "}")
+    while stack:
+        _strip_trailing_comma(out)
+        closer = stack.pop()
+        # An array element cut off before its first field would close as {}
+        if closer == "}" and stack and stack[-1] == "]" and _drop_empty_open_object(out):
+            continue
+        out.append(closer)
+
+    return "".join(out)
+
+def _last_significant(out: list) -> int:
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    return i
+
+def _strip_trailing_comma(out: list):
+    i = _last_significant(out)
+    if i >= 0 and out[i] == ",":
+        del out[i:]
+
+def _insert_missing_comma(out: list):
+    # `} {` or `"a" "b"` between siblings: the model forgot a comma
+    i = _last_significant(out)
+    if i >= 0 and out[i][-1] in '}]"':
+        out.append(",")
+
+def _drop_empty_open_object(out: list) -> bool:
+    text = "".join(out).rstrip()
+    if not text.endswith("{"):
+        return False
+    text = text[:-1].rstrip()
+    out[:] = [text[:-1] if text.endswith(",") else text]
+    return True
+
+def _is_value_position(out: list) -> bool:
+    i = _last_significant(out)
+    return i < 0 or out[i][-1] in ":,[{"
+
+def _trim_incomplete_tail(out: list, in_object: bool):
+    """
+    Drop a dangling key, separator or half-written value (a lone sign, a
+    partial true/false/null) left by truncation, e.g. `{"a": 1, "b"`,
+    `{"a": 1, "b": -` or `{"a": 1, "b": tru` -> `{"a": 1`
+    """
+    text = "".join(out).rstrip()
+    previous = None
+    while previous != text:
+        previous = text
+        text = re.sub(r',\s*$', "", text)
+        if in_object:
+            text = re.sub(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$', r"\1", text)
+        text = re.sub(r':\s*$', ": null", text)
+        text = re.sub(r'(\d)(?:\.|[eE][-+]?)$', r"\1", text)
+        text = re.sub(r'([:,\[]\s*)(?:[-+]|t(?:ru?)?|f(?:a(?:ls?)?)?|n(?:ul?)?)$', r"\1", text)
+    text = re.sub(r'\{\s*,', "{", text)
+    out[:] = [text]
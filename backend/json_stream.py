@@ -0,0 +1,155 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a streamed top-level JSON object.
+
+    Feed it text chunks as they arrive from the model. Every time a top-level
+    value closes it is returned as an event:
+        ("field", key, None, value)  - a complete scalar or object value
+        ("item", key, index, value)  - one complete item of a top-level array
+
+    Anything before the first "{" (e.g. a ```json fence) is ignored, as are
+    // comments outside strings. Segments that fail to decode are skipped;
+    the caller validates the full document at the end anyway.
+    """
+
+    def __init__(self):
+        self.text = []          # Cleaned characters (comments removed)
+        self.length = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.in_comment = False
+        self.pending_slash = False
+        self.done = False
+
+        self.key = None
+        self.key_start = None
+        self.expect_key = False
+        self.value_start = None
+        self.value_is_array = False
+        self.awaiting_value = False
+        self.item_start = None
+        self.item_index = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, str, Optional[int], Any]]:
+        events = []
+        for c in chunk:
+            if self.done:
+                break
+            self._consume(c, events)
+        return events
+
+    def document(self) -> str:
+        """Return the cleaned text seen so far (comments stripped)."""
+        return "".join(self.text)
+
+    def _append(self, c: str):
+        self.text.append(c)
+        self.length += 1
+
+    def _slice(self, start: int, end: int) -> str:
+        return "".join(self.text[start:end])
+
+    def _decode(self, start: int, end: int):
+        try:
+            return True, json.loads(self._slice(start, end))
+        except ValueError:
+            return False, None
+
+    def _consume(self, c: str, events: list):
+        if self.in_comment:
+            if c == "\n":
+                self.in_comment = False
+            return
+
+        if self.in_string:
+            self._append(c)
+            if self.escape:
+                self.escape = False
+            elif c == "\\":
+                self.escape = True
+            elif c == '"':
+                self.in_string = False
+                if self.depth == 1 and self.key_start is not None:
+                    ok, key = self._decode(self.key_start, self.length)
+                    self.key = key if ok else None
+                    self.key_start = None
+            return
+
+        if self.pending_slash:
+            self.pending_slash = False
+            if c == "/":
+                self.in_comment = True
+                return
+            self._append("/")
+
+        if c == "/" and self.depth > 0:
+            self.pending_slash = True
+            return
+
+        if self.depth == 0:
+            if c == "{":
+                self._append(c)
+                self.depth = 1
+                self.expect_key = True
+            return
+
+        if c.isspace():
+            self._append(c)
+            return
+
+        # Mark where a top-level value or array item begins
+        if self.depth == 1 and self.awaiting_value:
+            self.value_start = self.length
+            self.awaiting_value = False
+            self.value_is_array = c == "["
+        elif self.depth == 2 and self.value_is_array and self.item_start is None and c not in ",]":
+            self.item_start = self.length
+
+        self._append(c)
+
+        if c == '"':
+            self.in_string = True
+            if self.depth == 1 and self.expect_key:
+                self.key_start = self.length - 1
+                self.expect_key = False
+        elif c in "{[":
+            self.depth += 1
+        elif c in "}]":
+            if self.depth == 2 and self.value_is_array and c == "]":
+                self._finish_item(self.length - 1, events)
+            self.depth -= 1
+            if self.depth == 0:
+                self._finish_value(self.length - 1, events)
+                self.done = True
+        elif c == ":" and self.depth == 1:
+            self.awaiting_value = True
+        elif c == ",":
+            if self.depth == 1:
+                self._finish_value(self.length - 1, events)
+                self.expect_key = True
+            elif self.depth == 2 and self.value_is_array:
+                self._finish_item(self.length - 1, events)
+
+    def _finish_item(self, end: int, events: list):
+        if self.item_start is not None:
+            ok, value = self._decode(self.item_start, end)
+            if ok:
+                events.append(("item", self.key, self.item_index, value))
+            self.item_index += 1
+        self.item_start = None
+
+    def _finish_value(self, end: int, events: list):
+        if self.value_start is not None and self.key is not None and not self.value_is_array:
+            ok, value = self._decode(self.value_start, end)
+            if ok:
+                events.append(("field", self.key, None, value))
+        self.key = None
+        self.value_start = None
+        self.value_is_array = False
+        self.awaiting_value = False
+        self.item_start = None
+        self.item_index = 0
@@ -1,13 +1,80 @@
-from fastapi import FastAPI, HTTPException, Header, Depends
+from fastapi import FastAPI, HTTPException, Header, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
-from models import DeconstructionRequest, DeconstructionResult, PivotRequest, DiagnosisRequest, DiagnosisResult, StrategyRequest, StrategyUpdateRequest, SettingsUpdate, StrategyDetailsUpdate
-from engine import deconstruct_business_idea, generate_diagnosis
-from auth import verify_token, sync_user_to_firestore, check_ai_limit, increment_ai_usage
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from models import DeconstructionRequest, DeconstructionResult, PivotRequest, BulkPivotRequest, DiagnosisRequest, DiagnosisResult, StrategyRequest, StrategyUpdateRequest, SettingsUpdate, StrategyDetailsUpdate
+from engine import deconstruct_business_idea, stream_deconstruction, generate_diagnosis, close_client, deconstruction_cache, similarity_index, inflight_requests, field_repair_stats, prompt_usage, llm_providers, llm_router
+from auth import verify_token, sync_user_to_firestore, check_ai_limit, get_ai_quota, get_user_plan, increment_ai_usage
 from typing import Annotated
 from middleware import RateLimiter
+from jobs import JobQueue, build_job_store
+from speculation import PivotSpeculator
+from response_cache import ResponseCache
+from singleflight import SingleFlight
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import json_repair
+import telemetry
+import os
 import time
 
-app = FastAPI(title="Elemental AI API", description="The Intelligence of Gradual Growth", version="0.1.0")
+# Answer to any AI request once the user's plan quota is used up, whether
+# it is checked on submission or when a background job starts
+AI_LIMIT_STATUS = 429
+AI_LIMIT_DETAIL = "AI generation limit reached for your plan. Upgrade to Pro for more."
+
+# Background jobs for AI generation. JOB_STORE_URL=redis://... persists jobs
+# in Redis; otherwise they are kept in memory.
+job_queue = JobQueue(
+    build_job_store(os.getenv("JOB_STORE_URL"), float(os.getenv("JOB_TTL", str(60 * 60 * 24)))),
+    concurrency=int(os.getenv("JOB_WORKERS", "4")),
+    lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "60")),
+)
+
+# Pivot options analyzed in the background after a deconstruction, per plan.
+# Opt-in with SPECULATIVE_PIVOTS=true; users can still turn it off with the
+# aiOptimization setting.
+SPECULATIVE_PIVOTS_PER_PLAN = {
+    plan.strip(): int(count)
+    for plan, _, count in (entry.partition("=") for entry in os.getenv("SPECULATIVE_PIVOTS_PER_PLAN", "starter=1,pro=3,empire=5").split(",") if "=" in entry)
+}
+
+async def _speculation_budget(uid: str) -> int:
+    """How many pivot options to pre-generate for a user's new project"""
+    from firestore_utils import get_user_settings, get_user_usage_stats
+    
+    if not (await get_user_settings(uid)).get('aiOptimization', True):
+        return 0
+    usage = await get_user_usage_stats(uid)
+    if usage['current_usage'] >= usage['limit']:
+        return 0
+    return SPECULATIVE_PIVOTS_PER_PLAN.get(usage['plan'], 0)
+
+async def _speculative_pivot(uid: str, project: dict, pivot_name: str):
+    from engine import generate_pivot_analysis
+    return await generate_pivot_analysis(
+        project.get('name', ''), pivot_name, project.get('currency', 'NGN'), _project_context(project), await get_user_plan(uid)
+    )
+
+pivot_speculator = PivotSpeculator(
+    _speculative_pivot,
+    _speculation_budget,
+    enabled=os.getenv("SPECULATIVE_PIVOTS", "false").lower() == "true",
+    concurrency=int(os.getenv("SPECULATIVE_PIVOT_CONCURRENCY", "2")),
+    ttl=float(os.getenv("SPECULATIVE_PIVOT_TTL", "1800")),
+    delay=float(os.getenv("SPECULATIVE_PIVOT_DELAY", "1")),
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    yield
+    await pivot_speculator.stop()
+    await job_queue.stop()
+    # Release the shared OpenRouter connection pool
+    await close_client()
+
+app = FastAPI(title="Elemental AI API", description="The Intelligence of Gradual Growth", version="0.1.0", lifespan=lifespan)
 
 # Initialize Rate Limiter
 rate_limiter = RateLimiter(requests_per_minute=20)
@@ -61,43 +128,103 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/status")
+async def status_check():
+    """Runtime statistics for the AI engine"""
+    from firestore_utils import stats_rebuilds
+    return {
+        "deconstruction_cache": deconstruction_cache.stats(),
+        "similarity_index": similarity_index.stats(),
+        "singleflight": inflight_requests.stats(),
+        "json_repair": json_repair.stats,
+        "field_repair": field_repair_stats,
+        "prompt_usage": prompt_usage,
+        "llm_providers": llm_providers.stats(),
+        "llm_routing": llm_router.stats(),
+        "jobs": job_queue.stats(),
+        "speculative_pivots": pivot_speculator.stats(),
+        "overview_cache": {**overview_cache.stats(), "refreshes": overview_refreshes.stats(), "stats_rebuilds": stats_rebuilds.stats()},
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics for LLM calls"""
+    return PlainTextResponse(telemetry.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/auth/sync")
 async def sync_user(token_data: dict = Depends(get_token)):
-    user_data = sync_user_to_firestore(token_data)
+    user_data = await sync_user_to_firestore(token_data)
     return {"status": "success", "user": user_data}
 
 @app.post("/deconstruct", response_model=DeconstructionResult, dependencies=[Depends(rate_limiter)])
 async def deconstruct(request: DeconstructionRequest, token_data: dict = Depends(get_token)):
     # Check limits
-    if not check_ai_limit(token_data['uid']):
-        raise HTTPException(status_code=403, detail="AI generation limit reached for your plan. Upgrade to Pro for more.")
+    quota = await get_ai_quota(token_data['uid'])
+    if not quota['allowed']:
+        raise HTTPException(status_code=AI_LIMIT_STATUS, detail=AI_LIMIT_DETAIL)
 
-    result = await deconstruct_business_idea(request.idea, request.currency)
+    result = await deconstruct_business_idea(request.idea, request.currency, quota['plan'])
     
-    # Save as project
+    return await _save_deconstruction(token_data['uid'], request.idea, result)
+
+async def _save_deconstruction(uid: str, idea: str, result: DeconstructionResult) -> DeconstructionResult:
+    """Persist a deconstruction as a new project and count it against the user's quota"""
     from firestore_utils import create_project
     
     # Convert Pydantic model to dict
-    project_data = result.dict()
-    project_data['name'] = request.idea # Use idea as name for now
+    project_data = result.model_dump()
+    project_data['name'] = idea # Use idea as name for now
     
-    project_id = create_project(token_data['uid'], project_data)
+    project_id = await create_project(uid, project_data)
     
     # Add project_id to result
     result.project_id = project_id
     
     # Increment usage
-    increment_ai_usage(token_data['uid'])
+    await increment_ai_usage(uid)
+    
+    # Warm up the pivots the user is likely to open next
+    pivot_speculator.schedule(uid, project_id, project_data)
     
     return result
 
+def _sse(event: str, data) -> str:
+    """Format a single Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/deconstruct/stream", dependencies=[Depends(rate_limiter)])
+async def deconstruct_stream(request: DeconstructionRequest, token_data: dict = Depends(get_token)):
+    """
+    Stream a deconstruction as Server-Sent Events.
+    Emits one event per completed field/element while the model is generating,
+    then a final `result` event with the saved project.
+    """
+    quota = await get_ai_quota(token_data['uid'])
+    if not quota['allowed']:
+        raise HTTPException(status_code=AI_LIMIT_STATUS, detail=AI_LIMIT_DETAIL)
+
+    async def event_stream():
+        async for event, data in stream_deconstruction(request.idea, request.currency, quota['plan']):
+            if event == "result":
+                result = await _save_deconstruction(token_data['uid'], request.idea, data['result'])
+                yield _sse("timings", data['timings'])
+                yield _sse("result", result.model_dump())
+            else:
+                yield _sse(event, data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/dashboard/stats")
 async def get_dashboard_stats(token_data: dict = Depends(get_token)):
     """Get dashboard statistics for the authenticated user"""
     from firestore_utils import get_user_stats, get_user_usage_stats
     
-    stats = get_user_stats(token_data['uid'])
-    usage = get_user_usage_stats(token_data['uid'])
+    stats = await get_user_stats(token_data['uid'])
+    usage = await get_user_usage_stats(token_data['uid'])
     
     return {
         "stats": stats,
@@ -109,15 +236,18 @@ async def get_dashboard_alerts(token_data: dict = Depends(get_token)):
     """Get recent alerts for the authenticated user"""
     from firestore_utils import get_user_alerts
     
-    alerts = get_user_alerts(token_data['uid'], limit=5)
+    alerts = await get_user_alerts(token_data['uid'], limit=5)
     return {"alerts": alerts}
 
 @app.get("/dashboard/projects")
-async def get_dashboard_projects(limit: int = 10, token_data: dict = Depends(get_token)):
-    """Get recent projects for the authenticated user"""
+async def get_dashboard_projects(limit: int = 10, full: bool = False, token_data: dict = Depends(get_token)):
+    """
+    Get recent projects for the authenticated user: list-view summaries,
+    or complete documents with ?full=true
+    """
     from firestore_utils import get_user_projects
     
-    projects = get_user_projects(token_data['uid'], limit=limit)
+    projects = await get_user_projects(token_data['uid'], limit=limit, summary=not full)
     return {"projects": projects}
 
 @app.delete("/dashboard/projects/{project_id}")
@@ -125,7 +255,8 @@ async def delete_project_endpoint(project_id: str, token_data: dict = Depends(ge
     """Delete a project"""
     from firestore_utils import delete_project
     
-    success = delete_project(token_data['uid'], project_id)
+    success = await delete_project(token_data['uid'], project_id)
+    pivot_speculator.cancel(token_data['uid'], project_id)
     
     # Invalidate cache if exists
     cache_key = (token_data['uid'], project_id)
@@ -139,31 +270,13 @@ async def dismiss_alert_endpoint(alert_id: str, token_data: dict = Depends(get_t
     """Dismiss an alert"""
     from firestore_utils import dismiss_alert
     
-    success = dismiss_alert(token_data['uid'], alert_id)
+    success = await dismiss_alert(token_data['uid'], alert_id)
     return {"success": success}
 
 @app.get("/dashboard/projects/{project_id}")
 async def get_project_endpoint(project_id: str, token_data: dict = Depends(get_token)):
     """Get a single project with caching"""
-    uid = token_data['uid']
-    cache_key = (uid, project_id)
-    
-    # Check cache
-    if cache_key in project_cache:
-        data, timestamp = project_cache[cache_key]
-        if time.time() - timestamp < CACHE_TTL:
-            return data
-    
-    from firestore_utils import get_project
-    
-    project = get_project(uid, project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-        
-    # Update cache
-    project_cache[cache_key] = (project, time.time())
-    
-    return project
+    return await _load_project(token_data['uid'], project_id)
 
 @app.patch("/dashboard/projects/{project_id}/status")
 async def update_project_status_endpoint(project_id: str, status_data: dict, token_data: dict = Depends(get_token)):
@@ -174,7 +287,7 @@ async def update_project_status_endpoint(project_id: str, status_data: dict, tok
     if not status:
         raise HTTPException(status_code=400, detail="Status is required")
         
-    success = update_project_status(token_data['uid'], project_id, status)
+    success = await update_project_status(token_data['uid'], project_id, status)
     
     # Invalidate cache
     cache_key = (token_data['uid'], project_id)
@@ -192,7 +305,7 @@ async def update_project_currency_endpoint(project_id: str, currency_data: dict,
     if not currency:
         raise HTTPException(status_code=400, detail="Currency is required")
         
-    success = update_project_currency(token_data['uid'], project_id, currency)
+    success = await update_project_currency(token_data['uid'], project_id, currency)
     
     # Invalidate cache
     cache_key = (token_data['uid'], project_id)
@@ -208,25 +321,11 @@ async def diagnose_project_endpoint(
     token_data: dict = Depends(get_token)
 ):
     """Run AI diagnosis on a project"""
-    from firestore_utils import get_project
-    
+    return await _diagnose_project(token_data['uid'], project_id, request)
+
+async def _diagnose_project(uid: str, project_id: str, request: DiagnosisRequest) -> DiagnosisResult:
     # 1. Get project context
-    uid = token_data['uid']
-    cache_key = (uid, project_id)
-    project = None
-    
-    if cache_key in project_cache:
-        data, timestamp = project_cache[cache_key]
-        if time.time() - timestamp < CACHE_TTL:
-            project = data
-            
-    if not project:
-        project = get_project(uid, project_id)
-        if project:
-            project_cache[cache_key] = (project, time.time())
-            
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = await _load_project(uid, project_id)
         
     # 2. Run diagnosis
     # Use project name/description as the idea
@@ -235,58 +334,131 @@ async def diagnose_project_endpoint(
     # Use currency from request or project or default
     currency = request.currency or project.get('currency', 'NGN')
     
-    result = await generate_diagnosis(idea, request.challenges)
+    result = await generate_diagnosis(idea, request.challenges, currency, _project_context(project), await get_user_plan(uid))
     
     return result
 
+# Seconds each /dashboard/overview section may take. A slower section is
+# answered with its last good value (or an empty default) and marked stale;
+# it keeps loading in the background to refresh that value for next time.
+OVERVIEW_SECTION_TIMEOUT = float(os.getenv("OVERVIEW_SECTION_TIMEOUT", "1.5"))
+OVERVIEW_STALE_TTL = 60 * 60  # 1 hour
+
+# Last good value per section, keyed "uid:section" (LRU, so it stays bounded
+# however many users load the dashboard). Values: {data, updated_at}
+overview_cache = ResponseCache(
+    max_entries=int(os.getenv("OVERVIEW_CACHE_SIZE", "5000")), ttl_seconds=OVERVIEW_STALE_TTL,
+)
+# One load per (uid, section) at a time: requests arriving while a slow
+# section is still loading wait on that load instead of starting another.
+# A load outlives a timed-out request so it can refresh the cache.
+overview_refreshes = SingleFlight(cancel_abandoned=False)
+
+OVERVIEW_DEFAULTS = {
+    "stats": {"ideas_analyzed": 0, "revenue_streams": 0, "success_rate": 0, "active_projects": 0},
+    "usage": {"plan": "starter", "current_usage": 0, "limit": 10, "percentage": 0},
+    "alerts": [],
+    "projects": [],
+    "growth": [],
+}
+
+async def _overview_section(uid: str, name: str, load) -> tuple:
+    """Load one overview section within the timeout. Returns (data, timing)"""
+    start = time.perf_counter()
+    cache_key = f"{uid}:{name}"
+    
+    async def refresh():
+        data = await load()
+        overview_cache.set(cache_key, {"data": data, "updated_at": time.time()})
+        return data
+    
+    try:
+        # The shared load keeps going after a timeout
+        data = await asyncio.wait_for(overview_refreshes.do((uid, name), refresh), OVERVIEW_SECTION_TIMEOUT)
+        status = "ok"
+    except asyncio.TimeoutError:
+        data, status = None, "timeout"
+    except Exception as e:
+        print(f"Overview section {name} failed for {uid}: {e}")
+        data, status = None, "error"
+    timing = {"status": status, "ms": round((time.perf_counter() - start) * 1000, 1)}
+    
+    if status != "ok":
+        cached = overview_cache.get(cache_key)
+        if cached:
+            data = cached["data"]
+            timing["stale_age_s"] = round(time.time() - cached["updated_at"], 1)
+        else:
+            data = OVERVIEW_DEFAULTS[name]
+        timing["stale"] = True
+    return data, timing
+
 @app.get("/dashboard/overview")
-async def get_dashboard_overview(token_data: dict = Depends(get_token)):
-    """Get all dashboard data in a single request"""
+async def get_dashboard_overview(response: Response, token_data: dict = Depends(get_token)):
+    """
+    Get all dashboard data in a single request.
+    Sections load concurrently; `timings` reports how long each took and
+    which were served stale (also sent as a Server-Timing header).
+    """
     from firestore_utils import get_user_stats, get_user_usage_stats, get_user_alerts, get_user_projects, get_project_growth
     
     uid = token_data['uid']
-    
-    return {
-        "stats": get_user_stats(uid),
-        "usage": get_user_usage_stats(uid),
-        "alerts": get_user_alerts(uid, limit=5),
-        "projects": get_user_projects(uid, limit=5),
-        "growth": get_project_growth(uid)
+    start = time.perf_counter()
+    
+    sections = {
+        "stats": lambda: get_user_stats(uid),
+        "usage": lambda: get_user_usage_stats(uid),
+        "alerts": lambda: get_user_alerts(uid, limit=5),
+        "projects": lambda: get_user_projects(uid, limit=5),
+        "growth": lambda: get_project_growth(uid),
     }
+    results = await asyncio.gather(*[_overview_section(uid, name, load) for name, load in sections.items()])
+    
+    overview = {}
+    timings = {}
+    for name, (data, timing) in zip(sections, results):
+        overview[name] = data
+        timings[name] = timing
+    timings["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    overview["timings"] = timings
+    
+    response.headers["Server-Timing"] = ", ".join(
+        f"{name};dur={timing['ms']}" for name, timing in timings.items() if name != "total_ms"
+    )
+    return overview
 
 @app.post("/pivots", dependencies=[Depends(rate_limiter)])
 async def create_pivot_endpoint(request: PivotRequest, token_data: dict = Depends(get_token)):
     """Create a new pivot opportunity with AI analysis"""
-    from firestore_utils import create_pivot, get_project
+    return await _create_pivot(token_data['uid'], request)
+
+async def _create_pivot(uid: str, request: PivotRequest) -> dict:
+    from firestore_utils import create_pivot
     from engine import generate_pivot_analysis
     
     # 1. Get original project to get the idea/context
-    # Check cache first for project
-    uid = token_data['uid']
-    cache_key = (uid, request.project_id)
-    project = None
-    
-    if cache_key in project_cache:
-        data, timestamp = project_cache[cache_key]
-        if time.time() - timestamp < CACHE_TTL:
-            project = data
-            
-    if not project:
-        project = get_project(uid, request.project_id)
-        if project:
-            project_cache[cache_key] = (project, time.time())
-
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = await _load_project(uid, request.project_id)
         
     original_idea = project.get('name', '')
     
-    # 2. Generate analysis using Gemini
-    analysis_result = await generate_pivot_analysis(original_idea, request.pivot_name)
+    # 2. Generate analysis using Gemini, unless it was pre-generated
+    analysis_result = await pivot_speculator.take(uid, request.project_id, request.pivot_name)
+    if analysis_result is None:
+        analysis_result = await generate_pivot_analysis(
+            original_idea, request.pivot_name, project.get('currency', 'NGN'), _project_context(project), await get_user_plan(uid)
+        )
     
     # 3. Prepare data
-    pivot_data = request.dict()
-    pivot_data['analysis'] = analysis_result.dict()
+    pivot_data = _build_pivot_data(request.model_dump(), analysis_result)
+    
+    # 4. Save to Firestore
+    pivot_id = await create_pivot(uid, pivot_data)
+    
+    return {"status": "success", "pivot_id": pivot_id}
+
+def _build_pivot_data(pivot_data: dict, analysis_result) -> dict:
+    """Attach an analysis with initialized progress tracking to a pivot document"""
+    pivot_data['analysis'] = analysis_result.model_dump()
     
     # Initialize progress tracking fields
     pivot_data['analysis'].update({
@@ -297,18 +469,113 @@ async def create_pivot_endpoint(request: PivotRequest, token_data: dict = Depend
         'current_week': 0,
         'started_at': None
     })
+    return pivot_data
+
+async def _load_project(uid: str, project_id: str) -> dict:
+    """Get a project through the in-memory project cache, or raise 404"""
+    from firestore_utils import get_project
     
-    # 4. Save to Firestore
-    pivot_id = create_pivot(token_data['uid'], pivot_data)
+    cache_key = (uid, project_id)
+    if cache_key in project_cache:
+        data, timestamp = project_cache[cache_key]
+        if time.time() - timestamp < CACHE_TTL:
+            return data
     
-    return {"status": "success", "pivot_id": pivot_id}
+    project = await get_project(uid, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    project_cache[cache_key] = (project, time.time())
+    return project
+
+def _project_context(project: dict) -> str:
+    """Prompt context digest stored with the project (built on the fly for older projects)"""
+    from prompts import build_context_digest
+    return project.get('context_digest') or build_context_digest(project)
+
+# Maximum pivot analyses generated at once by the bulk endpoint
+BULK_PIVOT_CONCURRENCY = int(os.getenv("BULK_PIVOT_CONCURRENCY", "3"))
+
+@app.post("/projects/{project_id}/pivots/bulk", dependencies=[Depends(rate_limiter)])
+async def create_pivots_bulk_endpoint(
+    project_id: str,
+    request: BulkPivotRequest = None,
+    token_data: dict = Depends(get_token)
+):
+    """
+    Analyze all pivot options of a project at once.
+    Streams a `pivot` Server-Sent Event per analysis as it completes (or an
+    `error` event for a pivot that failed), then saves the finished ones with
+    batched writes and sends a final `saved` event with their ids. Finished
+    analyses are saved even if the client disconnects.
+    """
+    from firestore_utils import create_pivots
+    from engine import generate_pivot_analysis
+    
+    uid = token_data['uid']
+    project = await _load_project(uid, project_id)
+    
+    # Each name is analyzed and saved once; the ids are keyed by name
+    pivot_names = list(dict.fromkeys((request and request.pivot_names) or project.get('pivot_options', [])))
+    if not pivot_names:
+        raise HTTPException(status_code=400, detail="Project has no pivot options")
+    
+    original_idea = project.get('name', '')
+    currency = project.get('currency', 'NGN')
+    context = _project_context(project)
+    plan = await get_user_plan(uid)
+    semaphore = asyncio.Semaphore(BULK_PIVOT_CONCURRENCY)
+    
+    async def analyze(index: int, pivot_name: str):
+        async with semaphore:
+            try:
+                result = await pivot_speculator.take(uid, project_id, pivot_name)
+                if result is None:
+                    result = await generate_pivot_analysis(original_idea, pivot_name, currency, context, plan)
+            except Exception as e:
+                print(f"Bulk pivot '{pivot_name}' failed for {uid}: {e}")
+                return index, pivot_name, None, e
+            return index, pivot_name, result, None
+    
+    async def event_stream():
+        tasks = [asyncio.create_task(analyze(i, name)) for i, name in enumerate(pivot_names)]
+        results = [None] * len(tasks)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, pivot_name, analysis_result, error = await next_done
+                if error is not None:
+                    yield _sse("error", {"index": index, "pivot_name": pivot_name, "detail": str(getattr(error, "detail", error))})
+                    continue
+                results[index] = _build_pivot_data(
+                    {"project_id": project_id, "pivot_name": pivot_name, "original_idea": original_idea},
+                    analysis_result
+                )
+                yield _sse("pivot", {"index": index, "pivot_name": pivot_name, "analysis": results[index]['analysis']})
+        finally:
+            # Client went away mid-stream: stop the remaining generations
+            # (cancelling the tasks cancels their provider calls too)
+            for task in tasks:
+                task.cancel()
+            # Keep the analyses that did finish. Shielded so a disconnect
+            # doesn't abort the write halfway.
+            completed = [i for i, pivot_data in enumerate(results) if pivot_data is not None]
+            pivot_ids = []
+            if completed:
+                pivot_ids = await asyncio.shield(asyncio.ensure_future(create_pivots(uid, [results[i] for i in completed])))
+        
+        yield _sse("saved", {"pivot_ids": {pivot_names[i]: pivot_id for i, pivot_id in zip(completed, pivot_ids)}})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/pivots")
 async def get_pivots_endpoint(project_id: str = None, token_data: dict = Depends(get_token)):
     """Get pivots for the authenticated user"""
     from firestore_utils import get_pivots
     
-    pivots = get_pivots(token_data['uid'], project_id)
+    pivots = await get_pivots(token_data['uid'], project_id)
     return {"pivots": pivots}
 
 @app.patch("/pivots/{pivot_id}/actions/{action_index}")
@@ -322,7 +589,7 @@ async def update_pivot_action_endpoint(
     from firestore_utils import update_pivot_action
     
     completed = request.get('completed', False)
-    updated_pivot = update_pivot_action(token_data['uid'], pivot_id, action_index, completed)
+    updated_pivot = await update_pivot_action(token_data['uid'], pivot_id, action_index, completed)
     
     if not updated_pivot:
        raise HTTPException(status_code=404, detail="Pivot or action not found")
@@ -342,43 +609,33 @@ async def update_pivot_status_endpoint(
     if not new_status:
         raise HTTPException(status_code=400, detail="Status is required")
     
-    success = update_pivot_status(token_data['uid'], pivot_id, new_status)
+    success = await update_pivot_status(token_data['uid'], pivot_id, new_status)
 @app.post("/strategies", dependencies=[Depends(rate_limiter)])
 async def create_strategy_endpoint(request: StrategyRequest, token_data: dict = Depends(get_token)):
     """Create a new strategy (pivot or fix) with AI analysis"""
-    from firestore_utils import create_strategy, get_project
+    return await _create_strategy(token_data['uid'], request)
+
+async def _create_strategy(uid: str, request: StrategyRequest) -> dict:
+    from firestore_utils import create_strategy
     from engine import generate_pivot_analysis
     
     # Get original project for context
-    uid = token_data['uid']
-    cache_key = (uid, request.project_id)
-    project = None
-    
-    if cache_key in project_cache:
-        data, timestamp = project_cache[cache_key]
-        if time.time() - timestamp < CACHE_TTL:
-            project = data
-            
-    if not project:
-        project = get_project(uid, request.project_id)
-        if project:
-            project_cache[cache_key] = (project, time.time())
-
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = await _load_project(uid, request.project_id)
         
     original_idea = project.get('name', '')
     
     # Generate analysis using Gemini
-    analysis_result = await generate_pivot_analysis(original_idea, request.strategy_name)
+    analysis_result = await generate_pivot_analysis(
+        original_idea, request.strategy_name, project.get('currency', 'NGN'), _project_context(project), await get_user_plan(uid)
+    )
     
     # Prepare data
-    strategy_data = request.dict()
-    strategy_data['analysis'] = analysis_result.dict()
+    strategy_data = request.model_dump()
+    strategy_data['analysis'] = analysis_result.model_dump()
     strategy_data['type'] = request.strategy_type.value  # Convert enum to string
     
     # Save to Firestore
-    strategy_id = create_strategy(token_data['uid'], strategy_data)
+    strategy_id = await create_strategy(uid, strategy_data)
     
     return {"status": "success", "strategy_id": strategy_id}
 
@@ -393,7 +650,7 @@ async def get_strategies_endpoint(
     """Get strategies with optional filters"""
     from firestore_utils import get_strategies
     
-    strategies = get_strategies(token_data['uid'], project_id, strategy_type, status)
+    strategies = await get_strategies(token_data['uid'], project_id, strategy_type, status)
     return {"strategies": strategies}
 
 
@@ -408,7 +665,7 @@ async def update_strategy_status_endpoint(
     
     # Use update_pivot_status which now supports new status values
     new_status = request.status.value  # Convert enum to string
-    success = update_pivot_status(token_data['uid'], strategy_id, new_status)
+    success = await update_pivot_status(token_data['uid'], strategy_id, new_status)
     
     if not success:
         raise HTTPException(status_code=400, detail="Invalid status or strategy not found")
@@ -420,7 +677,7 @@ async def get_settings_endpoint(token_data: dict = Depends(get_token)):
     """Get user settings"""
     from firestore_utils import get_user_settings
     
-    settings = get_user_settings(token_data['uid'])
+    settings = await get_user_settings(token_data['uid'])
     return settings
 
 @app.patch("/settings")
@@ -432,9 +689,11 @@ async def update_settings_endpoint(
     from firestore_utils import update_user_settings
     
     # Convert to dict and remove None values
-    settings_dict = {k: v for k, v in settings.dict().items() if v is not None}
+    settings_dict = settings.model_dump(exclude_none=True)
     
-    success = update_user_settings(token_data['uid'], settings_dict)
+    success = await update_user_settings(token_data['uid'], settings_dict)
+    if settings.aiOptimization is False:
+        pivot_speculator.cancel(token_data['uid'])
     
     if not success:
         raise HTTPException(status_code=500, detail="Failed to update settings")
@@ -449,7 +708,7 @@ async def get_strategy_details_endpoint(strategy_id: str, token_data: dict = Dep
     """Get detailed strategy data (market, risks, timeline)"""
     from firestore_utils import get_strategy_details
     
-    details = get_strategy_details(token_data['uid'], strategy_id)
+    details = await get_strategy_details(token_data['uid'], strategy_id)
     if not details:
         # Return empty default structure if not found
         return {
@@ -477,12 +736,87 @@ async def update_strategy_details_endpoint(
     """Update detailed strategy data"""
     from firestore_utils import update_strategy_details
     
-    success = update_strategy_details(token_data['uid'], strategy_id, details.dict())
+    success = await update_strategy_details(token_data['uid'], strategy_id, details.model_dump())
     if not success:
         raise HTTPException(status_code=404, detail="Strategy not found")
         
     return {"success": success}
 
+# Background job mode: each POST enqueues the same work as its synchronous
+# counterpart and returns a job id right away. Poll GET /jobs/{id} or
+# subscribe to /jobs/{id}/events for the result.
+
+async def _deconstruct_job(uid: str, payload: dict) -> DeconstructionResult:
+    request = DeconstructionRequest(**payload)
+    # Checked again when the job runs: other generations may have used up
+    # the quota while it was queued
+    quota = await get_ai_quota(uid)
+    if not quota['allowed']:
+        raise HTTPException(status_code=AI_LIMIT_STATUS, detail=AI_LIMIT_DETAIL)
+    result = await deconstruct_business_idea(request.idea, request.currency, quota['plan'])
+    return await _save_deconstruction(uid, request.idea, result)
+
+job_queue.register("deconstruct", _deconstruct_job)
+job_queue.register("pivot", lambda uid, payload: _create_pivot(uid, PivotRequest(**payload)))
+job_queue.register("strategy", lambda uid, payload: _create_strategy(uid, StrategyRequest(**payload)))
+job_queue.register("diagnose", lambda uid, payload: _diagnose_project(uid, payload['project_id'], DiagnosisRequest(**payload)))
+
+def _job_response(job: dict) -> dict:
+    """Public view of a job (without the owner and request payload)"""
+    return {k: v for k, v in job.items() if k not in ("uid", "payload")}
+
+@app.post("/jobs/deconstruct", status_code=202, dependencies=[Depends(rate_limiter)])
+async def deconstruct_job_endpoint(request: DeconstructionRequest, token_data: dict = Depends(get_token)):
+    if not await check_ai_limit(token_data['uid']):
+        raise HTTPException(status_code=AI_LIMIT_STATUS, detail=AI_LIMIT_DETAIL)
+    job = await job_queue.submit("deconstruct", token_data['uid'], request.model_dump(mode="json"))
+    return _job_response(job)
+
+@app.post("/jobs/pivots", status_code=202, dependencies=[Depends(rate_limiter)])
+async def pivot_job_endpoint(request: PivotRequest, token_data: dict = Depends(get_token)):
+    job = await job_queue.submit("pivot", token_data['uid'], request.model_dump(mode="json"))
+    return _job_response(job)
+
+@app.post("/jobs/strategies", status_code=202, dependencies=[Depends(rate_limiter)])
+async def strategy_job_endpoint(request: StrategyRequest, token_data: dict = Depends(get_token)):
+    job = await job_queue.submit("strategy", token_data['uid'], request.model_dump(mode="json"))
+    return _job_response(job)
+
+@app.post("/jobs/projects/{project_id}/diagnose", status_code=202, dependencies=[Depends(rate_limiter)])
+async def diagnose_job_endpoint(project_id: str, request: DiagnosisRequest, token_data: dict = Depends(get_token)):
+    payload = {**request.model_dump(mode="json"), "project_id": project_id}
+    job = await job_queue.submit("diagnose", token_data['uid'], payload)
+    return _job_response(job)
+
+async def _get_own_job(uid: str, job_id: str) -> dict:
+    job = await job_queue.get(job_id)
+    if not job or job['uid'] != uid:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}")
+async def get_job_endpoint(job_id: str, token_data: dict = Depends(get_token)):
+    """Current status of a job, with its result once finished"""
+    return _job_response(await _get_own_job(token_data['uid'], job_id))
+
+@app.get("/jobs/{job_id}/events")
+async def job_events_endpoint(job_id: str, token_data: dict = Depends(get_token)):
+    """
+    Server-Sent Events for a job: a `status` event on every status change,
+    ending with the finished job.
+    """
+    await _get_own_job(token_data['uid'], job_id)
+
+    async def event_stream():
+        async for job in job_queue.watch(job_id):
+            yield _sse("status", _job_response(job))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 if __name__ == "__main__":
     import uvicorn
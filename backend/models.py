@@ -44,6 +44,9 @@ class PivotRequest(BaseModel):
     pivot_name: str
     original_idea: Optional[str] = None
 
+class BulkPivotRequest(BaseModel):
+    pivot_names: Optional[List[str]] = None  # Defaults to the project's pivot_options
+
 class DiagnosisRequest(BaseModel):
     project_id: str
     challenges: str
@@ -65,17 +68,26 @@ class ActionUpdateRequest(BaseModel):
 class StatusUpdateRequest(BaseModel):
     status: str  # "active", "in_progress", "completed", "on_hold", "abandoned"
 
+class RecommendedAction(BaseModel):
+    action: str
+    priority: str  # "High", "Medium", "Low"
+
+class PivotMilestone(BaseModel):
+    name: str
+    due_weeks: int
+    description: str
+
 class PivotAnalysisResult(BaseModel):
     viability_score: int
     market_fit: str
     market_fit_score: int
-    recommended_actions: List[dict]  # {"action": str, "priority": str}
+    recommended_actions: List[RecommendedAction]
     required_resources: List[str]
     estimated_timeline: str
     estimated_investment: str
     risk_level: str
     risk_factors: List[str]
-    milestones: List[dict]  # {"name": str, "due_weeks": int, "description": str}
+    milestones: List[PivotMilestone]
 
 class StrategyType(str, Enum):
     PIVOT = "pivot"
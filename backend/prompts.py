@@ -0,0 +1,246 @@
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional
+
+# Approximate local tokenizer. Words are split the way BPE pre-tokenizers do
+# (letters, digits, punctuation runs, with a leading space attached); short
+# pieces count as one token and longer ones as one token per ~4 characters,
+# which tracks the Gemma/GPT vocabularies closely for English prose and JSON.
+_PIECE = re.compile(r" ?[^\W\d_]+| ?\d{1,3}| ?[^\w\s]+|\s+")
+
+def count_tokens(text: str) -> int:
+    total = 0
+    for piece in _PIECE.findall(text or ""):
+        stripped = piece.strip() or piece
+        total += 1 if len(stripped) <= 6 else -(-len(stripped) // 4)
+    return total
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text so that count_tokens(result) <= max_tokens"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    kept, total = [], 0
+    for piece in _PIECE.findall(text):
+        cost = count_tokens(piece)
+        if total + cost > max_tokens:
+            break
+        kept.append(piece)
+        total += cost
+    return "".join(kept).rstrip()
+
+class PromptBudgetError(ValueError):
+    pass
+
+class PromptTemplate:
+    """
+    A prompt laid out for provider-side prefix caching: the static persona,
+    guidelines and schema come first and are byte-identical across requests;
+    the per-request values are rendered into a short tail at the end.
+
+    Input and output token budgets are enforced per endpoint. If the
+    rendered prompt is over its input budget, the `truncatable` values are
+    shortened (in order) until it fits.
+    """
+
+    def __init__(self, name: str, prefix: str, tail: str, max_input_tokens: int, max_output_tokens: int,
+                 truncatable: Optional[List[str]] = None):
+        self.name = name
+        self.prefix = _dedent(prefix)
+        self.tail = _dedent(tail)
+        self.max_input_tokens = int(os.getenv(f"{name.upper()}_MAX_INPUT_TOKENS", max_input_tokens))
+        self.max_output_tokens = int(os.getenv(f"{name.upper()}_MAX_OUTPUT_TOKENS", max_output_tokens))
+        self.truncatable = truncatable or []
+        self.version = hashlib.sha256(f"{self.prefix}\x1f{self.tail}".encode("utf-8")).hexdigest()[:12]
+        self.prefix_tokens = count_tokens(self.prefix)
+
+    def render(self, **values) -> str:
+        values = {k: "" if v is None else str(v) for k, v in values.items()}
+        text = self._join(values)
+        overflow = count_tokens(text) - self.max_input_tokens
+        for key in self.truncatable:
+            if overflow <= 0:
+                break
+            current = count_tokens(values[key])
+            values[key] = truncate_to_tokens(values[key], max(current - overflow, 0))
+            text = self._join(values)
+            overflow = count_tokens(text) - self.max_input_tokens
+        if overflow > 0:
+            raise PromptBudgetError(
+                f"{self.name} prompt is {overflow} tokens over its {self.max_input_tokens}-token input budget"
+            )
+        return text
+
+    def _join(self, values: Dict[str, str]) -> str:
+        return f"{self.prefix}\n\n{self.tail.format(**values)}".rstrip() + "\n"
+
+    def report(self, **sample_values) -> Dict:
+        rendered = self.render(**sample_values)
+        return {
+            "template": self.name,
+            "version": self.version,
+            "prefix_tokens": self.prefix_tokens,
+            "input_tokens": count_tokens(rendered),
+            "max_input_tokens": self.max_input_tokens,
+            "max_output_tokens": self.max_output_tokens,
+        }
+
+# Token budget of the project digest embedded in follow-up prompts
+PROJECT_CONTEXT_MAX_TOKENS = int(os.getenv("PROJECT_CONTEXT_MAX_TOKENS", "200"))
+
+def build_context_digest(project: Dict, max_tokens: int = PROJECT_CONTEXT_MAX_TOKENS) -> str:
+    """
+    Compact summary of a project's deconstruction (score, elements, entry
+    point, pivot options) for grounding pivot, strategy and diagnosis
+    prompts. Most important facts first, cut to `max_tokens`.
+    """
+    lines = []
+    if project.get('overall_score') is not None:
+        lines.append(f"Overall score: {project['overall_score']}/100")
+    elements = project.get('elements') or []
+    if elements:
+        lines.append("Elements: " + "; ".join(
+            f"{e.get('name')} ({e.get('type')}, {e.get('monetization_potential')} monetization)" for e in elements
+        ))
+    if project.get('cheapest_entry_point'):
+        entry = truncate_to_tokens(project['cheapest_entry_point'], 60)
+        lines.append(f"Cheapest entry point: {entry} (cost {project.get('estimated_cost')}, validate in {project.get('time_to_validate')})")
+    if project.get('pivot_options'):
+        lines.append("Pivot options: " + "; ".join(project['pivot_options']))
+    if project.get('sustainability_tip'):
+        lines.append(f"Sustainability tip: {project['sustainability_tip']}")
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+def _dedent(text: str) -> str:
+    lines = text.strip("\n").splitlines()
+    indent = min((len(l) - len(l.lstrip()) for l in lines if l.strip()), default=0)
+    return "\n".join(l[indent:] for l in lines).strip()
+
+
+PERSONA = """
+    You are the Elemental Coach, a business strategist with the calm, visionary, practical and purpose-driven voice of Utibe Okuk: light storytelling and humor, always grounded in solid business logic, inspiring confidence and discipline.
+"""
+
+DECONSTRUCTION = PromptTemplate(
+    name="deconstruction",
+    prefix=PERSONA + """
+    Task: "Elemental Business Model Deconstruction" - break the business idea below into modular sub-businesses that could each stand alone.
+
+    Guidelines:
+    - Base every suggestion strictly on the local context of the target currency's country and state all costs in that currency.
+    - elements: EXACTLY 7 distinct sub-businesses. Adapt these types to the idea: Production/Manufacturing, Content Creation, Training/Education, Service Delivery, Marketing/Distribution, Community Building, Technology/Innovation. Each has a concise, evocative name; a type; a 2-3 sentence description of how it fits the idea; and monetization_potential (High: scalable, Medium: steady, Low: supportive).
+    - cheapest_entry_point: the simplest, lowest-cost way to start and validate, told as an encouraging, practical narrative.
+    - estimated_cost: cost of the cheapest entry point (e.g. "0 - 500").
+    - time_to_validate: time to validate the cheapest entry point (e.g. "1-2 Weeks").
+    - pivot_options: 3-5 adjacent industries or variations, phrased as visionary opportunities.
+    - sustainability_tip: one key piece of advice for long-term success.
+    - gradual_funding_strategy: step-by-step funding, starting from zero.
+    - brand_and_community_expansion_tips: actionable tips for growing the brand and community.
+    - sustainability_roadmap: 3-5 key milestones.
+    - overall_score: integer 0-100, the potential for success.
+
+    Output ONLY raw JSON (no markdown, no comments, no text outside the JSON) with exactly this shape:
+    {"original_idea": "...", "cheapest_entry_point": "...", "estimated_cost": "...", "time_to_validate": "...",
+    "elements": [{"name": "...", "type": "...", "description": "...", "monetization_potential": "High|Medium|Low"}],
+    "pivot_options": ["..."], "sustainability_tip": "...",
+    "gradual_funding_strategy": [{"step": "...", "amount": "...", "description": "..."}],
+    "brand_and_community_expansion_tips": ["..."],
+    "sustainability_roadmap": [{"milestone": "...", "timeline": "...", "description": "..."}],
+    "currency": "...", "overall_score": 0}
+    """,
+    tail="""
+    Business Idea: "{idea}"
+    Target Currency: "{currency}"
+    {reference}
+    """,
+    max_input_tokens=1400,
+    max_output_tokens=3000,
+    truncatable=["reference", "idea"],
+)
+
+PIVOT = PromptTemplate(
+    name="pivot",
+    prefix=PERSONA + """
+    Task: analyze a proposed pivot of an existing business idea and give a realistic yet bold execution plan.
+
+    Guidelines:
+    - Base the analysis on the local context of the target currency's country and state all amounts in that currency.
+    - viability_score: integer 0-100, your confidence in the pivot.
+    - market_fit: "High", "Medium-High", "Medium", "Growing" or "Low"; market_fit_score: integer 0-100.
+    - recommended_actions: 5-7 specific, actionable steps, each with priority High, Medium or Low.
+    - required_resources: 3-5 key resources.
+    - estimated_timeline (e.g. "12 weeks"), estimated_investment (a range), risk_level ("Low", "Medium" or "High").
+    - risk_factors: 3-5 potential pitfalls, described actionably.
+    - milestones: 4 key achievements, each with name, due_weeks (integer, weeks from start) and description.
+    - Build on the project context (existing elements, entry point, score) when given instead of starting from scratch.
+
+    Output ONLY raw JSON (no markdown, no comments, no text outside the JSON) with exactly this shape:
+    {"viability_score": 0, "market_fit": "...", "market_fit_score": 0,
+    "recommended_actions": [{"action": "...", "priority": "High|Medium|Low"}],
+    "required_resources": ["..."], "estimated_timeline": "...", "estimated_investment": "...",
+    "risk_level": "...", "risk_factors": ["..."],
+    "milestones": [{"name": "...", "due_weeks": 0, "description": "..."}]}
+    """,
+    tail="""
+    Original Business Idea: "{original_idea}"
+    Project Context:
+    {project_context}
+    Proposed Pivot: "{pivot_name}"
+    Target Currency: "{currency}"
+    """,
+    max_input_tokens=900,
+    max_output_tokens=1500,
+    truncatable=["project_context", "original_idea", "pivot_name"],
+)
+
+DIAGNOSIS = PromptTemplate(
+    name="diagnosis",
+    prefix=PERSONA + """
+    Task: diagnose the weak link in a business's structure (e.g. Supply, Sales, Strategy, Operations).
+
+    Guidelines:
+    - Base the diagnosis on the local context of the target currency's country and state any costs in that currency.
+    - weak_link: the single most critical bottleneck.
+    - weak_link_detail: 2-3 sentences on WHY it is the weak link, in the coach's voice.
+    - root_cause: the underlying issue (e.g. "Lack of market validation").
+    - immediate_fix: a concrete step to resolve it now.
+    - strategic_adjustment: a long-term change to prevent recurrence.
+    - viability_score: integer 0-100, the business's current health.
+    - Ground the diagnosis in the project context (its elements, entry point and score) when given.
+
+    Output ONLY raw JSON (no markdown, no comments, no text outside the JSON) with exactly this shape:
+    {"weak_link": "...", "weak_link_detail": "...", "root_cause": "...", "immediate_fix": "...",
+    "strategic_adjustment": "...", "viability_score": 0}
+    """,
+    tail="""
+    Business Idea: "{idea}"
+    Project Context:
+    {project_context}
+    Current Challenges: "{challenges}"
+    Target Currency: "{currency}"
+    """,
+    max_input_tokens=900,
+    max_output_tokens=600,
+    truncatable=["project_context", "challenges", "idea"],
+)
+
+FIELD_REPAIR = PromptTemplate(
+    name="field_repair",
+    prefix="""
+    You complete partially generated JSON documents. Output ONLY a raw JSON object containing exactly the requested keys, matching the given JSON Schema. No markdown, no comments, no other text.
+    """,
+    tail="""
+    Document: {context}
+    Missing or invalid fields: {fields}
+    {rules}
+    Valid rest of the document (keep the new fields consistent with it):
+    {valid_part}
+    JSON Schema of the requested fields:
+    {schema}
+    """,
+    max_input_tokens=2500,
+    max_output_tokens=2000,
+    truncatable=["valid_part"],
+)
+
+TEMPLATES = [DECONSTRUCTION, PIVOT, DIAGNOSIS, FIELD_REPAIR]
@@ -0,0 +1,266 @@
+import asyncio
+import random
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, List, Optional
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+class LatencyTracker:
+    """Rolling window of observed latencies (seconds) with percentiles"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    def __len__(self):
+        return len(self.samples)
+
+class Provider:
+    """
+    A model behind an OpenAI-compatible endpoint (OpenRouter by default).
+    """
+
+    def __init__(self, name: str, model: str, client):
+        self.name = name
+        self.model = model
+        self.client = client
+        self.breaker = CircuitBreaker(name)
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.failures = 0
+        self.wins = 0
+
+    async def complete(self, request: Dict):
+        return await self.client.chat.completions.create(**{**request, "model": self.model})
+
+    async def stream(self, request: Dict):
+        return await self.client.chat.completions.create(stream=True, **{**request, "model": self.model})
+
+    async def close(self):
+        if self.client:
+            await self.client.close()
+
+    def stats(self) -> Dict:
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        return {
+            "model": self.model,
+            "calls": self.calls,
+            "failures": self.failures,
+            "wins": self.wins,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "circuit": self.breaker.stats(),
+        }
+
+class StubProvider(Provider):
+    """
+    Offline provider for tests and benchmarks. `responder(request)` returns
+    the completion text; latency is `latency` seconds plus uniform jitter.
+    """
+
+    def __init__(self, name: str = "stub", responder: Callable[[Dict], str] = None,
+                 latency: float = 0.0, jitter: float = 0.0, chunk_chars: int = 16):
+        super().__init__(name, name, None)
+        self.responder = responder or (lambda request: "{}")
+        self.delay = latency
+        self.jitter = jitter
+        self.chunk_chars = chunk_chars
+
+    async def _respond(self, request: Dict) -> str:
+        await asyncio.sleep(self.delay + random.uniform(0, self.jitter))
+        return self.responder(request)
+
+    async def complete(self, request: Dict):
+        text = await self._respond(request)
+        usage = SimpleNamespace(prompt_tokens=0, completion_tokens=0)
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+    async def stream(self, request: Dict):
+        text = await self._respond(request)
+
+        async def chunks():
+            for i in range(0, len(text), self.chunk_chars):
+                yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + self.chunk_chars]))])
+                await asyncio.sleep(0)
+        return chunks()
+
+    async def close(self):
+        pass
+
+class ProviderPool:
+    """
+    Ordered list of providers with hedged requests.
+
+    `run(call, finish)` starts `call(primary)` followed by
+    `finish(primary, response)`, which parses and validates the response.
+    If the primary hasn't answered after the hedge delay, the next provider
+    is started as well and the first attempt to succeed wins; the others are
+    cancelled. Once a running provider has answered, no more hedges are
+    started while its response is being finished. An attempt that fails
+    (including failing validation) immediately fails over to the next
+    provider. The hedge delay is fixed if configured, otherwise derived from
+    the provider's observed latency percentile and clamped to [min, max].
+
+    Only `call` is guarded: it goes through the provider's circuit breaker,
+    gets an adaptive timeout (`timeout_multiplier` times the observed p99
+    latency, clamped to [min_timeout, max_timeout]) and is what the latency
+    history records. `finish` time, e.g. a follow-up repair completion,
+    never counts against the provider. Providers with an open circuit are
+    skipped; if all are open, CircuitOpenError is raised without waiting.
+    """
+
+    def __init__(self, providers: List[Provider], hedge_delay: Optional[float] = None,
+                 hedge_percentile: float = 95, min_hedge_delay: float = 2.0, max_hedge_delay: float = 30.0,
+                 min_samples: int = 10, timeout_multiplier: float = 2.0, min_timeout: float = 5.0,
+                 max_timeout: float = 120.0):
+        self.providers = providers
+        self.fixed_hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.min_samples = min_samples
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def primary(self) -> Optional[Provider]:
+        return self.providers[0] if self.providers else None
+
+    def hedge_delay(self, provider: Provider) -> float:
+        if self.fixed_hedge_delay is not None:
+            return self.fixed_hedge_delay
+        if len(provider.latency) < self.min_samples:
+            return self.max_hedge_delay
+        observed = provider.latency.percentile(self.hedge_percentile)
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, observed))
+
+    def timeout(self, provider: Provider) -> float:
+        if len(provider.latency) < self.min_samples:
+            return self.max_timeout
+        observed = provider.latency.percentile(99) * self.timeout_multiplier
+        return min(self.max_timeout, max(self.min_timeout, observed))
+
+    def available(self) -> bool:
+        """Whether any provider's circuit would currently accept a call"""
+        return any(p.breaker.state != CircuitBreaker.OPEN for p in self.providers)
+
+    async def _timed(self, provider: Provider, call, record_latency: bool = True):
+        if not provider.breaker.allow():
+            raise CircuitOpenError(f"Circuit for {provider.name} is open")
+        provider.calls += 1
+        start = time.perf_counter()
+        timeout = self.timeout(provider)
+        try:
+            try:
+                result = await asyncio.wait_for(call(provider), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{provider.name} timed out after {timeout:.1f}s") from None
+        except asyncio.CancelledError:
+            provider.breaker.release()
+            raise
+        except Exception:
+            provider.failures += 1
+            provider.breaker.record_failure()
+            raise
+        provider.breaker.record_success()
+        if record_latency:
+            provider.latency.record(time.perf_counter() - start)
+        return result
+
+    async def _attempt(self, provider: Provider, call, finish, record_latency: bool, answered: set):
+        response = await self._timed(provider, call, record_latency)
+        answered.add(provider)
+        if finish is None:
+            return response
+        try:
+            return await finish(provider, response)
+        except ValueError:
+            # Unusable output: the provider answered, so it isn't a fault
+            provider.failures += 1
+            raise
+
+    async def run(self, call: Callable[[Provider], Awaitable],
+                  finish: Optional[Callable[[Provider, object], Awaitable]] = None, record_latency: bool = True):
+        """
+        Run a hedged attempt as described above. Pass `record_latency=False`
+        for side calls (e.g. field repair) whose latency isn't representative
+        of the provider's generations and shouldn't train the hedge delay or
+        timeout.
+        """
+        if not self.providers:
+            raise RuntimeError("No LLM providers configured")
+
+        running = {}
+        answered = set()
+        launched = 0
+        last_error = None
+
+        def launch():
+            nonlocal launched
+            provider = self.providers[launched]
+            task = asyncio.ensure_future(self._attempt(provider, call, finish, record_latency, answered))
+            running[task] = (provider, launched > 0 and bool(running))
+            launched += 1
+
+        launch()
+        try:
+            while running:
+                finishing = any(provider in answered for provider, _ in running.values())
+                can_hedge = launched < len(self.providers) and not finishing
+                timeout = self.hedge_delay(self.providers[launched - 1]) if can_hedge else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if any(provider in answered for provider, _ in running.values()):
+                        continue
+                    # Slow: hedge with the next provider while the first keeps going
+                    self.hedges += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    provider, hedged = running.pop(task)
+                    if task.exception() is None:
+                        provider.wins += 1
+                        if hedged:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+                    if not isinstance(error, CircuitOpenError) or last_error is None:
+                        last_error = error
+                    print(f"Provider {provider.name} failed: {error}")
+
+                # Fail over straight away if nothing is left running
+                if not running and launched < len(self.providers):
+                    launch()
+        except asyncio.CancelledError:
+            # Cancelled by the caller: return only once the provider calls stopped
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            raise
+        finally:
+            for task in running:
+                task.cancel()
+
+        raise last_error
+
+    def stats(self) -> Dict:
+        return {
+            "providers": {p.name: p.stats() for p in self.providers},
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts_s": {p.name: round(self.timeout(p), 2) for p in self.providers},
+        }
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize free text for cache keys: case-folded, whitespace collapsed.
+    "Soap Business " and "soap  business" map to the same key.
+    """
+    return re.sub(r"\s+", " ", text or "").strip().casefold()
+
+def make_key(*parts: str) -> str:
+    """Build a content-addressed key from the given parts"""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    LRU + TTL cache for LLM responses, with an optional SQLite tier on disk
+    that survives restarts. Values must be JSON-serializable dicts.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 86400, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._disk = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._disk.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+            self._disk.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry:
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self._disk:
+            row = self._disk.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[1] > now:
+                value = json.loads(row[0])
+                self._remember(key, value, row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict):
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, value, expires_at)
+        if self._disk:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            self._disk.commit()
+
+    def values(self) -> List[Dict]:
+        """Unexpired values, oldest first, read from the disk tier if there is one"""
+        now = time.time()
+        if self._disk:
+            rows = self._disk.execute("SELECT value FROM cache WHERE expires_at > ? ORDER BY expires_at", (now,))
+            return [json.loads(value) for (value,) in rows]
+        return [value for expires_at, value in self._entries.values() if expires_at > now]
+
+    def _remember(self, key: str, value: Dict, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self._disk is not None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+        }
@@ -0,0 +1,89 @@
+import json
+from typing import Dict, List, Optional
+
+class Route:
+    """
+    A model routing rule. Matches requests by plan, endpoint (prompt
+    template name) and size of the user's input in tokens; unset
+    conditions match anything. `models` is the ordered provider list for
+    matching requests: the first is primary, the rest are hedge/failover
+    fallbacks.
+    """
+
+    def __init__(self, name: str, models: List[str], plans: List[str] = None, endpoints: List[str] = None,
+                 min_input_tokens: int = 0, max_input_tokens: Optional[int] = None):
+        if not models:
+            raise ValueError(f"Route {name} has no models")
+        self.name = name
+        self.models = models
+        self.plans = plans
+        self.endpoints = endpoints
+        self.min_input_tokens = min_input_tokens
+        self.max_input_tokens = max_input_tokens
+
+    def matches(self, endpoint: str, plan: Optional[str], input_tokens: int) -> bool:
+        if self.plans is not None and (plan or "starter") not in self.plans:
+            return False
+        if self.endpoints is not None and endpoint not in self.endpoints:
+            return False
+        if input_tokens < self.min_input_tokens:
+            return False
+        return self.max_input_tokens is None or input_tokens <= self.max_input_tokens
+
+class ModelRouter:
+    """
+    Picks the model route for a request: the first matching rule wins,
+    requests matching none use the default route. Keeps per-route request
+    counts, end-to-end latency and cost for /status.
+    """
+
+    DEFAULT = "default"
+
+    def __init__(self, routes: List[Route] = None):
+        self.routes = routes or []
+        self.usage: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_json(cls, text: str) -> "ModelRouter":
+        """
+        Build from a JSON list of rules, e.g.
+        [{"name": "starter-short", "plans": ["starter"], "max_input_tokens": 40,
+          "models": ["google/gemma-3-12b-it", "google/gemma-3-27b-it"]}]
+        """
+        rules = json.loads(text) if text and text.strip() else []
+        return cls([Route(**rule) for rule in rules])
+
+    def select(self, endpoint: str, plan: Optional[str], input_tokens: int) -> Optional[Route]:
+        for route in self.routes:
+            if route.matches(endpoint, plan, input_tokens):
+                return route
+        return None
+
+    def _usage(self, route_name: str) -> Dict:
+        return self.usage.setdefault(route_name, {"requests": 0, "fallbacks": 0, "latency_s": 0.0, "cost_usd": 0.0})
+
+    def record(self, route_name: str, latency: float):
+        usage = self._usage(route_name)
+        usage["requests"] += 1
+        usage["latency_s"] += latency
+
+    def record_cost(self, route_name: str, cost: float):
+        self._usage(route_name)["cost_usd"] += cost
+
+    def record_fallback(self, route_name: str):
+        """The route's providers were all unavailable and the default route served it"""
+        self._usage(route_name)["fallbacks"] += 1
+
+    def stats(self) -> Dict:
+        return {
+            "routes": [route.name for route in self.routes] + [self.DEFAULT],
+            "usage": {
+                name: {
+                    "requests": usage["requests"],
+                    "fallbacks": usage["fallbacks"],
+                    "avg_latency_s": round(usage["latency_s"] / usage["requests"], 3) if usage["requests"] else None,
+                    "cost_usd": round(usage["cost_usd"], 6),
+                }
+                for name, usage in self.usage.items()
+            },
+        }
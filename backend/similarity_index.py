@@ -0,0 +1,135 @@
+import re
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Mersenne prime used for the universal hash family. Shingle hashes and the
+# coefficients are kept below it so a*x + b never overflows uint64.
+_PRIME = (1 << 31) - 1
+
+_STOP_WORDS = {
+    "a", "an", "and", "the", "of", "for", "to", "in", "on", "with", "my", "our",
+    "business", "company", "startup", "idea", "small", "local",
+}
+
+def _stem(word: str) -> str:
+    # Crude plural folding: "soaps" -> "soap", but leave "glass" alone
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+def shingles(text: str) -> set:
+    """
+    Shingle a short idea into word tokens plus character trigrams, so that
+    reordered words and minor spelling differences still overlap.
+    """
+    words = [_stem(w) for w in re.findall(r"[a-z0-9]+", text.casefold()) if w not in _STOP_WORDS]
+    result = set(words)
+    for word in words:
+        padded = f" {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+class SimilarityIndex:
+    """
+    In-memory MinHash/LSH index over previously generated results.
+
+    Each entry is a MinHash signature of the idea's shingles. Signatures are
+    split into bands; ideas sharing any band land in the same bucket and
+    become candidates, whose Jaccard similarity is then estimated from the
+    full signatures. Entries are partitioned (e.g. by currency) and the index
+    is a bounded ring: the oldest entry is evicted once it is full.
+    """
+
+    def __init__(self, max_entries: int = 20000, num_perm: int = 64, bands: int = 16, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.max_entries = max_entries
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+        self._signatures = np.zeros((max_entries, num_perm), dtype=np.uint32)
+        self._entries = [None] * max_entries  # slot -> (partition, band_keys, payload)
+        self._buckets = {}                    # (partition, band, bytes) -> set(slot)
+        self._next_slot = 0
+        self.size = 0
+
+        self.lookups = 0
+        self.matches = 0
+        self.lookup_seconds = 0.0
+
+    def signature(self, text: str) -> np.ndarray:
+        items = shingles(text) or {text.casefold()}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) % _PRIME for s in items), dtype=np.uint64)
+        values = (hashes[:, None] * self._a + self._b) % _PRIME
+        return values.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, partition: str, signature: np.ndarray):
+        return [
+            (partition, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(self, text: str, partition: str, payload: Dict):
+        signature = self.signature(text)
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.max_entries
+
+        # Evict whatever previously lived in this slot
+        previous = self._entries[slot]
+        if previous:
+            for key in previous[1]:
+                bucket = self._buckets.get(key)
+                if bucket:
+                    bucket.discard(slot)
+                    if not bucket:
+                        del self._buckets[key]
+        else:
+            self.size += 1
+
+        band_keys = self._band_keys(partition, signature)
+        self._signatures[slot] = signature
+        self._entries[slot] = (partition, band_keys, payload)
+        for key in band_keys:
+            self._buckets.setdefault(key, set()).add(slot)
+
+    def query(self, text: str, partition: str, threshold: float) -> Optional[Tuple[float, Dict]]:
+        """
+        Return (similarity, payload) of the nearest stored entry in the same
+        partition if its estimated Jaccard similarity is >= threshold.
+        """
+        start = time.perf_counter()
+        try:
+            signature = self.signature(text)
+            candidates = set()
+            for key in self._band_keys(partition, signature):
+                candidates.update(self._buckets.get(key, ()))
+            if not candidates:
+                return None
+
+            slots = np.fromiter(candidates, dtype=np.int64)
+            scores = (self._signatures[slots] == signature).mean(axis=1)
+            best = int(scores.argmax())
+            if scores[best] < threshold:
+                return None
+            self.matches += 1
+            return float(scores[best]), self._entries[slots[best]][2]
+        finally:
+            self.lookups += 1
+            self.lookup_seconds += time.perf_counter() - start
+
+    def stats(self) -> Dict:
+        return {
+            "entries": self.size,
+            "max_entries": self.max_entries,
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "avg_lookup_ms": round(self.lookup_seconds / self.lookups * 1000, 3) if self.lookups else 0,
+        }
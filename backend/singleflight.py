@@ -0,0 +1,66 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    The first caller starts the work as a task; callers arriving while it is
+    in flight await the same task instead of starting their own. Results and
+    exceptions are delivered to every waiter. The shared task is shielded,
+    so one waiter being cancelled (e.g. a client disconnecting) does not
+    cancel the work for the others. When the last waiter is cancelled the
+    work is cancelled too, and that waiter returns only once it has stopped,
+    unless `cancel_abandoned` is False (the work then finishes on its own,
+    e.g. to refresh a cache).
+    """
+
+    def __init__(self, cancel_abandoned: bool = True):
+        self.cancel_abandoned = cancel_abandoned
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+        else:
+            self.coalesced += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self.cancel_abandoned and self._waiters[task] == 1 and not task.done():
+                # Nobody is left to use the result: stop the work, and don't
+                # hand the key to new callers while it winds down
+                self.abandoned += 1
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+                task.cancel()
+                await asyncio.wait([task])
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
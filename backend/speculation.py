@@ -0,0 +1,135 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class PivotSpeculator:
+    """
+    Speculative pivot analyses. Right after a project is created, the first
+    `budget(uid)` pivot options are analyzed in the background so that a
+    later request for one of them can be answered from memory.
+
+    `generate(uid, project, pivot_name)` produces the analysis. Work is low
+    priority: it starts after `delay` seconds, at most `concurrency`
+    analyses run at once across all users, and a speculation that has not
+    started yet is dropped rather than waited on when the user asks for it.
+    Unclaimed results expire after `ttl` seconds.
+    """
+
+    def __init__(self, generate: Callable[[str, Dict, str], Awaitable[Any]], budget: Callable[[str], Awaitable[int]],
+                 enabled: bool = False, concurrency: int = 2, ttl: float = 1800, delay: float = 1.0):
+        self.generate = generate
+        self.budget = budget
+        self.enabled = enabled
+        self.ttl = ttl
+        self.delay = delay
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.planners: Dict[tuple, asyncio.Task] = {}
+        # (uid, project_id, pivot) -> {"task", "started", "created_at"}
+        self.entries: Dict[tuple, Dict] = {}
+        self.counts = {"scheduled": 0, "completed": 0, "failed": 0, "cancelled": 0, "expired": 0, "hits": 0, "misses": 0}
+
+    @staticmethod
+    def _key(uid: str, project_id: str, pivot_name: str) -> tuple:
+        return (uid, project_id, " ".join(pivot_name.lower().split()))
+
+    def schedule(self, uid: str, project_id: str, project: Dict):
+        """Start speculating on a new project's pivot options (no-op when disabled)"""
+        if not self.enabled or not project.get('pivot_options'):
+            return
+        self._prune()
+        planner = asyncio.create_task(self._plan(uid, project_id, project))
+        self.planners[(uid, project_id)] = planner
+        planner.add_done_callback(lambda _: self.planners.pop((uid, project_id), None))
+
+    async def _plan(self, uid: str, project_id: str, project: Dict):
+        await asyncio.sleep(self.delay)
+        try:
+            count = await self.budget(uid)
+        except Exception as e:
+            print(f"Speculation budget lookup failed for {uid}: {e}")
+            return
+        for pivot_name in project['pivot_options'][:count]:
+            key = self._key(uid, project_id, pivot_name)
+            if key in self.entries:
+                continue
+            entry = {"started": False, "created_at": time.time()}
+            entry["task"] = asyncio.create_task(self._run(entry, uid, project, pivot_name))
+            # Failures are logged in _run; don't warn again if nobody claims the result
+            entry["task"].add_done_callback(lambda t: t.cancelled() or t.exception())
+            self.entries[key] = entry
+            self.counts["scheduled"] += 1
+
+    async def _run(self, entry: Dict, uid: str, project: Dict, pivot_name: str):
+        async with self.semaphore:
+            entry["started"] = True
+            try:
+                result = await self.generate(uid, project, pivot_name)
+            except Exception as e:
+                print(f"Speculative pivot '{pivot_name}' failed: {e}")
+                self.counts["failed"] += 1
+                raise
+            self.counts["completed"] += 1
+            return result
+
+    async def take(self, uid: str, project_id: str, pivot_name: str) -> Optional[Any]:
+        """
+        Claim the speculative analysis for a pivot. Waits for one that is
+        already being generated; returns None on a miss.
+        """
+        if not self.enabled:
+            return None
+        self._prune()
+        entry = self.entries.pop(self._key(uid, project_id, pivot_name), None)
+        if entry is None or not entry["started"]:
+            if entry is not None:
+                entry["task"].cancel()
+            self.counts["misses"] += 1
+            return None
+        try:
+            # Shielded so a disconnecting client doesn't waste the finished work
+            result = await asyncio.shield(entry["task"])
+        except asyncio.CancelledError:
+            if not entry["task"].cancelled():
+                raise
+            result = None
+        except Exception:
+            result = None
+        self.counts["hits" if result is not None else "misses"] += 1
+        return result
+
+    def cancel(self, uid: str, project_id: str = None) -> int:
+        """Cancel speculation for a user, or for one of their projects, stopping analyses already running"""
+        cancelled = 0
+        for key in [k for k in self.planners if k[0] == uid and project_id in (None, k[1])]:
+            self.planners.pop(key).cancel()
+        for key in [k for k in self.entries if k[0] == uid and project_id in (None, k[1])]:
+            task = self.entries.pop(key)["task"]
+            if not task.done():
+                task.cancel()
+                cancelled += 1
+        self.counts["cancelled"] += cancelled
+        return cancelled
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for key in [k for k, e in self.entries.items() if e["created_at"] < cutoff]:
+            self.entries.pop(key)["task"].cancel()
+            self.counts["expired"] += 1
+
+    async def stop(self):
+        tasks = list(self.planners.values()) + [e["task"] for e in self.entries.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.planners.clear()
+        self.entries.clear()
+
+    def stats(self) -> Dict:
+        claimed = self.counts["hits"] + self.counts["misses"]
+        return {
+            "enabled": self.enabled,
+            "pending": sum(1 for e in self.entries.values() if not e["task"].done()),
+            "ready": sum(1 for e in self.entries.values() if e["task"].done() and not e["task"].cancelled()),
+            **self.counts,
+            "hit_rate": round(self.counts["hits"] / claimed, 3) if claimed else 0.0,
+        }
@@ -0,0 +1,99 @@
+import bisect
+from typing import Dict, List, Tuple
+
+# Minimal Prometheus metrics (text exposition format 0.0.4) without the
+# prometheus_client dependency. Everything runs on the event loop thread,
+# so no locking is needed.
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: List[str]):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: List[str], buckets: List[float]):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = sorted(buckets)
+        # key -> [per-bucket counts..., +Inf count], sum
+        self.series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float("inf")], counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.label_names, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+REGISTRY = []
+
+def counter(name: str, help: str, labels: List[str]) -> Counter:
+    metric = Counter(name, help, labels)
+    REGISTRY.append(metric)
+    return metric
+
+def histogram(name: str, help: str, labels: List[str], buckets: List[float]) -> Histogram:
+    metric = Histogram(name, help, labels, buckets)
+    REGISTRY.append(metric)
+    return metric
+
+def render() -> str:
+    """All registered metrics in Prometheus text format"""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120]
+TOKEN_BUCKETS = [64, 128, 256, 512, 1024, 2048, 4096, 8192]
+
+# LLM calls. `endpoint` is the prompt template (deconstruction, pivot,
+# diagnosis, field_repair); `model` is the provider's model id.
+LLM_REQUESTS = counter("llm_requests_total", "LLM provider calls by outcome", ["endpoint", "model", "status"])
+LLM_LATENCY = histogram("llm_request_duration_seconds", "Wall time of LLM provider calls", ["endpoint", "model"], LATENCY_BUCKETS)
+LLM_TTFT = histogram("llm_time_to_first_token_seconds", "Time to the first streamed token", ["endpoint", "model"], LATENCY_BUCKETS)
+LLM_PROMPT_TOKENS = histogram("llm_prompt_tokens", "Prompt tokens per LLM call", ["endpoint", "model"], TOKEN_BUCKETS)
+LLM_COMPLETION_TOKENS = histogram("llm_completion_tokens", "Completion tokens per LLM call", ["endpoint", "model"], TOKEN_BUCKETS)
+LLM_COST = counter("llm_cost_usd_total", "Estimated LLM spend in USD", ["endpoint", "model"])
+LLM_RETRIES = counter("llm_retries_total", "Full-request retries after a failed attempt", ["endpoint"])
+LLM_PARSE_FAILURES = counter("llm_parse_failures_total", "Responses that could not be parsed or validated", ["endpoint", "model", "stage"])
+LLM_MOCK_FALLBACKS = counter("llm_mock_fallbacks_total", "Requests answered with mock data", ["endpoint", "reason"])
+LLM_ROUTE_LATENCY = histogram("llm_route_duration_seconds", "End-to-end generation time per model route", ["route", "endpoint"], LATENCY_BUCKETS)
+LLM_ROUTE_COST = counter("llm_route_cost_usd_total", "Estimated LLM spend in USD per model route", ["route", "endpoint"])
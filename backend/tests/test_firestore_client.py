@@ -0,0 +1,57 @@
+import asyncio
+import types
+
+from google.auth.credentials import AnonymousCredentials
+from google.cloud.firestore import AsyncClient
+
+import auth
+
+
+def _client(monkeypatch):
+    monkeypatch.delenv("FIRESTORE_EMULATOR_HOST", raising=False)
+    return auth.TunedAsyncClient(project="test", credentials=AnonymousCredentials())
+
+
+def test_async_client_internals_are_present(monkeypatch):
+    # TunedAsyncClient replaces this private property and reads these private
+    # attributes; fail loudly if an upgrade of google-cloud-firestore drops them
+    assert isinstance(getattr(AsyncClient, "_firestore_api", None), property)
+    assert auth.firestore_gapic is not None and auth.firestore_grpc is not None
+    client = _client(monkeypatch)
+    for name in ("_firestore_api_internal", "_emulator_host", "_target", "_credentials",
+                 "_client_options", "_client_info"):
+        assert hasattr(client, name), name
+
+
+def test_channel_uses_tuned_options(monkeypatch, capsys):
+    transport = auth.firestore_grpc.FirestoreGrpcAsyncIOTransport
+    create_channel = transport.create_channel
+    seen = []
+
+    def recording_create_channel(*args, **kwargs):
+        seen.append(kwargs.get("options"))
+        return create_channel(*args, **kwargs)
+
+    monkeypatch.setattr(transport, "create_channel", recording_create_channel)
+
+    async def scenario():
+        client = _client(monkeypatch)
+        api = client._firestore_api
+        assert api is client._firestore_api
+        assert api.transport is client._transport
+
+    asyncio.run(scenario())
+    assert seen == [auth.FIRESTORE_GRPC_OPTIONS]
+    assert "WARNING" not in capsys.readouterr().out
+
+
+def test_falls_back_to_stock_channel(monkeypatch, capsys):
+    # A release whose transport no longer matches what the override expects
+    monkeypatch.setattr(auth, "firestore_grpc", types.SimpleNamespace())
+
+    async def scenario():
+        client = _client(monkeypatch)
+        assert client._firestore_api is not None
+
+    asyncio.run(scenario())
+    assert "using the default channel" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+import asyncio
+
+import engine
+from providers import ProviderPool, StubProvider
+from speculation import PivotSpeculator
+
+
+class HangingProvider(StubProvider):
+    """Stub whose completions never finish, recording when they are cancelled"""
+
+    def __init__(self):
+        super().__init__("hanging")
+        self.started = asyncio.Event()
+        self.cancelled = 0
+
+    async def _respond(self, request):
+        self.started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+async def _budget(uid):
+    return 1
+
+
+def test_cancel_stops_the_provider_call(monkeypatch):
+    async def scenario():
+        provider = HangingProvider()
+        monkeypatch.setattr(engine, "llm_providers", ProviderPool([provider]))
+        speculator = PivotSpeculator(
+            lambda uid, project, pivot_name: engine.generate_pivot_analysis(project["name"], pivot_name, "USD"),
+            _budget, enabled=True, concurrency=1, delay=0,
+        )
+        speculator.schedule("uid", "project", {"name": "Soap business", "pivot_options": ["Liquid soap"]})
+        await asyncio.wait_for(provider.started.wait(), 5)
+        task = next(iter(speculator.entries.values()))["task"]
+
+        assert speculator.cancel("uid") == 1
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert task.cancelled()
+        assert provider.cancelled == 1
+        assert not speculator.semaphore.locked()
+        assert engine.inflight_requests.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
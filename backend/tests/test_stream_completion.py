@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+import engine
+from prompts import DECONSTRUCTION
+from providers import ProviderPool, StubProvider
+
+
+class SilentStreamProvider(StubProvider):
+    """Stub that opens a stream right away but never sends a chunk"""
+
+    async def stream(self, request):
+        async def chunks():
+            await asyncio.sleep(60)
+            yield None
+        return chunks()
+
+
+def test_first_chunk_wait_is_bounded_by_the_timeout():
+    async def scenario():
+        provider = SilentStreamProvider("silent")
+        pool = ProviderPool([provider], min_timeout=0.1, max_timeout=0.1)
+        start = asyncio.get_running_loop().time()
+        with pytest.raises(asyncio.TimeoutError):
+            async for _ in engine._stream_completion("prompt", DECONSTRUCTION, pool):
+                pass
+        assert asyncio.get_running_loop().time() - start < 5
+        assert provider.breaker.failures == 1
+
+    asyncio.run(scenario())
@@ -2,6 +2,30 @@ import axios from 'axios';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8080';
 
+// Reads a Server-Sent Events response body, calling onEvent(event, data)
+// for every event as it arrives.
+const readEventStream = async (response, onEvent) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      const event = raw.match(/^event: (.*)$/m)?.[1] || 'message';
+      const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || 'null');
+      onEvent(event, data);
+    }
+  }
+};
+
 export const api = {
   syncUser: async (token) => {
     const response = await axios.post(
@@ -29,6 +53,30 @@ export const api = {
     return response.data;
   },
 
+  // Streams the deconstruction as Server-Sent Events. `onEvent(event, data)` is
+  // called for every element/field as soon as the model finishes it; resolves
+  // with the saved result from the final `result` event.
+  deconstructIdeaStream: async (idea, currency, token, onEvent) => {
+    const response = await fetch(`${API_URL}/deconstruct/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${token}`,
+      },
+      body: JSON.stringify({ idea, currency }),
+    });
+    if (!response.ok) {
+      throw new Error(`Deconstruction stream failed with status ${response.status}`);
+    }
+
+    let result = null;
+    await readEventStream(response, (event, data) => {
+      if (event === 'result') result = data;
+      if (onEvent) onEvent(event, data);
+    });
+    return result;
+  },
+
   getDashboardStats: async (token) => {
     const response = await axios.get(
       `${API_URL}/dashboard/stats`,
@@ -151,6 +199,30 @@ export const api = {
     return response.data;
   },
 
+  // Analyzes every pivot option of a project at once. `onEvent` receives a
+  // `pivot` event per analysis as it completes and a final `saved` event
+  // mapping pivot names to their new ids.
+  analyzeAllPivots: async (projectId, token, onEvent, pivotNames = null) => {
+    const response = await fetch(`${API_URL}/projects/${projectId}/pivots/bulk`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${token}`,
+      },
+      body: JSON.stringify({ pivot_names: pivotNames }),
+    });
+    if (!response.ok) {
+      throw new Error(`Bulk pivot analysis failed with status ${response.status}`);
+    }
+
+    let pivotIds = {};
+    await readEventStream(response, (event, data) => {
+      if (event === 'saved') pivotIds = data.pivot_ids;
+      if (onEvent) onEvent(event, data);
+    });
+    return pivotIds;
+  },
+
   getPivots: async (projectId, token) => {
     const url = projectId 
       ? `${API_URL}/pivots?project_id=${projectId}`
@@ -195,6 +267,40 @@ export const api = {
     return response.data;
   },
 
+  // Background job mode for long AI requests. `path` is one of
+  // 'deconstruct', 'pivots', 'strategies' or `projects/${id}/diagnose`;
+  // resolves with the queued job ({ id, status, ... }).
+  submitJob: async (path, data, token) => {
+    const response = await axios.post(`${API_URL}/jobs/${path}`, data, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    return response.data;
+  },
+
+  getJob: async (jobId, token) => {
+    const response = await axios.get(`${API_URL}/jobs/${jobId}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    return response.data;
+  },
+
+  // Subscribes to a job's status changes; resolves with the finished job.
+  waitForJob: async (jobId, token, onStatus) => {
+    const response = await fetch(`${API_URL}/jobs/${jobId}/events`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    if (!response.ok) {
+      throw new Error(`Job subscription failed with status ${response.status}`);
+    }
+
+    let job = null;
+    await readEventStream(response, (event, data) => {
+      job = data;
+      if (onStatus) onStatus(data);
+    });
+    return job;
+  },
+
   getSettings: async (token) => {
     const response = await axios.get(`${API_URL}/settings`, {
       headers: { Authorization: `Bearer ${token}` },